@@ -1,8 +1,16 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from app import db
 from models import AdminSettings, PerformanceTracker, Prediction, Fixture
+from settings_cache import bump_settings_version, invalidate_settings
+from rate_limiter import rate_limiter
+from source_health import source_health
+from http_cache import get_http_cache
+from api_football import get_api_client
+from scheduler import scheduler_status, submit_job
+from data_cache import get_data_cache
 import logging
-from datetime import datetime, date
+import os
+from datetime import datetime, date, timedelta
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -67,9 +75,11 @@ def update_settings():
         settings.max_matches_weekday = int(request.form.get('max_matches_weekday', 100))
         settings.max_matches_weekend = int(request.form.get('max_matches_weekend', 300))
         settings.scaling_start_date = request.form.get('scaling_start_date', '2025-07-13')
+        bump_settings_version(settings)
         
         db.session.add(settings)
         db.session.commit()
+        invalidate_settings()
         
         flash('Settings updated successfully', 'success')
         return redirect(url_for('admin.admin_dashboard'))
@@ -103,9 +113,11 @@ def reset_defaults():
         settings.max_matches_weekday = 100
         settings.max_matches_weekend = 300
         settings.scaling_start_date = '2025-07-13'
+        bump_settings_version(settings)
         
         db.session.add(settings)
         db.session.commit()
+        invalidate_settings()
         
         flash('Settings reset to defaults', 'success')
         return redirect(url_for('admin.admin_dashboard'))
@@ -115,6 +127,54 @@ def reset_defaults():
         flash('Error resetting settings', 'error')
         return redirect(url_for('admin.admin_dashboard'))
 
+@admin_bp.route('/tune_weights', methods=['GET'])
+def tuning_status():
+    """Status and result of the latest weight tuning run"""
+    from weight_tuner import tuning_run
+    
+    return jsonify(tuning_run() or {'status': 'none'})
+
+@admin_bp.route('/tune_weights', methods=['POST'])
+def tune_weights():
+    """Start a search of weights and thresholds against historical fixtures
+    
+    The search runs as a background job; GET this endpoint for its result.
+    """
+    params = request.get_json(silent=True) or request.form
+    try:
+        date_from = params.get('date_from')
+        date_to = params.get('date_to')
+        
+        options = {
+            'date_from': datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None,
+            'date_to': datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None,
+            'workers': max(1, min(int(params.get('workers', 2)), os.cpu_count() or 1)),
+            'rounds': min(int(params.get('rounds', 10)), 50),
+            'candidates_per_round': min(int(params.get('candidates', 32)), 256),
+            'patience': min(int(params.get('patience', 3)), 10)
+        }
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Dates must be YYYY-MM-DD and counts must be integers'}), 400
+    apply = str(params.get('apply', '')).lower() in ('1', 'true', 'on', 'yes')
+    
+    try:
+        from weight_tuner import claim_tuning_run, release_tuning_run, run_tuning_job
+        
+        run = claim_tuning_run(options)
+        if run is None:
+            return jsonify({'error': 'Weight tuning is already running'}), 409
+        
+        try:
+            submit_job(('tune-weights',), run_tuning_job, run, options, apply)
+        except Exception:
+            release_tuning_run()
+            raise
+        return jsonify({'status': 'queued'}), 202
+        
+    except Exception as e:
+        logging.error(f"Error starting weight tuning: {e}")
+        return jsonify({'error': 'Failed to start weight tuning'}), 500
+
 @admin_bp.route('/system_status')
 def system_status():
     """Get system status for monitoring"""
@@ -140,6 +200,12 @@ def system_status():
             'expired_cache': expired_cache_entries,
             'recent_fixtures': recent_fixtures,
             'recent_predictions': recent_predictions,
+            'rate_limits': rate_limiter.stats(),
+            'sources': source_health.stats(),
+            'http_cache': get_http_cache().stats(),
+            'api_football_quota': get_api_client().quota_status(),
+            'scheduler': scheduler_status(),
+            'data_cache': get_data_cache().stats(),
             'system_health': 'Healthy' if recent_fixtures > 0 else 'Warning'
         }
         
@@ -153,18 +219,9 @@ def system_status():
 def clear_cache():
     """Clear expired cache entries"""
     try:
-        from models import CacheManagement
-        
-        expired_entries = CacheManagement.query.filter(
-            CacheManagement.expiry_time < datetime.utcnow()
-        ).all()
-        
-        for entry in expired_entries:
-            db.session.delete(entry)
-        
-        db.session.commit()
+        memory_entries, shared_entries = get_data_cache().clear_expired()
         
-        flash(f'Cleared {len(expired_entries)} expired cache entries', 'success')
+        flash(f'Cleared {shared_entries} expired cache entries ({memory_entries} in memory)', 'success')
         return redirect(url_for('admin.admin_dashboard'))
         
     except Exception as e:
@@ -0,0 +1,229 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import requests
+from rate_limiter import rate_limiter
+from http_cache import CachingAdapter, get_http_cache
+
+BASE_URL = 'https://v3.football.api-sports.io'
+API_HOST = 'v3.football.api-sports.io'
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (5, 15)
+
+# Parallel requests for date ranges, and daily requests always left unused
+DEFAULT_WORKERS = 4
+QUOTA_RESERVE = 10
+
+FIXTURE_STATUSES = 'NS-1H-HT-2H-ET-P-FT-AET-PEN'
+
+# Most fixture ids the API accepts in one ids= filter
+IDS_PER_REQUEST = 20
+
+class QuotaExhausted(Exception):
+    """The daily request quota is down to the reserve"""
+
+def fixture_payload(match):
+    """Flat fixture dict from one API-Football /fixtures response item"""
+    return {
+        'id': match['fixture']['id'],
+        'home_team': match['teams']['home']['name'],
+        'away_team': match['teams']['away']['name'],
+        'league': match['league']['name'],
+        'kickoff_time': match['fixture']['date'],
+        'status': match['fixture']['status']['long'],
+        'venue': match['fixture']['venue']['name'],
+        'referee': match['fixture']['referee'],
+        # Ids and results used by fixture ingestion
+        'status_short': match['fixture']['status'].get('short'),
+        'home_team_external_id': match['teams']['home'].get('id'),
+        'away_team_external_id': match['teams']['away'].get('id'),
+        'league_external_id': match['league'].get('id'),
+        'league_country': match['league'].get('country'),
+        'season': match['league'].get('season'),
+        'round': match['league'].get('round'),
+        'home_score': match.get('goals', {}).get('home'),
+        'away_score': match.get('goals', {}).get('away')
+    }
+
+def season_for(day):
+    """API-Football season year for a date (European seasons start in July)"""
+    return day.year if day.month >= 7 else day.year - 1
+
+class ApiFootballClient:
+    """API-Football client over a pooled keep-alive session
+
+    Requests share the scraper's per-host rate limiter and HTTP cache,
+    follow the API's paging, and record the quota headers of every reply
+    so range fetches stop before the daily quota runs out. Each request
+    reserves its unit of quota before it is sent, so parallel workers
+    cannot all pass the check on the same remaining count.
+    """
+
+    def __init__(self, api_key=None, workers=DEFAULT_WORKERS, quota_reserve=QUOTA_RESERVE):
+        self.workers = workers
+        self.quota_reserve = quota_reserve
+        self.session = requests.Session()
+        adapter = CachingAdapter(rate_limiter, get_http_cache(), pool_connections=1, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'X-RapidAPI-Key': api_key or os.environ.get("API_FOOTBALL_KEY", "default_key"),
+            'X-RapidAPI-Host': API_HOST
+        })
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._quota_day = None
+        self.quota = {
+            'daily_limit': None,
+            'daily_remaining': None,
+            'minute_limit': None,
+            'minute_remaining': None,
+            'requests': 0,
+            'errors': 0
+        }
+
+    def _record_quota(self, headers):
+        """Update quota usage from a response's rate-limit headers"""
+        today = datetime.utcnow().date()
+        with self._lock:
+            self.quota['requests'] += 1
+            for key, header in (
+                ('daily_limit', 'x-ratelimit-requests-limit'),
+                ('daily_remaining', 'x-ratelimit-requests-remaining'),
+                ('minute_limit', 'X-RateLimit-Limit'),
+                ('minute_remaining', 'X-RateLimit-Remaining')
+            ):
+                if headers.get(header) is None:
+                    continue
+                value = int(headers[header])
+                # Parallel replies can arrive out of order, and the daily
+                # count only falls until it resets at midnight UTC
+                if key == 'daily_remaining' and self._quota_day == today and self.quota[key] is not None:
+                    value = min(value, self.quota[key])
+                self.quota[key] = value
+            self._quota_day = today
+
+    def _available(self):
+        remaining = self.quota['daily_remaining']
+        return None if remaining is None else max(0, remaining - self._in_flight - self.quota_reserve)
+
+    def requests_available(self):
+        """Requests that can still be made today, or None before the first reply"""
+        with self._lock:
+            return self._available()
+
+    def _reserve(self):
+        """Claim one request of today's quota, or raise QuotaExhausted at the reserve"""
+        with self._lock:
+            if self._available() == 0:
+                raise QuotaExhausted(f"API-Football quota reserve reached ({self.quota_reserve} left)")
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def get(self, endpoint, params=None, fresh=False):
+        """Every response item for an endpoint, following the API's paging
+
+        With fresh=True a cached reply is revalidated with the API rather
+        than served as is.
+        """
+        params = dict(params or {})
+        headers = {'Cache-Control': 'no-cache'} if fresh else None
+        items = []
+        page = 1
+
+        while True:
+            self._reserve()
+            try:
+                response = self.session.get(f"{BASE_URL}/{endpoint}", params=params, headers=headers, timeout=TIMEOUT)
+                # Replies served from the cache cost nothing and carry old quota headers
+                if not getattr(response, 'from_cache', False):
+                    self._record_quota(response.headers)
+                elif response.network_headers is not None:
+                    self._record_quota(response.network_headers)
+            finally:
+                self._release()
+            response.raise_for_status()
+            data = response.json()
+
+            if data.get('errors'):
+                with self._lock:
+                    self.quota['errors'] += 1
+                logging.error(f"API-Football error for {endpoint} {params}: {data['errors']}")
+                return items
+
+            items.extend(data.get('response', []))
+            paging = data.get('paging') or {}
+            if paging.get('current', page) >= paging.get('total', 1):
+                return items
+            page = paging['current'] + 1
+            params['page'] = page
+
+    def fixtures(self, day, league_id=None, season=None):
+        """Fixture payloads for one date, optionally for one league"""
+        params = {'date': day.strftime('%Y-%m-%d'), 'status': FIXTURE_STATUSES}
+        if league_id:
+            params['league'] = league_id
+            params['season'] = season or season_for(day)
+        return [fixture_payload(match) for match in self.get('fixtures', params)]
+
+    def fixtures_by_ids(self, external_ids):
+        """Current payloads for specific fixtures, IDS_PER_REQUEST ids per request"""
+        external_ids = list(external_ids)
+        payloads = []
+        for start in range(0, len(external_ids), IDS_PER_REQUEST):
+            batch = external_ids[start:start + IDS_PER_REQUEST]
+            payloads.extend(fixture_payload(match) for match in self.get(
+                'fixtures', {'ids': '-'.join(str(external_id) for external_id in batch)}, fresh=True
+            ))
+        return payloads
+
+    def fixtures_for_range(self, date_from, date_to=None, league_ids=None):
+        """Fixture payloads for every date (and league) in a range, fetched in parallel
+
+        The range is split into one request per date and league filter.
+        Requests beyond what today's quota allows are skipped and logged.
+        """
+        date_to = date_to or date_from
+        days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+        tasks = [(day, league_id) for day in days for league_id in (league_ids or [None])]
+
+        available = self.requests_available()
+        if available is not None and available < len(tasks):
+            logging.warning(f"API-Football quota allows {available} of {len(tasks)} requests")
+            tasks = tasks[:available]
+
+        def fetch(task):
+            day, league_id = task
+            try:
+                return self.fixtures(day, league_id)
+            except QuotaExhausted as e:
+                logging.warning(str(e))
+            except Exception as e:
+                logging.error(f"Error fetching fixtures for {day} (league {league_id}): {e}")
+            return []
+
+        if not tasks:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            return [payload for payloads in pool.map(fetch, tasks) for payload in payloads]
+
+    def quota_status(self):
+        """Quota usage seen in the latest replies"""
+        with self._lock:
+            return dict(self.quota)
+
+_client = None
+
+def get_api_client():
+    """The process-wide API-Football client, so quota tracking is shared"""
+    global _client
+    if _client is None:
+        _client = ApiFootballClient()
+    return _client
@@ -25,6 +25,25 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
+# Weight injured/suspended players by their minutes and goals when scoring availability
+app.config["WEIGHT_ABSENCES_BY_STATS"] = os.environ.get("WEIGHT_ABSENCES_BY_STATS", "false").lower() == "true"
+
+# Scrape prediction and odds sources concurrently with asyncio
+app.config["SCRAPER_ASYNC_MODE"] = os.environ.get("SCRAPER_ASYNC_MODE", "false").lower() == "true"
+
+# On-disk cache of scraped pages and API responses
+app.config["HTTP_CACHE_PATH"] = os.environ.get("HTTP_CACHE_PATH")
+app.config["HTTP_CACHE_MAX_BYTES"] = int(os.environ.get("HTTP_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+
+# Two-tier data cache: in-process LRU size, and whether to share entries through the database
+app.config["DATA_CACHE_MAX_ENTRIES"] = int(os.environ.get("DATA_CACHE_MAX_ENTRIES", 2048))
+app.config["DATA_CACHE_SHARED"] = os.environ.get("DATA_CACHE_SHARED", "true").lower() == "true"
+
+# Run the scraping/prediction job scheduler inside the web process
+# (use a single web worker, or `flask run-scheduler` as a separate worker)
+app.config["SCHEDULER_IN_PROCESS"] = os.environ.get("SCHEDULER_IN_PROCESS", "false").lower() == "true"
+app.config["SCHEDULER_WORKERS"] = int(os.environ.get("SCHEDULER_WORKERS", 2))
+
 # Initialize the app with the extension
 db.init_app(app)
 
@@ -35,11 +54,22 @@ from admin_panel import admin_bp
 # Register blueprints
 app.register_blueprint(admin_bp, url_prefix='/admin')
 
+# Register CLI commands
+import commands
+
 with app.app_context():
     # Import models to ensure tables are created
     import models
     db.create_all()
     
+    # Add columns introduced since the database was created
+    from migrations import ensure_schema
+    ensure_schema()
+    
+    # Head-to-head summaries and team forms for databases that predate them
+    from match_history import ensure_match_history
+    ensure_match_history()
+    
     # Initialize admin settings if not exists
     from models import AdminSettings
     if not AdminSettings.query.first():
@@ -62,3 +92,7 @@ with app.app_context():
         )
         db.session.add(default_settings)
         db.session.commit()
+
+if app.config["SCHEDULER_IN_PROCESS"]:
+    from scheduler import start_in_process_scheduler
+    start_in_process_scheduler(app.config["SCHEDULER_WORKERS"])
@@ -0,0 +1,293 @@
+import logging
+from collections import deque
+from datetime import datetime, time, timedelta
+import numpy as np
+from app import db
+from models import Fixture, BettingOdds, PredictionAggregation
+from match_history import RollingForm
+from prediction_engine import PredictionEngine
+from scoring_kernel import CriteriaMatrix, score_matrix, HOME, DRAW, AWAY
+from settings_cache import get_settings
+from utils import calculate_accuracy_percentage
+
+# Finished fixtures are replayed in keyset-paginated chunks of this size
+CHUNK_SIZE = 500
+
+class TableRow:
+    """A team's league table row as it stood at a point in time"""
+
+    def __init__(self, team_id):
+        self.team_id = team_id
+        self.position = 0
+        self.points = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.goals_for = 0
+        self.goals_against = 0
+        self.goal_difference = 0
+        self.home_wins = 0
+        self.home_draws = 0
+        self.home_losses = 0
+        self.away_wins = 0
+        self.away_draws = 0
+        self.away_losses = 0
+
+    def record(self, scored, conceded, at_home):
+        """Apply one result to the row"""
+        venue = 'home' if at_home else 'away'
+        if scored > conceded:
+            outcome = 'wins'
+            self.points += 3
+        elif scored == conceded:
+            outcome = 'draws'
+            self.points += 1
+        else:
+            outcome = 'losses'
+
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        setattr(self, f'{venue}_{outcome}', getattr(self, f'{venue}_{outcome}') + 1)
+        self.goals_for += scored
+        self.goals_against += conceded
+        self.goal_difference = self.goals_for - self.goals_against
+
+class ReplayState:
+    """Point-in-time inputs rebuilt match by match across every competition
+
+    Form and head-to-head follow all of a team's matches in kickoff order,
+    as the live TeamForm and HeadToHeadSummary do. League tables are kept
+    per league row, since a league row is one season.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.h2h = {}
+        self.forms = {}
+        self._stale_tables = set()
+
+    def standing(self, league_id, team_id):
+        """Table row for a team in a league season, or None before its first match"""
+        table = self.tables.get(league_id, {})
+        row = table.get(team_id)
+        if row and league_id in self._stale_tables:
+            ranked = sorted(
+                table.values(),
+                key=lambda r: (-r.points, -r.goal_difference, -r.goals_for, r.team_id)
+            )
+            for position, ranked_row in enumerate(ranked, 1):
+                ranked_row.position = position
+            self._stale_tables.discard(league_id)
+        return row
+
+    def head_to_head(self, home_team_id, away_team_id):
+        """Most recent meetings between two teams, newest first"""
+        return list(self.h2h.get(frozenset((home_team_id, away_team_id)), ()))
+
+    def record(self, fixture):
+        """Apply a finished fixture once it has been scored"""
+        table = self.tables.setdefault(fixture.league_id, {})
+        for team_id in (fixture.home_team_id, fixture.away_team_id):
+            if team_id not in table:
+                table[team_id] = TableRow(team_id)
+
+        table[fixture.home_team_id].record(fixture.home_score, fixture.away_score, True)
+        table[fixture.away_team_id].record(fixture.away_score, fixture.home_score, False)
+        self._stale_tables.add(fixture.league_id)
+
+        pair = frozenset((fixture.home_team_id, fixture.away_team_id))
+        self.h2h.setdefault(pair, deque(maxlen=5)).appendleft(fixture)
+
+        self.forms.setdefault(fixture.home_team_id, RollingForm(fixture.home_team_id)).push(
+            fixture.id, True, fixture.home_score, fixture.away_score
+        )
+        self.forms.setdefault(fixture.away_team_id, RollingForm(fixture.away_team_id)).push(
+            fixture.id, False, fixture.away_score, fixture.home_score
+        )
+
+def actual_outcome(fixture):
+    """Outcome code of a finished fixture"""
+    if fixture.home_score > fixture.away_score:
+        return HOME
+    elif fixture.home_score < fixture.away_score:
+        return AWAY
+    return DRAW
+
+def _finished_fixtures(date_to=None):
+    """Stream every finished fixture up to date_to in kickoff order, one chunk at a time"""
+    query = db.session.query(
+        Fixture.id, Fixture.league_id, Fixture.home_team_id, Fixture.away_team_id, Fixture.kickoff_time,
+        Fixture.home_score, Fixture.away_score, Fixture.importance_level
+    ).filter(
+        Fixture.status == 'Finished',
+        Fixture.home_score.isnot(None),
+        Fixture.away_score.isnot(None)
+    )
+    if date_to:
+        query = query.filter(Fixture.kickoff_time < datetime.combine(date_to + timedelta(days=1), time.min))
+
+    last_key = None
+    while True:
+        chunk_query = query
+        if last_key:
+            chunk_query = chunk_query.filter(db.tuple_(Fixture.kickoff_time, Fixture.id) > last_key)
+        chunk = chunk_query.order_by(Fixture.kickoff_time, Fixture.id).limit(CHUNK_SIZE).all()
+        if not chunk:
+            return
+
+        yield chunk
+        last_key = (chunk[-1].kickoff_time, chunk[-1].id)
+
+def _pre_kickoff_inputs(chunk):
+    """Odds and tips for a chunk that were recorded before each kickoff"""
+    kickoffs = {fixture.id: fixture.kickoff_time for fixture in chunk}
+
+    odds = {}
+    for odd in db.session.query(
+        BettingOdds.fixture_id, BettingOdds.home_odds, BettingOdds.draw_odds,
+        BettingOdds.away_odds, BettingOdds.created_at
+    ).filter(BettingOdds.fixture_id.in_(kickoffs)):
+        if odd.created_at and odd.created_at <= kickoffs[odd.fixture_id]:
+            odds.setdefault(odd.fixture_id, []).append(odd)
+
+    aggregations = {}
+    for aggregation in db.session.query(
+        PredictionAggregation.fixture_id, PredictionAggregation.prediction,
+        PredictionAggregation.created_at
+    ).filter(PredictionAggregation.fixture_id.in_(kickoffs)):
+        if aggregation.created_at and aggregation.created_at <= kickoffs[aggregation.fixture_id]:
+            aggregations.setdefault(aggregation.fixture_id, []).append(aggregation)
+
+    return odds, aggregations
+
+def replay_history(league_ids=None, date_from=None, date_to=None, engine=None):
+    """Rebuild point-in-time criteria for finished fixtures, one chunk at a time
+
+    Every finished fixture up to date_to is replayed in kickoff order, so
+    form and head-to-head carry across seasons and competitions. Only
+    fixtures from date_from onwards, in league_ids when given, are scored.
+    Yields (criteria matrix, actual outcome codes, league ids) per chunk.
+    """
+    engine = engine or PredictionEngine()
+    league_ids = set(league_ids) if league_ids else None
+    start = datetime.combine(date_from, time.min) if date_from else None
+    state = ReplayState()
+
+    for chunk in _finished_fixtures(date_to):
+        scored = [
+            fixture for fixture in chunk
+            if (start is None or fixture.kickoff_time >= start)
+            and (league_ids is None or fixture.league_id in league_ids)
+        ]
+        odds, aggregations = _pre_kickoff_inputs(scored) if scored else ({}, {})
+        matrix = CriteriaMatrix(len(scored))
+        outcomes = np.empty(len(scored), dtype=np.int8)
+        leagues = np.empty(len(scored), dtype=np.int64)
+        scored_ids = {fixture.id for fixture in scored}
+
+        row = 0
+        for fixture in chunk:
+            if fixture.id in scored_ids:
+                home_standing = state.standing(fixture.league_id, fixture.home_team_id)
+                away_standing = state.standing(fixture.league_id, fixture.away_team_id)
+                inputs = {
+                    'standings': {
+                        fixture.home_team_id: home_standing,
+                        fixture.away_team_id: away_standing
+                    },
+                    'forms': state.forms,
+                    # Injury history is not versioned, so availability is neutral
+                    'availability': {},
+                    'aggregations': aggregations,
+                    'odds': odds,
+                    'h2h': {
+                        frozenset((fixture.home_team_id, fixture.away_team_id)):
+                            state.head_to_head(fixture.home_team_id, fixture.away_team_id)
+                    }
+                }
+                matrix.set_row(
+                    row,
+                    engine._evaluate_criteria(fixture, inputs),
+                    close_standings=engine._teams_very_close_standings(home_standing, away_standing),
+                    derby=fixture.importance_level == 'Derby'
+                )
+                outcomes[row] = actual_outcome(fixture)
+                leagues[row] = fixture.league_id
+                row += 1
+
+            state.record(fixture)
+
+        if scored:
+            yield matrix, outcomes, leagues
+
+def summarize(predicted, actual):
+    """Accuracy report in the shape of PerformanceTracker"""
+    correct = predicted == actual
+    report = {
+        'total_predictions': int(len(predicted)),
+        'correct_predictions': int(correct.sum())
+    }
+    for code, name in ((HOME, 'home_win'), (DRAW, 'draw'), (AWAY, 'away_win')):
+        chosen = predicted == code
+        report[f'{name}_predictions'] = int(chosen.sum())
+        report[f'{name}_correct'] = int((chosen & correct).sum())
+        report[f'{name}_actual'] = int((actual == code).sum())
+    return report
+
+def merge_reports(reports):
+    """Sum several summarize() reports and add accuracy percentages"""
+    merged = {}
+    for report in reports:
+        for key, value in report.items():
+            merged[key] = merged.get(key, 0) + value
+
+    merged['accuracy_percentage'] = calculate_accuracy_percentage(
+        merged.get('correct_predictions', 0), merged.get('total_predictions', 0)
+    )
+    for name in ('home_win', 'draw', 'away_win'):
+        merged[f'{name}_accuracy'] = calculate_accuracy_percentage(
+            merged.get(f'{name}_correct', 0), merged.get(f'{name}_predictions', 0)
+        )
+    return merged
+
+def run_backtest(settings=None, league_ids=None, date_from=None, date_to=None):
+    """Backtest a settings snapshot against finished fixtures
+
+    The history is replayed once in kickoff order and each chunk is scored
+    as it is rebuilt, so memory stays bounded by the chunk size and the
+    replay state rather than the number of fixtures.
+    """
+    settings = settings or get_settings()
+    engine = PredictionEngine(settings=settings)
+    league_reports = {}
+
+    try:
+        for matrix, actual, leagues in replay_history(league_ids, date_from, date_to, engine):
+            predicted = score_matrix(matrix, settings.weights, settings.thresholds)['prediction']
+            for league_id in np.unique(leagues):
+                in_league = leagues == league_id
+                league_reports.setdefault(int(league_id), []).append(
+                    summarize(predicted[in_league], actual[in_league])
+                )
+    except Exception as e:
+        logging.error(f"Error backtesting: {e}")
+
+    by_league = {league_id: merge_reports(reports) for league_id, reports in league_reports.items()}
+    report = merge_reports(r for reports in league_reports.values() for r in reports)
+    report['leagues'] = by_league
+    report['settings_version'] = settings.version
+    return report
+
+def collect_history(league_ids=None, date_from=None, date_to=None):
+    """Point-in-time criteria for finished fixtures, in kickoff order
+
+    Returns the combined criteria matrix and actual outcome codes so that
+    many settings candidates can be scored without touching the database.
+    """
+    matrices = []
+    outcomes = []
+    for matrix, actual, _ in replay_history(league_ids, date_from, date_to):
+        matrices.append(matrix)
+        outcomes.append(actual)
+
+    actual = np.concatenate(outcomes) if outcomes else np.array([], dtype=np.int8)
+    return CriteriaMatrix.concatenate(matrices), actual
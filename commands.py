@@ -0,0 +1,143 @@
+import click
+from datetime import datetime
+from app import app
+
+def _parse_date(value):
+    """Parse a YYYY-MM-DD option value"""
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+@app.cli.command('backtest')
+@click.option('--from', 'date_from', help='First kickoff date (YYYY-MM-DD)')
+@click.option('--to', 'date_to', help='Last kickoff date (YYYY-MM-DD)')
+@click.option('--league', 'league_ids', type=int, multiple=True, help='League id, repeatable')
+def backtest_command(date_from, date_to, league_ids):
+    """Replay finished fixtures and report prediction accuracy"""
+    from backtest import run_backtest
+    
+    report = run_backtest(
+        league_ids=league_ids or None,
+        date_from=_parse_date(date_from),
+        date_to=_parse_date(date_to)
+    )
+    
+    click.echo(f"Fixtures: {report.get('total_predictions', 0)}  "
+               f"Correct: {report.get('correct_predictions', 0)}  "
+               f"Accuracy: {report['accuracy_percentage']}%")
+    for name, label in (('home_win', 'Home'), ('draw', 'Draw'), ('away_win', 'Away')):
+        click.echo(f"  {label:<5} predicted {report.get(f'{name}_predictions', 0):>6}  "
+                   f"correct {report.get(f'{name}_correct', 0):>6}  "
+                   f"actual {report.get(f'{name}_actual', 0):>6}  "
+                   f"accuracy {report[f'{name}_accuracy']}%")
+
+@app.cli.command('tune-weights')
+@click.option('--from', 'date_from', help='First kickoff date (YYYY-MM-DD)')
+@click.option('--to', 'date_to', help='Last kickoff date (YYYY-MM-DD)')
+@click.option('--league', 'league_ids', type=int, multiple=True, help='League id, repeatable')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+@click.option('--rounds', type=int, default=20, help='Maximum search rounds')
+@click.option('--candidates', type=int, default=64, help='Candidates per round')
+@click.option('--patience', type=int, default=4, help='Rounds without improvement before stopping')
+@click.option('--seed', type=int, default=None, help='Random seed')
+@click.option('--apply', 'apply_settings', is_flag=True, help='Save the best settings')
+def tune_weights_command(date_from, date_to, league_ids, workers, rounds, candidates, patience, seed, apply_settings):
+    """Search prediction weights and thresholds against finished fixtures"""
+    from weight_tuner import tune_weights, apply_tuned_settings
+    
+    result = tune_weights(
+        league_ids=league_ids or None,
+        date_from=_parse_date(date_from),
+        date_to=_parse_date(date_to),
+        workers=workers,
+        rounds=rounds,
+        candidates_per_round=candidates,
+        patience=patience,
+        seed=seed
+    )
+    if not result:
+        click.echo("No finished fixtures to tune against")
+        return
+    
+    click.echo(f"Fixtures: {result['fixtures']}  Candidates: {result['evaluated']}  Rounds: {result['rounds']}")
+    click.echo(f"Accuracy: {result['accuracy']}% (current {result['baseline_accuracy']}%)  "
+               f"Holdout: {result['holdout_accuracy']}% (current {result['baseline_holdout_accuracy']}%)")
+    for field, value in result['settings'].items():
+        click.echo(f"  {field} = {value}")
+    
+    if apply_settings:
+        if apply_tuned_settings(result['settings']):
+            click.echo("Settings applied")
+        else:
+            click.echo("Failed to apply settings")
+
+@app.cli.command('refresh-predictions')
+@click.option('--limit', type=int, default=500, help='Maximum predictions to re-score')
+def refresh_predictions_command(limit):
+    """Re-score upcoming predictions whose inputs have changed"""
+    from prediction_refresh import refresh_stale_predictions
+    
+    refreshed = refresh_stale_predictions(limit=limit)
+    click.echo(f"Refreshed {refreshed} stale predictions")
+
+@app.cli.command('predict-day')
+@click.option('--date', 'day', default=None, help='Kickoff date (YYYY-MM-DD, default: today)')
+@click.option('--league', 'league_ids', type=int, multiple=True, help='League id, repeatable')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+@click.option('--chunk-size', type=int, default=200, help='Fixtures scored and committed together')
+def predict_day_command(day, league_ids, workers, chunk_size):
+    """Predict every unpredicted or stale fixture on a day"""
+    from daily_predictions import predict_day
+    
+    day = _parse_date(day) or datetime.utcnow().date()
+    stats = predict_day(day, league_ids=league_ids or None, workers=workers, chunk_size=chunk_size)
+    
+    click.echo(f"Fixtures: {stats['fixtures']}  Created: {stats['created']}  "
+               f"Refreshed: {stats['refreshed']}  Failed: {stats['failed']}")
+    click.echo(f"Chunks: {stats['chunks']}  Workers: {stats['workers']}  "
+               f"Elapsed: {stats['elapsed_seconds']}s  ({stats['fixtures_per_second']} fixtures/s)")
+    click.echo(f"  select {stats['select_seconds']}s  score {stats['score_seconds']}s  "
+               f"write {stats['write_seconds']}s")
+
+@app.cli.command('aggregate-predictions')
+@click.option('--date', 'day', default=None, help='Kickoff date (YYYY-MM-DD, default: today)')
+def aggregate_predictions_command(day):
+    """Collect every prediction site's tips for a day, one listing page per site"""
+    from scraper import ScrapingService
+    
+    stats = ScrapingService().scrape_prediction_listings(_parse_date(day))
+    click.echo(f"Sites: {stats['sites']}  Listed: {stats['listed']}  "
+               f"Matched: {stats['matched']}  Fixtures: {stats['fixtures']}")
+
+@app.cli.command('ingest-fixtures')
+@click.option('--date', 'day', default=None, help='First fixture date (YYYY-MM-DD, default: today)')
+@click.option('--days', type=int, default=1, help='Number of days to load')
+@click.option('--league', 'league_ids', type=int, multiple=True, help='API-Football league id, repeatable')
+def ingest_fixtures_command(day, days, league_ids):
+    """Load API-Football fixtures into leagues, teams and fixtures"""
+    from scraper import ScrapingService
+    from api_football import get_api_client
+    
+    stats = ScrapingService().ingest_fixtures(_parse_date(day), days=days, league_ids=league_ids or None)
+    click.echo(f"Fixtures: {stats['fixtures']}  New leagues: {stats['leagues_created']}  "
+               f"New teams: {stats['teams_created']}  Finished: {stats['finished']}")
+    
+    quota = get_api_client().quota_status()
+    click.echo(f"API requests: {quota['requests']}  "
+               f"Daily quota remaining: {quota['daily_remaining']}/{quota['daily_limit']}")
+
+@app.cli.command('rebuild-history')
+def rebuild_history_command():
+    """Rebuild head-to-head summaries and team form from finished fixtures"""
+    from match_history import rebuild_match_history
+    
+    pairs = rebuild_match_history()
+    click.echo(f"Rebuilt {pairs} head-to-head summaries and team form")
+
+@app.cli.command('run-scheduler')
+@click.option('--workers', type=int, default=None, help='Worker threads (default: SCHEDULER_WORKERS)')
+def run_scheduler_command(workers):
+    """Run the scraping and prediction job scheduler until interrupted"""
+    from scheduler import start_in_process_scheduler
+    
+    scheduler = start_in_process_scheduler(workers or app.config["SCHEDULER_WORKERS"])
+    click.echo(f"Scheduler running with {scheduler.workers} workers (Ctrl+C to stop)")
+    scheduler.run_forever()
@@ -0,0 +1,121 @@
+import logging
+import os
+import time as timer
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+from app import app, db
+from models import Fixture, Prediction
+from prediction_engine import PredictionEngine
+from prediction_refresh import bulk_save_predictions
+from workers import init_worker
+
+# Fixtures scored and committed together
+CHUNK_SIZE = 200
+
+def fixtures_to_predict(day, league_ids=None):
+    """Upcoming fixtures on a day without a fresh prediction
+
+    Returns (fixture, stale prediction id or None) pairs ordered by kickoff,
+    where each fixture is a row carrying id, home_team_id and away_team_id.
+    """
+    fresh = db.select(Prediction.fixture_id).where(
+        db.or_(Prediction.is_stale == False, Prediction.is_stale.is_(None))
+    )
+    stale = db.select(
+        Prediction.fixture_id, db.func.max(Prediction.id).label('prediction_id')
+    ).where(Prediction.is_stale == True).group_by(Prediction.fixture_id).subquery()
+
+    query = db.session.query(
+        Fixture.id, Fixture.home_team_id, Fixture.away_team_id, stale.c.prediction_id
+    ).outerjoin(
+        stale, stale.c.fixture_id == Fixture.id
+    ).filter(
+        Fixture.kickoff_time >= datetime.combine(day, time.min),
+        Fixture.kickoff_time < datetime.combine(day + timedelta(days=1), time.min),
+        Fixture.status == 'Not Started',
+        Fixture.id.not_in(fresh)
+    )
+    if league_ids:
+        query = query.filter(Fixture.league_id.in_(league_ids))
+
+    return [(row, row.prediction_id) for row in query.order_by(Fixture.kickoff_time, Fixture.id)]
+
+def _score_chunk(fixture_ids):
+    """Score a chunk of fixtures, returning (fixture id, result) pairs"""
+    with app.app_context():
+        try:
+            fixtures = Fixture.query.filter(Fixture.id.in_(fixture_ids)).order_by(Fixture.id).all()
+            results = PredictionEngine().predict_many(fixtures)
+            return [(fixture.id, result) for fixture, result in zip(fixtures, results)]
+        except Exception as e:
+            logging.error(f"Error scoring fixture chunk: {e}")
+            return []
+
+def predict_day(day, league_ids=None, workers=None, chunk_size=CHUNK_SIZE):
+    """Create or refresh predictions for every upcoming fixture on a day
+
+    Fixtures are scored in chunks, across a process pool when more than one
+    worker is requested. The parent process writes each chunk with bulk
+    statements and commits it before moving on, so a failure only loses the
+    chunk in progress.
+    """
+    started = timer.perf_counter()
+    pending = fixtures_to_predict(day, league_ids)
+    stats = {
+        'fixtures': len(pending),
+        'chunks': 0,
+        'created': 0,
+        'refreshed': 0,
+        'failed': 0,
+        'workers': 0,
+        'select_seconds': round(timer.perf_counter() - started, 2),
+        'score_seconds': 0.0,
+        'write_seconds': 0.0
+    }
+    if not pending:
+        stats['elapsed_seconds'] = stats['select_seconds']
+        stats['fixtures_per_second'] = 0.0
+        return stats
+
+    rows = {row.id: row for row, _ in pending}
+    existing = {row.id: prediction_id for row, prediction_id in pending if prediction_id}
+    ids = [row.id for row, _ in pending]
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker) if workers > 1 else None
+    try:
+        scored_chunks = pool.map(_score_chunk, chunks) if pool else map(_score_chunk, chunks)
+        score_started = timer.perf_counter()
+        for chunk, scored in zip(chunks, scored_chunks):
+            write_started = timer.perf_counter()
+            stats['score_seconds'] += write_started - score_started
+
+            try:
+                created, refreshed = bulk_save_predictions(
+                    [(rows[fixture_id], result) for fixture_id, result in scored], existing
+                )
+                db.session.commit()
+                stats['created'] += created
+                stats['refreshed'] += refreshed
+                stats['failed'] += len(chunk) - len(scored)
+            except Exception as e:
+                logging.error(f"Error saving prediction chunk: {e}")
+                db.session.rollback()
+                stats['failed'] += len(chunk)
+
+            stats['chunks'] += 1
+            score_started = timer.perf_counter()
+            stats['write_seconds'] += score_started - write_started
+    finally:
+        if pool:
+            pool.shutdown()
+
+    elapsed = timer.perf_counter() - started
+    stats['score_seconds'] = round(stats['score_seconds'], 2)
+    stats['write_seconds'] = round(stats['write_seconds'], 2)
+    stats['elapsed_seconds'] = round(elapsed, 2)
+    stats['fixtures_per_second'] = round((stats['created'] + stats['refreshed']) / elapsed, 1) if elapsed else 0.0
+    stats['workers'] = workers
+    logging.info(f"Predicted {stats['created'] + stats['refreshed']} fixtures for {day} in {elapsed:.1f}s")
+    return stats
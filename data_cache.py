@@ -0,0 +1,330 @@
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import app, db
+from models import CacheManagement, Fixture, League, Player, Prediction, Team
+from utils import generate_cache_key
+
+# Defaults for the in-process tier
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL = 300
+
+# How long a process trusts its copy of a namespace version before
+# re-reading it from the shared tier, and how long the shared copy lives
+VERSION_TTL = 5
+VERSION_KEY_TTL = 30 * 24 * 3600
+
+# Returned by the tiers on a miss, since None is a cacheable value
+MISSING = object()
+
+# Namespaces dropped when rows of these models change
+NAMESPACE_MODELS = {
+    'calendar': (Fixture, Prediction, Team, League),
+    'search': (Team, League, Player)
+}
+
+class MemoryCache:
+    """Thread-safe LRU of values with per-entry expiry
+
+    Holds at most max_entries values; adding one more evicts the least
+    recently used. Values are returned as stored, so callers must not
+    mutate them.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear_expired(self):
+        """Drop expired entries, returning how many were dropped"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, expires) in self._entries.items() if expires <= now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+class DatabaseCacheBackend:
+    """Shared tier on the CacheManagement table, seen by every process
+
+    Values are stored as JSON. Reads and writes run on their own
+    connection, so they never commit or roll back the caller's session.
+    """
+
+    def get(self, key):
+        """(value, seconds until it expires), or MISSING"""
+        now = datetime.utcnow()
+        with db.engine.connect() as connection:
+            row = connection.execute(
+                db.select(CacheManagement.cache_data, CacheManagement.expiry_time).where(
+                    CacheManagement.cache_key == key,
+                    CacheManagement.expiry_time > now
+                )
+            ).first()
+        if row is None:
+            return MISSING
+        return json.loads(row.cache_data), (row.expiry_time - now).total_seconds()
+
+    def set(self, key, value, ttl):
+        now = datetime.utcnow()
+        dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+        statement = dialect.insert(CacheManagement).values(
+            cache_key=key, cache_data=json.dumps(value), expiry_time=now + timedelta(seconds=ttl), created_at=now
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[CacheManagement.cache_key],
+            set_={
+                'cache_data': statement.excluded.cache_data,
+                'expiry_time': statement.excluded.expiry_time,
+                'created_at': statement.excluded.created_at
+            }
+        )
+        with db.engine.begin() as connection:
+            connection.execute(statement)
+
+    def add(self, key, value, ttl):
+        """Store a value only if the key is absent or expired; True when stored"""
+        now = datetime.utcnow()
+        dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+        statement = dialect.insert(CacheManagement).values(
+            cache_key=key, cache_data=json.dumps(value), expiry_time=now + timedelta(seconds=ttl), created_at=now
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[CacheManagement.cache_key],
+            set_={
+                'cache_data': statement.excluded.cache_data,
+                'expiry_time': statement.excluded.expiry_time,
+                'created_at': statement.excluded.created_at
+            },
+            where=CacheManagement.expiry_time <= now
+        )
+        with db.engine.begin() as connection:
+            return connection.execute(statement).rowcount == 1
+
+    def delete(self, key):
+        with db.engine.begin() as connection:
+            connection.execute(db.delete(CacheManagement).where(CacheManagement.cache_key == key))
+
+    def clear_expired(self):
+        with db.engine.begin() as connection:
+            return connection.execute(
+                db.delete(CacheManagement).where(CacheManagement.expiry_time < datetime.utcnow())
+            ).rowcount
+
+class DataCache:
+    """Two-tier cache of computed data: in-process LRU in front of a shared backend
+
+    Keys are namespaced ('search', 'calendar', ...) and carry the
+    namespace's current version, so invalidating a namespace only writes a
+    new version; entries under the old one are never read again and expire
+    on their own. Other processes pick up a new version within VERSION_TTL.
+    A shared hit is copied into memory for what is left of its shared TTL.
+    Values that cannot be stored as JSON stay in the memory tier only.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, shared=None):
+        self.memory = MemoryCache(max_entries)
+        self.shared = shared
+        self._counters = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _count(self, namespace, counter):
+        with self._lock:
+            counters = self._counters.setdefault(
+                namespace, {'memory_hits': 0, 'shared_hits': 0, 'misses': 0, 'sets': 0, 'shared_errors': 0}
+            )
+            counters[counter] += 1
+
+    def _version(self, namespace):
+        """Current version of a namespace, re-read from the shared tier every VERSION_TTL"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._versions.get(namespace)
+        if entry is not None and (entry[1] > now or self.shared is None):
+            return entry[0]
+
+        version = entry[0] if entry is not None else '0'
+        if self.shared is not None:
+            try:
+                stored = self.shared.get(f"version:{namespace}")
+                if stored is not MISSING:
+                    version = stored[0]
+            except Exception as e:
+                logging.error(f"Error reading shared cache version of {namespace}: {e}")
+        with self._lock:
+            self._versions[namespace] = (version, now + VERSION_TTL)
+        return version
+
+    def key(self, namespace, *args):
+        """Namespaced key for a set of arguments under the namespace's current version"""
+        return f"{namespace}:{self._version(namespace)}:{generate_cache_key(namespace, *args)}"
+
+    def get(self, namespace, key, ttl=DEFAULT_TTL):
+        """Cached value, or MISSING"""
+        value = self.memory.get(key)
+        if value is not MISSING:
+            self._count(namespace, 'memory_hits')
+            return value
+
+        if self.shared is not None:
+            try:
+                entry = self.shared.get(key)
+            except Exception as e:
+                logging.error(f"Error reading shared cache {key}: {e}")
+                self._count(namespace, 'shared_errors')
+                entry = MISSING
+            if entry is not MISSING:
+                value, remaining = entry
+                self.memory.set(key, value, min(ttl, remaining))
+                self._count(namespace, 'shared_hits')
+                return value
+
+        self._count(namespace, 'misses')
+        return MISSING
+
+    def set(self, namespace, key, value, ttl=DEFAULT_TTL, shared=True):
+        """Store a value in memory and, when it is JSON-serializable, in the shared tier"""
+        self.memory.set(key, value, ttl)
+        self._count(namespace, 'sets')
+        if self.shared is None or not shared:
+            return
+
+        try:
+            self.shared.set(key, value, ttl)
+        except (TypeError, ValueError):
+            logging.debug(f"Keeping {key} in memory only, it is not JSON data")
+        except Exception as e:
+            logging.error(f"Error writing shared cache {key}: {e}")
+            self._count(namespace, 'shared_errors')
+
+    def invalidate(self, namespace):
+        """Retire every entry in a namespace by moving it to a new version"""
+        version = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._versions[namespace] = (version, time.monotonic() + VERSION_TTL)
+        self.memory.delete_prefix(f"{namespace}:")
+        if self.shared is not None:
+            try:
+                self.shared.set(f"version:{namespace}", version, VERSION_KEY_TTL)
+            except Exception as e:
+                logging.error(f"Error invalidating shared cache {namespace}: {e}")
+
+    def clear_expired(self):
+        """Drop expired entries from both tiers, returning (memory, shared) counts"""
+        shared = self.shared.clear_expired() if self.shared is not None else 0
+        return self.memory.clear_expired(), shared
+
+    def stats(self):
+        """Per-namespace counters plus the memory tier's size and evictions"""
+        with self._lock:
+            namespaces = {namespace: dict(counters) for namespace, counters in self._counters.items()}
+        return {
+            'entries': len(self.memory),
+            'max_entries': self.memory.max_entries,
+            'evictions': self.memory.evictions,
+            'shared': self.shared is not None,
+            'namespaces': namespaces
+        }
+
+_data_cache = None
+
+def get_data_cache():
+    """The process-wide data cache, created on first use"""
+    global _data_cache
+    if _data_cache is None:
+        _data_cache = DataCache(
+            app.config.get('DATA_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+            DatabaseCacheBackend() if app.config.get('DATA_CACHE_SHARED', True) else None
+        )
+    return _data_cache
+
+def cached(namespace, ttl=DEFAULT_TTL, shared=True):
+    """Cache a function's return value under its namespace and arguments
+
+    Arguments are part of the key through their str(); pass ids rather
+    than ORM objects. Use shared=False for values that are not JSON data.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_data_cache()
+            key = cache.key(namespace, func.__qualname__, *args, *sorted(kwargs.items()))
+            value = cache.get(namespace, key, ttl)
+            if value is MISSING:
+                value = func(*args, **kwargs)
+                cache.set(namespace, key, value, ttl, shared)
+            return value
+
+        wrapper.invalidate = lambda: get_data_cache().invalidate(namespace)
+        return wrapper
+    return decorator
+
+def _note_namespaces(session, models):
+    """Remember the namespaces that changed rows of these models invalidate"""
+    changed = session.info.setdefault('data_cache_changed', set())
+    for namespace, namespace_models in NAMESPACE_MODELS.items():
+        if any(issubclass(model, namespace_models) for model in models):
+            changed.add(namespace)
+
+@event.listens_for(Session, 'after_flush')
+def _note_flushed_changes(session, flush_context):
+    """Remember cached namespaces a flush made stale"""
+    _note_namespaces(session, {type(obj) for obj in list(session.new) + list(session.dirty) + list(session.deleted)})
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_bulk_changes(orm_execute_state):
+    """Remember cached namespaces that bulk inserts/updates made stale (e.g. live scores)"""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        _note_namespaces(orm_execute_state.session, {mapper.class_})
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    """Drop stale namespaces once the changes are committed"""
+    for namespace in session.info.pop('data_cache_changed', ()):
+        get_data_cache().invalidate(namespace)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session):
+    session.info.pop('data_cache_changed', None)
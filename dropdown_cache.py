@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from models import League, Team
+
+# Upper bound on how stale another process's changes can leave the options
+MAX_AGE = 300.0
+
+DropdownOption = namedtuple('DropdownOption', ['id', 'name'])
+
+_lock = threading.Lock()
+_options = None
+_loaded_at = 0.0
+
+def get_dropdown_options():
+    """League and team (id, name) options for the filter dropdowns
+
+    Served from memory; reloaded with two narrow queries after a league or
+    team changes in this process, or after MAX_AGE seconds.
+    """
+    global _options, _loaded_at
+
+    with _lock:
+        if _options is not None and time.monotonic() - _loaded_at < MAX_AGE:
+            return _options
+
+        try:
+            _options = {
+                'leagues': [DropdownOption(*row) for row in
+                            db.session.query(League.id, League.name).order_by(League.name, League.id)],
+                'teams': [DropdownOption(*row) for row in
+                          db.session.query(Team.id, Team.name).order_by(Team.name, Team.id)]
+            }
+            _loaded_at = time.monotonic()
+
+        except Exception as e:
+            logging.error(f"Error loading dropdown options: {e}")
+            if _options is None:
+                return {'leagues': [], 'teams': []}
+
+        return _options
+
+def invalidate_dropdowns():
+    """Reload the options on next access"""
+    global _loaded_at
+    _loaded_at = 0.0
+
+@event.listens_for(Session, 'after_flush')
+def _note_flushed_changes(session, flush_context):
+    """Remember that a flush wrote a league or team"""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (League, Team)):
+            session.info['dropdowns_changed'] = True
+            return
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_bulk_changes(orm_execute_state):
+    """Remember bulk inserts/updates of leagues or teams (e.g. fixture ingestion)"""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (League, Team):
+        orm_execute_state.session.info['dropdowns_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    """Drop the options once league/team changes are committed"""
+    if session.info.pop('dropdowns_changed', False):
+        invalidate_dropdowns()
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session):
+    session.info.pop('dropdowns_changed', None)
@@ -0,0 +1,309 @@
+import logging
+from datetime import datetime, timezone
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from models import League, Team, Fixture
+from match_history import apply_finished_fixtures
+from utils import normalize_team_name
+
+# Fixture rows per multi-row upsert statement
+UPSERT_BATCH_SIZE = 500
+
+# API-Football short status codes to the statuses the app displays
+STATUS_MAP = {
+    'TBD': 'Not Started',
+    'NS': 'Not Started',
+    '1H': '1st Half',
+    'HT': 'Half Time',
+    '2H': '2nd Half',
+    'ET': 'In Progress',
+    'BT': 'In Progress',
+    'P': 'In Progress',
+    'INT': 'In Progress',
+    'LIVE': 'In Progress',
+    'FT': 'Finished',
+    'AET': 'Finished',
+    'PEN': 'Finished',
+    'SUSP': 'Postponed',
+    'PST': 'Postponed',
+    'CANC': 'Cancelled',
+    'ABD': 'Cancelled',
+    'AWD': 'Finished',
+    'WO': 'Finished'
+}
+
+# Columns refreshed when a fixture is seen again
+UPDATED_COLUMNS = [
+    'home_team_id', 'away_team_id', 'league_id', 'kickoff_time', 'status',
+    'home_score', 'away_score', 'venue', 'referee', 'round_info', 'change_seq'
+]
+
+class EntityIndex:
+    """External id and name key -> primary key for leagues or teams
+
+    Built from one query so each payload row is resolved in memory. Name
+    keys are the normalized name, plus the country for leagues; leagues
+    are also keyed per season, since a league row is one season. A payload
+    with an external id only falls back to the name for rows that have no
+    external id yet, so rows already tied to another API entity are never
+    reused or relabelled.
+    """
+
+    def __init__(self, per_season=False):
+        self.per_season = per_season
+        self.by_external_id = {}
+        self.by_name = {}
+        self.unclaimed = {}
+
+    def _key(self, value, season):
+        return (value, season) if self.per_season else value
+
+    def add(self, pk, external_id, name_key, season=None):
+        if not name_key[0]:
+            name_key = None
+        if external_id is not None:
+            self.by_external_id[self._key(external_id, season)] = pk
+        elif name_key:
+            self.unclaimed.setdefault(self._key(name_key, season), pk)
+        if name_key:
+            self.by_name.setdefault(self._key(name_key, season), pk)
+
+    def find(self, external_id, name_key, season=None):
+        """Primary key by external id, falling back to the name key"""
+        if external_id is None:
+            return self.by_name.get(self._key(name_key, season))
+        pk = self.by_external_id.get(self._key(external_id, season))
+        if pk is not None:
+            return pk
+        return self.unclaimed.get(self._key(name_key, season))
+
+    def claim(self, pk, external_id, name_key, season=None):
+        """Record that a row found by name now carries an external id"""
+        self.by_external_id[self._key(external_id, season)] = pk
+        self.unclaimed.pop(self._key(name_key, season), None)
+
+def _league_key(name, country):
+    return (normalize_team_name(name), (country or 'World').strip().lower())
+
+def _team_key(name):
+    return (normalize_team_name(name),)
+
+def _league_index():
+    index = EntityIndex(per_season=True)
+    for pk, external_id, name, country, season in db.session.query(
+        League.id, League.external_id, League.name, League.country, League.season
+    ):
+        index.add(pk, external_id, _league_key(name, country), season)
+    return index
+
+def _team_index():
+    index = EntityIndex()
+    for pk, external_id, name in db.session.query(Team.id, Team.external_id, Team.name):
+        index.add(pk, external_id, _team_key(name))
+    return index
+
+def _kickoff_time(value):
+    """Naive UTC datetime from an API ISO-8601 timestamp"""
+    kickoff = datetime.fromisoformat(value)
+    if kickoff.tzinfo:
+        kickoff = kickoff.astimezone(timezone.utc).replace(tzinfo=None)
+    return kickoff
+
+def fixture_status(payload):
+    """Display status for a payload, preferring the short code"""
+    return STATUS_MAP.get(payload.get('status_short'), payload.get('status') or 'Not Started')
+
+def _insert_returning(model, rows, *columns):
+    """Bulk insert rows, returning the requested columns in input order"""
+    if not rows:
+        return []
+    return db.session.execute(
+        db.insert(model).returning(model.id, *columns, sort_by_parameter_order=True), rows
+    ).all()
+
+def _payload_season(payload):
+    return str(payload.get('season') or '') or None
+
+def _resolve_leagues(payloads):
+    """League primary key for every payload, creating missing leagues in bulk"""
+    index = _league_index()
+    missing = {}
+    backfill = {}
+    for payload in payloads:
+        season = _payload_season(payload)
+        external_id = payload.get('league_external_id')
+        name_key = _league_key(payload['league'], payload.get('league_country'))
+        pk = index.find(external_id, name_key, season)
+        if pk is None:
+            missing.setdefault((external_id, name_key, season), {
+                'name': payload['league'],
+                'country': payload.get('league_country') or 'World',
+                'season': season,
+                'external_id': external_id
+            })
+        elif external_id is not None and index.by_external_id.get((external_id, season)) != pk:
+            # Found by name on a row without an external id
+            backfill[pk] = external_id
+            index.claim(pk, external_id, name_key, season)
+
+    if backfill:
+        db.session.execute(db.update(League), [{'id': pk, 'external_id': ext} for pk, ext in backfill.items()])
+    for pk, external_id, name, country, season in _insert_returning(
+        League, list(missing.values()), League.external_id, League.name, League.country, League.season
+    ):
+        index.add(pk, external_id, _league_key(name, country), season)
+
+    return [
+        index.find(p.get('league_external_id'), _league_key(p['league'], p.get('league_country')),
+                   _payload_season(p))
+        for p in payloads
+    ], len(missing)
+
+def _resolve_teams(payloads, league_ids):
+    """(home, away) team primary keys for every payload, creating missing teams in bulk"""
+    index = _team_index()
+    missing = {}
+    backfill = {}
+    for payload, league_id in zip(payloads, league_ids):
+        for side in ('home', 'away'):
+            name = payload[f'{side}_team']
+            external_id = payload.get(f'{side}_team_external_id')
+            pk = index.find(external_id, _team_key(name))
+            if pk is None:
+                missing.setdefault(external_id if external_id is not None else _team_key(name), {
+                    'name': name,
+                    'league_id': league_id,
+                    'external_id': external_id
+                })
+            elif external_id is not None and index.by_external_id.get(external_id) != pk:
+                # Found by name on a row without an external id
+                backfill[pk] = external_id
+                index.claim(pk, external_id, _team_key(name))
+
+    if backfill:
+        db.session.execute(db.update(Team), [{'id': pk, 'external_id': ext} for pk, ext in backfill.items()])
+    for pk, external_id, name in _insert_returning(Team, list(missing.values()), Team.external_id, Team.name):
+        index.add(pk, external_id, _team_key(name))
+
+    return [
+        (index.find(p.get('home_team_external_id'), _team_key(p['home_team'])),
+         index.find(p.get('away_team_external_id'), _team_key(p['away_team'])))
+        for p in payloads
+    ], len(missing)
+
+def _adopt_existing_fixtures(rows):
+    """Give fixtures created before ingestion (without an API id) their external id
+
+    Matched on teams and kickoff time, so the upsert updates them instead
+    of inserting duplicates.
+    """
+    kickoffs = [row['kickoff_time'] for row in rows]
+    unmatched = db.session.query(
+        Fixture.id, Fixture.home_team_id, Fixture.away_team_id, Fixture.kickoff_time
+    ).filter(
+        Fixture.external_id.is_(None),
+        Fixture.kickoff_time >= min(kickoffs),
+        Fixture.kickoff_time <= max(kickoffs)
+    )
+    by_match = {(f.home_team_id, f.away_team_id, f.kickoff_time): f.id for f in unmatched}
+    if not by_match:
+        return
+
+    updates = [
+        {'id': by_match[key], 'external_id': row['external_id']}
+        for row in rows
+        for key in [(row['home_team_id'], row['away_team_id'], row['kickoff_time'])]
+        if key in by_match
+    ]
+    if updates:
+        db.session.execute(db.update(Fixture), updates)
+
+def _upsert_statement(rows):
+    """Multi-row INSERT ... ON CONFLICT (external_id) DO UPDATE for the current dialect"""
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    statement = dialect.insert(Fixture).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[Fixture.external_id],
+        set_={column: getattr(statement.excluded, column) for column in UPDATED_COLUMNS}
+    )
+
+def ingest_fixtures(payloads):
+    """Load API-Football fixture payloads into League, Team and Fixture rows
+
+    Leagues and teams are resolved through in-memory indexes and missing
+    ones are created with one bulk insert each. Fixtures are upserted by
+    their API id in multi-row statements. The upsert bypasses the ORM, so
+    fixtures that finish here are passed to the match history directly.
+    New fixtures and ones whose status or score changed get the next
+    change sequence number, so live clients see them.
+    """
+    from live_scores import next_change_seq
+
+    stats = {'fixtures': 0, 'leagues_created': 0, 'teams_created': 0, 'finished': 0}
+    payloads = [p for p in payloads if p.get('id') is not None]
+    if not payloads:
+        return stats
+
+    try:
+        # Later payloads for the same fixture win
+        payloads = list({p['id']: p for p in payloads}.values())
+        league_ids, stats['leagues_created'] = _resolve_leagues(payloads)
+        team_ids, stats['teams_created'] = _resolve_teams(payloads, league_ids)
+
+        rows = []
+        for payload, league_id, (home_team_id, away_team_id) in zip(payloads, league_ids, team_ids):
+            rows.append({
+                'external_id': payload['id'],
+                'home_team_id': home_team_id,
+                'away_team_id': away_team_id,
+                'league_id': league_id,
+                'kickoff_time': _kickoff_time(payload['kickoff_time']),
+                'status': fixture_status(payload),
+                'home_score': payload.get('home_score'),
+                'away_score': payload.get('away_score'),
+                'venue': payload.get('venue'),
+                'referee': payload.get('referee'),
+                'round_info': payload.get('round'),
+                'created_at': datetime.utcnow()
+            })
+
+        _adopt_existing_fixtures(rows)
+        previous = {
+            external_id: (status, home_score, away_score, change_seq)
+            for external_id, status, home_score, away_score, change_seq in db.session.query(
+                Fixture.external_id, Fixture.status, Fixture.home_score, Fixture.away_score, Fixture.change_seq
+            ).filter(Fixture.external_id.in_([row['external_id'] for row in rows]))
+        }
+        seq = None
+        for row in rows:
+            prior = previous.get(row['external_id'])
+            if prior is not None and prior[:3] == (row['status'], row['home_score'], row['away_score']):
+                row['change_seq'] = prior[3]
+            else:
+                seq = seq or next_change_seq()
+                row['change_seq'] = seq
+        
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            db.session.execute(_upsert_statement(rows[start:start + UPSERT_BATCH_SIZE]))
+
+        newly_finished = [
+            row['external_id'] for row in rows
+            if row['status'] == 'Finished' and previous.get(row['external_id'], (None,))[0] != 'Finished'
+        ]
+        if newly_finished:
+            apply_finished_fixtures(db.session.query(
+                Fixture.id, Fixture.home_team_id, Fixture.away_team_id,
+                Fixture.home_score, Fixture.away_score, Fixture.kickoff_time
+            ).filter(Fixture.external_id.in_(newly_finished)).all(), db.session)
+
+        db.session.commit()
+        stats['fixtures'] = len(rows)
+        stats['finished'] = len(newly_finished)
+        logging.info(f"Ingested {len(rows)} fixtures ({stats['leagues_created']} new leagues, "
+                     f"{stats['teams_created']} new teams)")
+        return stats
+
+    except Exception as e:
+        logging.error(f"Error ingesting fixtures: {e}")
+        db.session.rollback()
+        return stats
@@ -0,0 +1,161 @@
+import atexit
+import functools
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+# Pages at least this large are parsed in the process pool
+LARGE_PAGE_BYTES = 256 * 1024
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+# "Home vs Away", "Home v Away" or "Home - Away" in a listing row
+MATCH_PATTERN = re.compile(r'^(.*?[a-z].*?)\s+(?:vs?\.?|-|–)\s+(.*?[a-z].*)$', re.IGNORECASE)
+PERCENT_PATTERN = re.compile(r'(\d{1,3}(?:\.\d+)?)\s*%')
+# A site's own confidence cell may hold a bare number
+NUMBER_PATTERN = re.compile(r'(\d{1,3}(?:\.\d+)?)')
+TIP_OUTCOMES = {'1': 'Home', 'X': 'Draw', '2': 'Away'}
+
+# CSS selectors for a tips listing. 'row' selects one element per match
+# and 'cells' its cells for the generic heuristics; a site may instead
+# name 'home', 'away', 'tip' and 'confidence' selectors within a row.
+DEFAULT_LISTING_SELECTORS = {'row': 'tr', 'cells': 'td, th'}
+
+# Per-site overrides, keyed by site name. Sites without an entry use the
+# table heuristics above.
+SITE_LISTING_SELECTORS = {
+    # One div per match; the tip is 1/X/2 and its probability is the
+    # highlighted figure (without a % sign) of the three shown
+    'forebet': {
+        'row': 'div.rcnt',
+        'home': '.homeTeam',
+        'away': '.awayTeam',
+        'tip': '.forepr',
+        'confidence': '.fprc .fpr'
+    }
+}
+
+def parse_document(content):
+    """lxml element tree of an HTML page, or None for an empty page"""
+    if not content or not content.strip():
+        return None
+    return lxml.html.fromstring(content)
+
+@functools.lru_cache(maxsize=256)
+def _compiled(selector):
+    """CSS selector compiled to XPath once per process"""
+    return CSSSelector(selector)
+
+def select(element, selector):
+    """Elements under (or at) element matching a CSS selector"""
+    return _compiled(selector)(element)
+
+def text_of(element):
+    """Element text with each piece stripped and joined by single spaces"""
+    return ' '.join(piece.strip() for piece in element.itertext() if piece.strip())
+
+def listing_selectors(site_name):
+    """Selectors for a site's tips listing"""
+    return dict(DEFAULT_LISTING_SELECTORS, **SITE_LISTING_SELECTORS.get(site_name, {}))
+
+def _text(row, selector):
+    elements = select(row, selector) if selector else []
+    return text_of(elements[0]) if elements else ''
+
+def _row_match(row, selectors):
+    """A match dict from a listing row, or None"""
+    if 'home' in selectors and 'away' in selectors:
+        home, away = _text(row, selectors['home']), _text(row, selectors['away'])
+        tip = TIP_OUTCOMES.get(_text(row, selectors.get('tip')).upper())
+        confidence = _text(row, selectors.get('confidence'))
+        percent = PERCENT_PATTERN.search(confidence) or NUMBER_PATTERN.fullmatch(confidence)
+        if not home or not away or not tip:
+            return None
+    else:
+        # Generic heuristics: one cell reads "Home vs Away", another is a bare 1/X/2
+        cells = [text_of(cell) for cell in select(row, selectors['cells'])]
+        teams = next((MATCH_PATTERN.match(cell) for cell in cells if MATCH_PATTERN.match(cell)), None)
+        tip = next((TIP_OUTCOMES[cell.upper()] for cell in cells if cell.upper() in TIP_OUTCOMES), None)
+        if not teams or not tip:
+            return None
+        home, away = teams.group(1).strip(), teams.group(2).strip()
+        percent = next((PERCENT_PATTERN.search(cell) for cell in cells if PERCENT_PATTERN.search(cell)), None)
+
+    return {
+        'home_team': home,
+        'away_team': away,
+        'prediction': tip,
+        'confidence': float(percent.group(1)) if percent else 0.0
+    }
+
+def parse_prediction_listing(content, selectors=None):
+    """Matches on a 1X2 tips listing page"""
+    selectors = selectors or DEFAULT_LISTING_SELECTORS
+    document = parse_document(content)
+    if document is None:
+        return []
+    matches = []
+    for row in select(document, selectors['row']):
+        match = _row_match(row, selectors)
+        if match:
+            matches.append(match)
+    return matches
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _parse_pool():
+    """Process pool for large pages, started on first use
+
+    Workers are spawned rather than forked, since the callers are threads
+    of a web or scheduler process whose locks a fork would copy mid-use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+@atexit.register
+def shutdown_parse_pool():
+    """Stop the parse workers, if started; the next large batch starts new ones"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def parse_listings(pages):
+    """Parse many listing pages, large ones in parallel worker processes
+
+    `pages` maps a key to (content, selectors); returns key -> matches.
+    Small pages are parsed inline, where shipping them to a worker would
+    cost more than the parse itself, as is everything on a single core.
+    """
+    large = {key: page for key, page in pages.items() if len(page[0]) >= LARGE_PAGE_BYTES}
+    futures = {}
+    if len(large) > 1 and PARSE_WORKERS > 1:
+        pool = _parse_pool()
+        futures = {key: pool.submit(parse_prediction_listing, *page) for key, page in large.items()}
+
+    results = {}
+    for key, (content, selectors) in pages.items():
+        if key in futures:
+            continue
+        try:
+            results[key] = parse_prediction_listing(content, selectors)
+        except Exception as e:
+            logging.error(f"Error parsing listing {key}: {e}")
+            results[key] = []
+
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            logging.error(f"Error parsing listing {key}: {e}")
+            results[key] = []
+    return results
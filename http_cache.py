@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from app import app
+from rate_limiter import RateLimitedAdapter
+
+# Default on-disk budget for cached bodies
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+class HttpCache:
+    """Persistent store of GET responses with their validators
+
+    Entries live in a SQLite file so they survive restarts and are shared
+    by every process on the host. When the stored bodies exceed max_bytes
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.counters = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            "url TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB, "
+            "etag TEXT, last_modified TEXT, expires REAL, size INTEGER, last_access REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_http_cache_access ON http_cache (last_access)")
+
+    def get(self, url):
+        """Cached entry for a URL as a dict, or None"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, headers, body, etag, last_modified, expires FROM http_cache WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE http_cache SET last_access = ? WHERE url = ?", (time.time(), url))
+
+        status, headers, body, etag, last_modified, expires = row
+        return {
+            'status': status,
+            'headers': json.loads(headers),
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'expires': expires
+        }
+
+    def store(self, url, status, headers, body):
+        """Save a response and evict least recently used entries over budget"""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(dict(headers)), body, headers.get('ETag'),
+                 headers.get('Last-Modified'), now + freshness_lifetime(headers), len(body), now)
+            )
+            self.counters['stored'] += 1
+            self._evict()
+
+    def refresh(self, url, headers):
+        """Extend an entry's freshness after the server answered 304"""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE http_cache SET expires = ?, last_access = ? WHERE url = ?",
+                (time.time() + freshness_lifetime(headers), time.time(), url)
+            )
+
+    def _evict(self):
+        """Drop least recently used entries until the bodies fit the budget"""
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for url, size in self._connection.execute(
+            "SELECT url, size FROM http_cache ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._connection.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+            total -= size
+            self.counters['evicted'] += 1
+
+    def count(self, counter):
+        """Bump one of the hit/miss counters"""
+        with self._lock:
+            self.counters[counter] += 1
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._connection.execute("DELETE FROM http_cache")
+
+    def stats(self):
+        """Counters for this process plus the size of the shared store"""
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache"
+            ).fetchone()
+        return dict(self.counters, entries=entries, bytes=size, max_bytes=self.max_bytes)
+
+def freshness_lifetime(headers):
+    """Seconds a response may be served without revalidation"""
+    cache_control = headers.get('Cache-Control', '').lower()
+    if 'no-cache' in cache_control:
+        return 0
+    match = MAX_AGE_PATTERN.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+def is_cacheable(response):
+    """Whether a response can be stored and reused"""
+    if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', '').lower():
+        return False
+    return bool(
+        response.headers.get('ETag') or response.headers.get('Last-Modified') or
+        freshness_lifetime(response.headers)
+    )
+
+class CachingAdapter(RateLimitedAdapter):
+    """Rate-limited adapter that answers GETs from the HTTP cache
+
+    Fresh entries are served without touching the network or the host's
+    rate budget, unless the request sends Cache-Control: no-cache. Stale
+    entries are revalidated with If-None-Match and If-Modified-Since, and
+    a 304 is answered from the stored body. Responses carry from_cache,
+    and answers to a 304 keep its headers in network_headers.
+    """
+
+    def __init__(self, limiter, cache, *args, **kwargs):
+        self.cache = cache
+        super().__init__(limiter, *args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET' or kwargs.get('stream'):
+            return super().send(request, **kwargs)
+
+        try:
+            entry = self.cache.get(request.url)
+        except Exception as e:
+            logging.error(f"Error reading HTTP cache: {e}")
+            entry = None
+
+        no_cache = 'no-cache' in request.headers.get('Cache-Control', '').lower()
+        if entry and entry['expires'] > time.time() and not no_cache:
+            self.cache.count('hits')
+            return self._cached_response(request, entry)
+
+        if entry:
+            if entry['etag']:
+                request.headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = super().send(request, **kwargs)
+
+        try:
+            if response.status_code == 304 and entry:
+                self.cache.count('revalidated')
+                self.cache.refresh(request.url, response.headers)
+                response.close()
+                return self._cached_response(request, entry, response.headers)
+
+            self.cache.count('misses')
+            if is_cacheable(response):
+                self.cache.store(request.url, response.status_code, response.headers, response.content)
+        except Exception as e:
+            logging.error(f"Error writing HTTP cache: {e}")
+
+        response.from_cache = False
+        return response
+
+    def _cached_response(self, request, entry, network_headers=None):
+        """A requests Response rebuilt from a cache entry"""
+        response = Response()
+        response.from_cache = True
+        response.network_headers = network_headers
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry['body']
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK'
+        return response
+
+_http_cache = None
+
+def get_http_cache():
+    """The process-wide HTTP cache, opened on first use"""
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HttpCache(
+            app.config.get('HTTP_CACHE_PATH') or os.path.join(app.instance_path, 'http_cache.sqlite3'),
+            app.config.get('HTTP_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+        )
+    return _http_cache
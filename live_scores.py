@@ -0,0 +1,141 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from models import Fixture, SequenceCounter
+from fixture_ingest import fixture_status
+from match_history import apply_finished_fixtures
+
+LIVE_STATUSES = ('1st Half', 'Half Time', '2nd Half', 'In Progress')
+
+# Fixtures kicking off this soon are polled too, to catch the kickoff
+KICKOFF_WINDOW = timedelta(minutes=10)
+
+# Most changed fixtures returned per changes_since() call
+CHANGES_LIMIT = 500
+
+CHANGE_SEQ_COUNTER = 'fixture_change_seq'
+
+def live_fixtures_filter(now=None):
+    """Condition for fixtures worth polling: in play or about to kick off"""
+    now = now or datetime.utcnow()
+    return db.or_(
+        Fixture.status.in_(LIVE_STATUSES),
+        db.and_(
+            Fixture.status == 'Not Started',
+            Fixture.kickoff_time <= now + KICKOFF_WINDOW,
+            Fixture.kickoff_time >= now - KICKOFF_WINDOW
+        )
+    )
+
+def current_change_seq():
+    """Latest change sequence number across fixtures"""
+    return db.session.query(db.func.coalesce(db.func.max(Fixture.change_seq), 0)).scalar()
+
+def next_change_seq():
+    """Claim the next change sequence number in the caller's transaction
+
+    The counter row is incremented in place, so concurrent writers always
+    get distinct numbers, and the row stays locked until the claiming
+    transaction ends, so numbers become visible in order. The counter
+    starts from the fixtures' current maximum.
+    """
+    increment = db.update(SequenceCounter).where(
+        SequenceCounter.name == CHANGE_SEQ_COUNTER
+    ).values(value=SequenceCounter.value + 1).returning(SequenceCounter.value)
+
+    seq = db.session.execute(increment).scalar()
+    if seq is None:
+        dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+        db.session.execute(dialect.insert(SequenceCounter).values(
+            name=CHANGE_SEQ_COUNTER, value=current_change_seq()
+        ).on_conflict_do_nothing(index_elements=[SequenceCounter.name]))
+        seq = db.session.execute(increment).scalar()
+    return seq
+
+def apply_live_updates(payloads):
+    """Write the scores and statuses that changed since the last poll
+
+    Payloads are compared with the stored fixtures, and only changed rows
+    are written, in one batched update stamped with the next change
+    sequence number. Fixtures that finish here go to the match history.
+    """
+    stats = {'polled': len(payloads), 'changed': 0, 'finished': 0, 'seq': None}
+    incoming = {p['id']: p for p in payloads if p.get('id') is not None}
+    if not incoming:
+        return stats
+
+    try:
+        stored = db.session.query(
+            Fixture.id, Fixture.external_id, Fixture.status, Fixture.home_score, Fixture.away_score
+        ).filter(Fixture.external_id.in_(list(incoming)))
+
+        changes = []
+        finished_ids = []
+        for fixture in stored:
+            payload = incoming[fixture.external_id]
+            status = fixture_status(payload)
+            # Scores are null until kickoff; keep what is stored
+            home_score = fixture.home_score if payload.get('home_score') is None else payload['home_score']
+            away_score = fixture.away_score if payload.get('away_score') is None else payload['away_score']
+            if (status, home_score, away_score) == (fixture.status, fixture.home_score, fixture.away_score):
+                continue
+
+            changes.append({'id': fixture.id, 'status': status, 'home_score': home_score, 'away_score': away_score})
+            if status == 'Finished' and fixture.status != 'Finished':
+                finished_ids.append(fixture.id)
+
+        if not changes:
+            return stats
+
+        seq = next_change_seq()
+        for change in changes:
+            change['change_seq'] = seq
+        db.session.execute(db.update(Fixture), changes)
+
+        if finished_ids:
+            apply_finished_fixtures(db.session.query(
+                Fixture.id, Fixture.home_team_id, Fixture.away_team_id,
+                Fixture.home_score, Fixture.away_score, Fixture.kickoff_time
+            ).filter(Fixture.id.in_(finished_ids)).all(), db.session)
+
+        db.session.commit()
+        stats.update(changed=len(changes), finished=len(finished_ids), seq=seq)
+        logging.info(f"Live scores: {len(changes)} of {len(incoming)} fixtures changed (seq {seq})")
+        return stats
+
+    except Exception as e:
+        logging.error(f"Error applying live scores: {e}")
+        db.session.rollback()
+        return stats
+
+def changes_since(seq, limit=CHANGES_LIMIT):
+    """Fixtures changed after a sequence number, with the number to ask from next
+
+    At most about `limit` fixtures are returned, always whole sequence
+    numbers, so the next call picks up where this one stopped; 'more' says
+    whether it has anything to pick up.
+    """
+    fixtures = Fixture.query.filter(Fixture.change_seq > seq).order_by(
+        Fixture.change_seq, Fixture.id
+    ).limit(limit + 1).all()
+    more = len(fixtures) > limit
+    if more:
+        last_seq = fixtures[limit].change_seq
+        fixtures = [f for f in fixtures if f.change_seq < last_seq] or \
+            Fixture.query.filter(Fixture.change_seq == last_seq).order_by(Fixture.id).all()
+    return {
+        # Never past a change the client has not been sent
+        'seq': fixtures[-1].change_seq if fixtures else min(seq, current_change_seq()),
+        'more': more,
+        'fixtures': [
+            {
+                'id': f.id,
+                'status': f.status,
+                'home_score': f.home_score,
+                'away_score': f.away_score,
+                'seq': f.change_seq
+            }
+            for f in fixtures
+        ]
+    }
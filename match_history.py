@@ -0,0 +1,347 @@
+import json
+import logging
+from collections import deque, namedtuple
+from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app import db
+from models import Fixture, HeadToHeadSummary, TeamForm
+
+# Meetings kept per pair; the engine reads the latest five
+RECENT_MEETINGS = 10
+
+# Results kept per team for rolling form
+FORM_WINDOW = 10
+
+MeetingResult = namedtuple(
+    'MeetingResult', ['fixture_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'kickoff_time']
+)
+
+def pair_key(team_id, other_team_id):
+    """Primary key of the unordered team pair"""
+    return (min(team_id, other_team_id), max(team_id, other_team_id))
+
+def recent_meetings(summary, limit=5):
+    """Latest meetings stored on a summary, newest first"""
+    if not summary or not summary.recent_results:
+        return []
+    return [MeetingResult(*meeting) for meeting in json.loads(summary.recent_results)[:limit]]
+
+def _record_meeting(summary, fixture):
+    """Fold one finished fixture into a pair summary"""
+    meetings = json.loads(summary.recent_results) if summary.recent_results else []
+    if any(meeting[0] == fixture.id for meeting in meetings):
+        return  # Already counted
+    
+    if fixture.home_score == fixture.away_score:
+        summary.draws = (summary.draws or 0) + 1
+    else:
+        winner = fixture.home_team_id if fixture.home_score > fixture.away_score else fixture.away_team_id
+        if winner == summary.team_a_id:
+            summary.team_a_wins = (summary.team_a_wins or 0) + 1
+        else:
+            summary.team_b_wins = (summary.team_b_wins or 0) + 1
+    summary.total_games = (summary.total_games or 0) + 1
+    
+    meetings.insert(0, [
+        fixture.id, fixture.home_team_id, fixture.away_team_id,
+        fixture.home_score, fixture.away_score, fixture.kickoff_time.isoformat()
+    ])
+    meetings.sort(key=lambda meeting: meeting[5], reverse=True)
+    summary.recent_results = json.dumps(meetings[:RECENT_MEETINGS])
+    summary.updated_at = datetime.utcnow()
+
+def _result_points(goals_for, goals_against):
+    """League points for a result"""
+    if goals_for > goals_against:
+        return 3
+    elif goals_for == goals_against:
+        return 1
+    return 0
+
+class RollingForm:
+    """A team's last FORM_WINDOW results with running aggregates
+    
+    Results are (fixture_id, at_home, goals_for, goals_against), newest
+    first. push() adjusts the aggregates for the result entering and the
+    ones leaving each window, so an update costs the same however much
+    history the team has.
+    """
+    
+    def __init__(self, team_id, results=()):
+        self.team_id = team_id
+        self.results = deque(maxlen=FORM_WINDOW)
+        self.points_last5 = 0
+        self.points_last10 = 0
+        self.goals_for_last10 = 0
+        self.goals_against_last10 = 0
+        self.home_matches = 0
+        self.home_wins = 0
+        self.away_matches = 0
+        self.away_wins = 0
+        for result in reversed(list(results)):
+            self.push(*result)
+    
+    def __len__(self):
+        return len(self.results)
+    
+    def __contains__(self, fixture_id):
+        return any(result[0] == fixture_id for result in self.results)
+    
+    def _adjust(self, result, sign):
+        """Add (sign=1) or remove (sign=-1) a result from the ten-match aggregates"""
+        _, at_home, goals_for, goals_against = result
+        self.points_last10 += sign * _result_points(goals_for, goals_against)
+        self.goals_for_last10 += sign * goals_for
+        self.goals_against_last10 += sign * goals_against
+        won = 1 if goals_for > goals_against else 0
+        if at_home:
+            self.home_matches += sign
+            self.home_wins += sign * won
+        else:
+            self.away_matches += sign
+            self.away_wins += sign * won
+    
+    def push(self, fixture_id, at_home, goals_for, goals_against):
+        """Add the newest result"""
+        if len(self.results) >= 5:
+            leaving = self.results[4]
+            self.points_last5 -= _result_points(leaving[2], leaving[3])
+        if len(self.results) == self.results.maxlen:
+            self._adjust(self.results[-1], -1)
+        
+        result = (fixture_id, bool(at_home), goals_for, goals_against)
+        self.results.appendleft(result)
+        self.points_last5 += _result_points(goals_for, goals_against)
+        self._adjust(result, 1)
+    
+    def form_string(self, limit=5):
+        """Latest results as W/D/L letters, newest first"""
+        letters = {3: 'W', 1: 'D', 0: 'L'}
+        return ''.join(letters[_result_points(r[2], r[3])] for r in list(self.results)[:limit])
+    
+    @classmethod
+    def from_row(cls, row):
+        """Rebuild from a persisted TeamForm row"""
+        return cls(row.team_id, [tuple(r) for r in json.loads(row.recent_results or '[]')])
+    
+    def to_row(self, row):
+        """Write the buffer and aggregates onto a TeamForm row"""
+        row.recent_results = json.dumps([list(r) for r in self.results])
+        row.matches = len(self.results)
+        row.points_last5 = self.points_last5
+        row.points_last10 = self.points_last10
+        row.goals_for_last10 = self.goals_for_last10
+        row.goals_against_last10 = self.goals_against_last10
+        row.home_matches = self.home_matches
+        row.home_wins = self.home_wins
+        row.away_matches = self.away_matches
+        row.away_wins = self.away_wins
+        row.updated_at = datetime.utcnow()
+
+def load_team_forms(team_ids, session=None):
+    """RollingForm per team id for the teams that have persisted form"""
+    session = session or db.session
+    with session.no_autoflush:
+        return {
+            row.team_id: RollingForm.from_row(row)
+            for row in session.query(TeamForm).filter(TeamForm.team_id.in_(team_ids))
+        }
+
+def apply_finished_fixtures(fixtures, session=None):
+    """Update pair summaries and team form for fixtures that have just finished
+
+    Upcoming predictions that read the changed form or summaries are
+    marked stale.
+    """
+    session = session or db.session
+    fixtures = [f for f in fixtures if f.home_score is not None and f.away_score is not None]
+    if not fixtures:
+        return
+    
+    pairs = {pair_key(f.home_team_id, f.away_team_id) for f in fixtures}
+    with session.no_autoflush:
+        summaries = {
+            (s.team_a_id, s.team_b_id): s
+            for s in session.query(HeadToHeadSummary).filter(
+                db.tuple_(HeadToHeadSummary.team_a_id, HeadToHeadSummary.team_b_id).in_(pairs)
+            )
+        }
+    
+    team_ids = {f.home_team_id for f in fixtures} | {f.away_team_id for f in fixtures}
+    with session.no_autoflush:
+        form_rows = {
+            row.team_id: row
+            for row in session.query(TeamForm).filter(TeamForm.team_id.in_(team_ids))
+        }
+    forms = {team_id: RollingForm.from_row(row) for team_id, row in form_rows.items()}
+    
+    for fixture in sorted(fixtures, key=lambda f: f.kickoff_time):
+        key = pair_key(fixture.home_team_id, fixture.away_team_id)
+        if key not in summaries:
+            summaries[key] = HeadToHeadSummary(team_a_id=key[0], team_b_id=key[1])
+            session.add(summaries[key])
+        _record_meeting(summaries[key], fixture)
+        
+        for team_id, at_home, goals_for, goals_against in (
+            (fixture.home_team_id, True, fixture.home_score, fixture.away_score),
+            (fixture.away_team_id, False, fixture.away_score, fixture.home_score)
+        ):
+            form = forms.setdefault(team_id, RollingForm(team_id))
+            if fixture.id not in form:
+                form.push(fixture.id, at_home, goals_for, goals_against)
+    
+    for team_id in team_ids:
+        if team_id not in form_rows:
+            form_rows[team_id] = TeamForm(team_id=team_id)
+            session.add(form_rows[team_id])
+        forms[team_id].to_row(form_rows[team_id])
+    
+    _mark_predictions_stale(session, team_ids, pairs)
+
+def _mark_predictions_stale(session, team_ids, pairs=()):
+    """Flag upcoming predictions that read these teams' form or these pairs' summaries"""
+    from prediction_refresh import mark_stale, upcoming_pair_fixture_ids
+    changed = {}
+    if team_ids:
+        changed['form'] = set(team_ids)
+    fixture_ids = upcoming_pair_fixture_ids(session.connection(), pairs)
+    if fixture_ids:
+        changed['h2h'] = fixture_ids
+    if changed:
+        mark_stale(session.connection(), changed)
+
+def rebuild_match_history(batch_size=5000):
+    """Recompute every pair summary and team form from the full fixture history"""
+    try:
+        summaries = {}
+        forms = {}
+        finished = db.session.query(
+            Fixture.id, Fixture.home_team_id, Fixture.away_team_id,
+            Fixture.home_score, Fixture.away_score, Fixture.kickoff_time
+        ).filter(
+            Fixture.status == 'Finished',
+            Fixture.home_score.isnot(None),
+            Fixture.away_score.isnot(None)
+        ).order_by(Fixture.kickoff_time, Fixture.id).yield_per(batch_size)
+        
+        for fixture in finished:
+            key = pair_key(fixture.home_team_id, fixture.away_team_id)
+            summary = summaries.get(key)
+            if summary is None:
+                summary = summaries[key] = {
+                    'team_a_id': key[0], 'team_b_id': key[1],
+                    'team_a_wins': 0, 'team_b_wins': 0, 'draws': 0, 'total_games': 0,
+                    'recent': []
+                }
+            
+            if fixture.home_score == fixture.away_score:
+                summary['draws'] += 1
+            elif (fixture.home_score > fixture.away_score) == (fixture.home_team_id == key[0]):
+                summary['team_a_wins'] += 1
+            else:
+                summary['team_b_wins'] += 1
+            summary['total_games'] += 1
+            summary['recent'].insert(0, [
+                fixture.id, fixture.home_team_id, fixture.away_team_id,
+                fixture.home_score, fixture.away_score, fixture.kickoff_time.isoformat()
+            ])
+            del summary['recent'][RECENT_MEETINGS:]
+            
+            forms.setdefault(fixture.home_team_id, RollingForm(fixture.home_team_id)).push(
+                fixture.id, True, fixture.home_score, fixture.away_score
+            )
+            forms.setdefault(fixture.away_team_id, RollingForm(fixture.away_team_id)).push(
+                fixture.id, False, fixture.away_score, fixture.home_score
+            )
+        
+        now = datetime.utcnow()
+        rows = [
+            dict(
+                {k: v for k, v in summary.items() if k != 'recent'},
+                recent_results=json.dumps(summary['recent']),
+                updated_at=now
+            )
+            for summary in summaries.values()
+        ]
+        
+        form_rows = []
+        for form in forms.values():
+            row = TeamForm(team_id=form.team_id)
+            form.to_row(row)
+            form_rows.append({column.name: getattr(row, column.name) for column in TeamForm.__table__.columns})
+        
+        db.session.query(HeadToHeadSummary).delete()
+        db.session.query(TeamForm).delete()
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(db.insert(HeadToHeadSummary), rows[start:start + batch_size])
+        for start in range(0, len(form_rows), batch_size):
+            db.session.execute(db.insert(TeamForm), form_rows[start:start + batch_size])
+        _mark_predictions_stale(db.session, forms, summaries)
+        db.session.commit()
+        
+        logging.info(f"Rebuilt {len(rows)} head-to-head summaries and {len(form_rows)} team forms")
+        return len(rows)
+        
+    except Exception as e:
+        logging.error(f"Error rebuilding match history: {e}")
+        db.session.rollback()
+        return 0
+
+def ensure_match_history():
+    """Build the match history once on databases that predate it
+
+    Summaries are only kept up to date as fixtures finish, so a database
+    with finished fixtures but no summaries is rebuilt in full.
+    """
+    try:
+        if db.session.query(HeadToHeadSummary.team_a_id).first() is not None:
+            return 0
+        if db.session.query(Fixture.id).filter(
+            Fixture.status == 'Finished', Fixture.home_score.isnot(None), Fixture.away_score.isnot(None)
+        ).first() is None:
+            return 0
+    except Exception as e:
+        logging.error(f"Error checking match history: {e}")
+        db.session.rollback()
+        return 0
+    
+    logging.info("Match history is empty; rebuilding from finished fixtures")
+    return rebuild_match_history()
+
+def _newly_finished(session):
+    """Fixtures in this flush whose status has just become Finished"""
+    finished = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Fixture) or obj.status != 'Finished':
+            continue
+        history = inspect(obj).attrs.status.history
+        if obj in session.new or (history.added and 'Finished' not in (history.deleted or ())):
+            finished.append(obj)
+    return finished
+
+@event.listens_for(Session, 'after_flush')
+def _collect_finished_fixtures(session, flush_context):
+    """Note fixtures that finished in this flush, once their ids are assigned"""
+    try:
+        finished = _newly_finished(session)
+        if finished:
+            session.info.setdefault('finished_fixtures', []).extend(finished)
+    except Exception as e:
+        logging.error(f"Error collecting finished fixtures: {e}")
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _update_history_on_finish(session, flush_context):
+    """Keep the materialized history in step as fixtures finish
+    
+    Summary changes made here are written by the follow-up flush that
+    commit() runs for a session that is still dirty.
+    """
+    finished = session.info.pop('finished_fixtures', None)
+    if not finished:
+        return
+    
+    try:
+        apply_finished_fixtures(finished, session)
+    except Exception as e:
+        logging.error(f"Error updating match history: {e}")
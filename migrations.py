@@ -0,0 +1,44 @@
+import logging
+from app import db
+
+# Columns added to existing tables after the first release. db.create_all()
+# only creates missing tables, so these are added in place on startup.
+ADDED_COLUMNS = [
+    ('admin_settings', 'version', 'INTEGER DEFAULT 1'),
+    ('prediction', 'is_stale', 'BOOLEAN DEFAULT FALSE'),
+    ('league', 'external_id', 'INTEGER'),
+    ('team', 'external_id', 'INTEGER'),
+    ('fixture', 'external_id', 'INTEGER'),
+    ('fixture', 'change_seq', 'INTEGER DEFAULT 0'),
+]
+
+def ensure_schema():
+    """Bring an existing SQLite/Postgres database up to the current models"""
+    try:
+        inspector = db.inspect(db.engine)
+        tables = set(inspector.get_table_names())
+        
+        with db.engine.begin() as connection:
+            for table, column, ddl in ADDED_COLUMNS:
+                if table not in tables:
+                    continue
+                existing = {c['name'] for c in inspector.get_columns(table)}
+                if column not in existing:
+                    logging.info(f"Adding column {table}.{column}")
+                    connection.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+            
+            # Indexes declared on the models, including ones added since the
+            # table was created; each in a savepoint so one failure (e.g.
+            # duplicates under a unique index) does not undo the rest
+            for table in db.metadata.sorted_tables:
+                if table.name not in tables:
+                    continue
+                for index in table.indexes:
+                    try:
+                        with connection.begin_nested():
+                            index.create(connection, checkfirst=True)
+                    except Exception as e:
+                        logging.error(f"Error creating index {index.name}: {e}")
+                    
+    except Exception as e:
+        logging.error(f"Error migrating database schema: {e}")
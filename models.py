@@ -9,6 +9,7 @@ class League(db.Model):
     logo_url = db.Column(db.String(255))
     flag_url = db.Column(db.String(255))
     season = db.Column(db.String(20))
+    external_id = db.Column(db.Integer, index=True)  # API-Football league id, shared across seasons
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Team(db.Model):
@@ -20,6 +21,7 @@ class Team(db.Model):
     venue_name = db.Column(db.String(100))
     venue_capacity = db.Column(db.Integer)
     league_id = db.Column(db.Integer, db.ForeignKey('league.id'))
+    external_id = db.Column(db.Integer, unique=True, index=True)  # API-Football team id
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Player(db.Model):
@@ -34,6 +36,10 @@ class Player(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey('team.id'))
     photo_url = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_player_team', 'team_id'),
+    )
 
 class Fixture(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -48,8 +54,19 @@ class Fixture(db.Model):
     referee = db.Column(db.String(100))
     round_info = db.Column(db.String(50))
     importance_level = db.Column(db.String(20))  # Derby, Relegation, Final, etc.
+    external_id = db.Column(db.Integer, unique=True, index=True)  # API-Football fixture id
+    change_seq = db.Column(db.Integer, default=0, index=True)  # Live update that last changed the score/status
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_fixture_kickoff', 'kickoff_time', 'id'),  # Date ranges and (kickoff_time, id) paging
+        db.Index('ix_fixture_status_kickoff', 'status', 'kickoff_time'),  # Upcoming and live fixtures
+        db.Index('ix_fixture_league_kickoff', 'league_id', 'kickoff_time'),
+        db.Index('ix_fixture_home_team_kickoff', 'home_team_id', 'kickoff_time'),
+        db.Index('ix_fixture_away_team_kickoff', 'away_team_id', 'kickoff_time'),
+        db.Index('ix_fixture_created_at', 'created_at'),
+    )
+    
     # Relationships
     home_team = db.relationship('Team', foreign_keys=[home_team_id], backref='home_fixtures')
     away_team = db.relationship('Team', foreign_keys=[away_team_id], backref='away_fixtures')
@@ -63,9 +80,30 @@ class Prediction(db.Model):
     reasoning = db.Column(db.Text)
     criteria_scores = db.Column(db.Text)  # JSON string of individual criteria scores
     data_warnings = db.Column(db.Text)  # JSON string of missing data warnings
+    is_stale = db.Column(db.Boolean, default=False)  # An input changed since it was scored
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_prediction_fixture', 'fixture_id', 'id'),  # Latest prediction per fixture
+        db.Index('ix_prediction_stale', 'is_stale', 'fixture_id'),
+        db.Index('ix_prediction_created_at', 'created_at'),
+    )
+    
+    # Newest first, so fixture.predictions[0] is the current prediction
+    fixture = db.relationship('Fixture', backref=db.backref('predictions', order_by='Prediction.id.desc()'))
+
+class PredictionDependency(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    prediction_id = db.Column(db.Integer, db.ForeignKey('prediction.id'), nullable=False)
+    fixture_id = db.Column(db.Integer, db.ForeignKey('fixture.id'), nullable=False)
+    source = db.Column(db.String(20), nullable=False)  # standings, injuries, form, odds, aggregations, h2h
+    source_key = db.Column(db.Integer, nullable=False)  # Team id or fixture id, depending on source
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    fixture = db.relationship('Fixture', backref='predictions')
+    __table_args__ = (
+        db.Index('ix_prediction_dependency_source', 'source', 'source_key'),
+        db.Index('ix_prediction_dependency_prediction', 'prediction_id'),
+    )
 
 class PredictionAggregation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -75,6 +113,10 @@ class PredictionAggregation(db.Model):
     confidence = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_prediction_aggregation_fixture', 'fixture_id'),
+    )
+    
     fixture = db.relationship('Fixture', backref='aggregated_predictions')
 
 class BettingOdds(db.Model):
@@ -87,6 +129,10 @@ class BettingOdds(db.Model):
     over_under_odds = db.Column(db.Text)  # JSON for various over/under markets
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_betting_odds_fixture', 'fixture_id', 'created_at'),
+    )
+    
     fixture = db.relationship('Fixture', backref='betting_odds')
 
 class Standings(db.Model):
@@ -109,9 +155,39 @@ class Standings(db.Model):
     away_losses = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_standings_team', 'team_id'),
+        db.Index('ix_standings_league_position', 'league_id', 'position'),
+    )
+    
     league = db.relationship('League', backref='standings')
     team = db.relationship('Team', backref='standings')
 
+class HeadToHeadSummary(db.Model):
+    # Keyed by the unordered pair: team_a_id is always the lower team id
+    team_a_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    team_b_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    team_a_wins = db.Column(db.Integer, default=0)
+    team_b_wins = db.Column(db.Integer, default=0)
+    draws = db.Column(db.Integer, default=0)
+    total_games = db.Column(db.Integer, default=0)
+    recent_results = db.Column(db.Text)  # JSON list of the last meetings, newest first
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TeamForm(db.Model):
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    recent_results = db.Column(db.Text)  # JSON ring buffer of the last results, newest first
+    matches = db.Column(db.Integer, default=0)  # Results in the buffer
+    points_last5 = db.Column(db.Integer, default=0)
+    points_last10 = db.Column(db.Integer, default=0)
+    goals_for_last10 = db.Column(db.Integer, default=0)
+    goals_against_last10 = db.Column(db.Integer, default=0)
+    home_matches = db.Column(db.Integer, default=0)
+    home_wins = db.Column(db.Integer, default=0)
+    away_matches = db.Column(db.Integer, default=0)
+    away_wins = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class PlayerStats(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
@@ -157,6 +233,10 @@ class InjurySuspension(db.Model):
     estimated_return = db.Column(db.Date)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_injury_suspension_player', 'player_id', 'status'),
+    )
+    
     player = db.relationship('Player', backref='injuries_suspensions')
 
 class BookmarkedMatch(db.Model):
@@ -165,6 +245,10 @@ class BookmarkedMatch(db.Model):
     user_session = db.Column(db.String(100), nullable=False)  # Session-based storage
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_bookmarked_match_session', 'user_session', 'fixture_id'),
+    )
+    
     fixture = db.relationship('Fixture', backref='bookmarks')
 
 class PerformanceTracker(db.Model):
@@ -198,6 +282,7 @@ class AdminSettings(db.Model):
     max_matches_weekday = db.Column(db.Integer, default=100)
     max_matches_weekend = db.Column(db.Integer, default=300)
     scaling_start_date = db.Column(db.String(20), default='2025-07-13')
+    version = db.Column(db.Integer, default=1)  # Bumped on every update so workers reload
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class CacheManagement(db.Model):
@@ -207,6 +292,11 @@ class CacheManagement(db.Model):
     expiry_time = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class SequenceCounter(db.Model):
+    # Named counters handed out with an atomic increment (e.g. fixture change_seq)
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
 class UserPreferences(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_session = db.Column(db.String(100), nullable=False)
@@ -215,3 +305,7 @@ class UserPreferences(db.Model):
     theme_preference = db.Column(db.String(20), default='light')
     lightweight_mode = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_user_preferences_session', 'user_session'),
+    )
@@ -1,50 +1,244 @@
 import json
 import logging
 from datetime import datetime, timedelta
-from app import db
+from app import app, db
 from models import *
+from settings_cache import get_settings
+from match_history import pair_key, recent_meetings, load_team_forms
+from scoring_kernel import CRITERIA, CRITERIA_WARNINGS, CriteriaMatrix, criterion_points
 import random
 
+# Recent results needed before rolling form is used
+MIN_FORM_MATCHES = 3
+
+# Availability of a team with nobody ruled out
+NO_ABSENCES = {'injuries': 0, 'weighted_absences': 0, 'absent_players': []}
+
 class PredictionEngine:
-    def __init__(self):
-        self.weights = self._load_admin_weights()
+    def __init__(self, settings=None, weight_absences=None):
+        # A fixed snapshot (backtests, tuning) or None to follow admin settings live
+        self._settings = settings
+        # Weight each absence by the player's minutes and goals instead of counting heads
+        if weight_absences is None:
+            weight_absences = app.config.get('WEIGHT_ABSENCES_BY_STATS', False)
+        self.weight_absences = weight_absences
+    
+    @property
+    def settings(self):
+        """Settings snapshot used for scoring"""
+        return self._settings or get_settings()
+    
+    @property
+    def weights(self):
+        """Criterion weights from the current settings snapshot"""
+        return self.settings.weights
+    
+    def predict_match(self, fixture):
+        """Generate comprehensive prediction for a match"""
+        return self.predict_many([fixture])[0]
     
-    def _load_admin_weights(self):
-        """Load prediction weights from admin settings"""
+    def predict_many(self, fixtures):
+        """Generate predictions for a batch of fixtures from prefetched inputs"""
+        fixtures = list(fixtures)
+        if not fixtures:
+            return []
+        
         try:
-            settings = AdminSettings.query.first()
-            if settings:
-                return {
-                    'form_standings': settings.form_weight,
-                    'home_away': settings.home_away_weight,
-                    'player_availability': settings.player_availability_weight,
-                    'match_stats': settings.match_stats_weight,
-                    'h2h': settings.h2h_weight,
-                    'ai_predictions': settings.ai_predictions_weight,
-                    'odds_agreement': settings.odds_agreement_weight,
-                    'intangibles': settings.intangibles_weight
-                }
-            else:
-                # Default weights
-                return {
-                    'form_standings': 25.0,
-                    'home_away': 10.0,
-                    'player_availability': 15.0,
-                    'match_stats': 20.0,
-                    'h2h': 10.0,
-                    'ai_predictions': 5.0,
-                    'odds_agreement': 10.0,
-                    'intangibles': 5.0
-                }
+            inputs = self._prefetch_inputs(fixtures)
+            settings = self.settings
+            weights = settings.weights
+            thresholds = settings.thresholds
         except Exception as e:
-            logging.error(f"Error loading admin weights: {e}")
+            logging.error(f"Error prefetching prediction inputs: {e}")
+            return [self._fallback_prediction() for _ in fixtures]
+        
+        return [self._score_fixture(fixture, inputs, weights, thresholds) for fixture in fixtures]
+    
+    def _prefetch_inputs(self, fixtures):
+        """Load every input needed to score the batch in a fixed number of queries"""
+        fixture_ids = {f.id for f in fixtures}
+        team_ids = {f.home_team_id for f in fixtures} | {f.away_team_id for f in fixtures}
+        
+        # Hold the teams in the identity map so fixture.home_team/away_team
+        # resolve without a lazy load per fixture
+        teams = {team.id: team for team in Team.query.filter(Team.id.in_(team_ids))}
+        
+        standings = {}
+        for standing in Standings.query.filter(
+            Standings.team_id.in_(team_ids)
+        ).order_by(Standings.id):
+            standings.setdefault(standing.team_id, standing)
+        
+        forms = load_team_forms(team_ids)
+        
+        availability = self._prefetch_availability(team_ids)
+        
+        aggregations = {}
+        for aggregation in PredictionAggregation.query.filter(
+            PredictionAggregation.fixture_id.in_(fixture_ids)
+        ):
+            aggregations.setdefault(aggregation.fixture_id, []).append(aggregation)
+        
+        odds = {}
+        for odd in BettingOdds.query.filter(BettingOdds.fixture_id.in_(fixture_ids)):
+            odds.setdefault(odd.fixture_id, []).append(odd)
+        
+        # Last meetings per pairing from the materialized summaries
+        pairs = {pair_key(f.home_team_id, f.away_team_id) for f in fixtures}
+        h2h = {
+            frozenset((summary.team_a_id, summary.team_b_id)): recent_meetings(summary)
+            for summary in HeadToHeadSummary.query.filter(
+                db.tuple_(HeadToHeadSummary.team_a_id, HeadToHeadSummary.team_b_id).in_(pairs)
+            )
+        }
+        
+        return {
+            'teams': teams,
+            'standings': standings,
+            'forms': forms,
+            'availability': availability,
+            'aggregations': aggregations,
+            'odds': odds,
+            'h2h': h2h
+        }
+    
+    def _prefetch_availability(self, team_ids):
+        """Absences per team from one grouped query over ruled-out players
+        
+        Unweighted, every 'Out' row counts as one absence. With
+        weight_absences, a player counts 0.5 plus up to 0.5 for their share
+        of the team's top minutes tally plus their share of the team's goals
+        in the current season, so losing the top scorer hurts more than
+        losing a squad player.
+        """
+        absences = db.session.query(
+            Player.team_id, Player.id, Player.name, db.func.count(InjurySuspension.id)
+        ).join(
+            InjurySuspension, InjurySuspension.player_id == Player.id
+        ).filter(
+            Player.team_id.in_(team_ids), InjurySuspension.status == 'Out'
+        ).group_by(
+            Player.team_id, Player.id, Player.name
+        ).all()
+        if not absences:
             return {}
+        
+        player_stats, team_totals = {}, {}
+        if self.weight_absences:
+            player_stats, team_totals = self._season_player_stats({a.team_id for a in absences})
+        
+        availability = {}
+        for team_id, player_id, name, rows in absences:
+            weight = 1
+            minutes, goals = player_stats.get(player_id, (None, None))
+            if self.weight_absences and minutes is not None:
+                max_minutes, total_goals = team_totals.get(team_id, (0, 0))
+                weight = 0.5
+                weight += 0.5 * (minutes / max_minutes) if max_minutes else 0.5
+                weight += (goals or 0) / total_goals if total_goals else 0
+            
+            team = availability.setdefault(
+                team_id, {'injuries': 0, 'weighted_absences': 0, 'absent_players': []}
+            )
+            team['injuries'] += rows
+            team['weighted_absences'] += weight * rows
+            team['absent_players'].append((weight, minutes or 0, name))
+        
+        for team in availability.values():
+            team['absent_players'] = [name for _, _, name in sorted(team['absent_players'], reverse=True)]
+        
+        return availability
     
-    def predict_match(self, fixture):
-        """Generate comprehensive prediction for a match"""
+    def _season_player_stats(self, team_ids):
+        """(minutes, goals) per player and (top minutes, total goals) per team
+        
+        Read for the latest season on record for these teams only.
+        """
+        season = db.session.query(db.func.max(PlayerStats.season)).join(
+            Player, Player.id == PlayerStats.player_id
+        ).filter(Player.team_id.in_(team_ids)).scalar()
+        if season is None:
+            return {}, {}
+        
+        player_stats = {}
+        team_totals = {}
+        for team_id, player_id, minutes, goals in db.session.query(
+            Player.team_id, PlayerStats.player_id,
+            db.func.sum(PlayerStats.minutes_played), db.func.sum(PlayerStats.goals)
+        ).join(
+            Player, Player.id == PlayerStats.player_id
+        ).filter(
+            Player.team_id.in_(team_ids), PlayerStats.season == season
+        ).group_by(Player.team_id, PlayerStats.player_id):
+            player_stats[player_id] = (minutes or 0, goals or 0)
+            max_minutes, total_goals = team_totals.get(team_id, (0, 0))
+            team_totals[team_id] = (max(max_minutes, minutes or 0), total_goals + (goals or 0))
+        
+        return player_stats, team_totals
+    
+    def _evaluate_criteria(self, fixture, inputs):
+        """Run the eight criteria analyzers for a fixture against prefetched inputs"""
+        home_standing = inputs['standings'].get(fixture.home_team_id)
+        away_standing = inputs['standings'].get(fixture.away_team_id)
+        home_form = inputs.get('forms', {}).get(fixture.home_team_id)
+        away_form = inputs.get('forms', {}).get(fixture.away_team_id)
+        
+        return {
+            'form_standings': self._analyze_form_standings(home_standing, away_standing, home_form, away_form),
+            'home_away': self._analyze_home_away_factor(home_standing, away_standing, home_form, away_form),
+            'player_availability': self._analyze_player_availability(
+                inputs['availability'].get(fixture.home_team_id, NO_ABSENCES),
+                inputs['availability'].get(fixture.away_team_id, NO_ABSENCES)
+            ),
+            'match_stats': self._analyze_match_statistics(home_standing, away_standing),
+            'h2h': self._analyze_head_to_head(
+                fixture.home_team_id,
+                inputs['h2h'].get(frozenset((fixture.home_team_id, fixture.away_team_id)), [])
+            ),
+            'ai_predictions': self._get_ai_predictions_consensus(inputs['aggregations'].get(fixture.id, [])),
+            'odds_agreement': self._analyze_betting_odds(inputs['odds'].get(fixture.id, [])),
+            'intangibles': self._analyze_intangibles(fixture)
+        }
+    
+    def build_criteria_matrix(self, fixtures, inputs=None):
+        """Build the per-criterion score matrix for a batch, for vectorized scoring"""
+        fixtures = list(fixtures)
+        if inputs is None:
+            inputs = self._prefetch_inputs(fixtures) if fixtures else {}
+        
+        matrix = CriteriaMatrix(len(fixtures))
+        for row, fixture in enumerate(fixtures):
+            try:
+                matrix.set_row(
+                    row,
+                    self._evaluate_criteria(fixture, inputs),
+                    close_standings=self._teams_very_close_standings(
+                        inputs['standings'].get(fixture.home_team_id),
+                        inputs['standings'].get(fixture.away_team_id)
+                    ),
+                    derby=fixture.importance_level == 'Derby'
+                )
+            except Exception as e:
+                logging.error(f"Error building criteria row for fixture {fixture.id}: {e}")
+        
+        return matrix
+    
+    def _fallback_prediction(self):
+        """Prediction returned when a fixture cannot be scored"""
+        return {
+            'prediction': 'Draw',
+            'confidence': 35.0,
+            'reasoning': 'Prediction failed due to insufficient data',
+            'warnings': ['System error occurred during prediction']
+        }
+    
+    def _score_fixture(self, fixture, inputs, weights, thresholds):
+        """Score a single fixture using prefetched inputs"""
         try:
             home_team = fixture.home_team
             away_team = fixture.away_team
+            home_standing = inputs['standings'].get(fixture.home_team_id)
+            away_standing = inputs['standings'].get(fixture.away_team_id)
             
             # Initialize scoring system
             home_score = 0.0
@@ -53,85 +247,18 @@ class PredictionEngine:
             warnings = []
             criteria_scores = {}
             
-            # 1. Form & Standings Analysis (25%)
-            form_result = self._analyze_form_standings(home_team, away_team)
-            if form_result:
-                home_score += form_result['home_score'] * (self.weights['form_standings'] / 100)
-                away_score += form_result['away_score'] * (self.weights['form_standings'] / 100)
-                criteria_scores['form_standings'] = form_result
-                confidence_factors.append('form_data')
-            else:
-                warnings.append("⚠️ Form data missing — confidence reduced")
-            
-            # 2. Home/Away Factor (10%)
-            home_away_result = self._analyze_home_away_factor(home_team, away_team)
-            if home_away_result:
-                home_score += home_away_result['home_score'] * (self.weights['home_away'] / 100)
-                away_score += home_away_result['away_score'] * (self.weights['home_away'] / 100)
-                criteria_scores['home_away'] = home_away_result
-                confidence_factors.append('home_away_data')
-            else:
-                warnings.append("⚠️ Home/Away stats missing — using average")
-            
-            # 3. Player Availability (15%)
-            player_result = self._analyze_player_availability(home_team, away_team)
-            if player_result:
-                home_score += player_result['home_score'] * (self.weights['player_availability'] / 100)
-                away_score += player_result['away_score'] * (self.weights['player_availability'] / 100)
-                criteria_scores['player_availability'] = player_result
-                confidence_factors.append('player_data')
-            else:
-                warnings.append("⚠️ Player availability data missing — confidence reduced")
-            
-            # 4. Match Statistics (20%)
-            stats_result = self._analyze_match_statistics(home_team, away_team)
-            if stats_result:
-                home_score += stats_result['home_score'] * (self.weights['match_stats'] / 100)
-                away_score += stats_result['away_score'] * (self.weights['match_stats'] / 100)
-                criteria_scores['match_stats'] = stats_result
-                confidence_factors.append('stats_data')
-            else:
-                warnings.append("⚠️ Team statistics missing — using form only")
-            
-            # 5. Head-to-Head Analysis (10%)
-            h2h_result = self._analyze_head_to_head(home_team, away_team)
-            if h2h_result:
-                home_score += h2h_result['home_score'] * (self.weights['h2h'] / 100)
-                away_score += h2h_result['away_score'] * (self.weights['h2h'] / 100)
-                criteria_scores['h2h'] = h2h_result
-                confidence_factors.append('h2h_data')
-            else:
-                warnings.append("⚠️ Head-to-head data limited — reduced weight")
-            
-            # 6. AI Predictions Consensus (5%)
-            ai_result = self._get_ai_predictions_consensus(fixture.id)
-            if ai_result:
-                if ai_result['prediction'] == 'Home':
-                    home_score += self.weights['ai_predictions'] / 100
-                elif ai_result['prediction'] == 'Away':
-                    away_score += self.weights['ai_predictions'] / 100
-                criteria_scores['ai_predictions'] = ai_result
-                confidence_factors.append('ai_data')
-            else:
-                warnings.append("⚠️ AI predictions unavailable — using manual analysis")
-            
-            # 7. Betting Odds Agreement (10%)
-            odds_result = self._analyze_betting_odds(fixture.id)
-            if odds_result:
-                home_score += odds_result['home_score'] * (self.weights['odds_agreement'] / 100)
-                away_score += odds_result['away_score'] * (self.weights['odds_agreement'] / 100)
-                criteria_scores['odds_agreement'] = odds_result
-                confidence_factors.append('odds_data')
-            else:
-                warnings.append("⚠️ Odds unavailable — using form stats only")
-            
-            # 8. Intangibles (5%)
-            intangibles_result = self._analyze_intangibles(fixture)
-            if intangibles_result:
-                home_score += intangibles_result['home_score'] * (self.weights['intangibles'] / 100)
-                away_score += intangibles_result['away_score'] * (self.weights['intangibles'] / 100)
-                criteria_scores['intangibles'] = intangibles_result
-                confidence_factors.append('intangibles_data')
+            # Weighted sum over the eight criteria, in CRITERIA order
+            results = self._evaluate_criteria(fixture, inputs)
+            for criterion in CRITERIA:
+                result = results[criterion]
+                if result:
+                    home_points, away_points = criterion_points(criterion, result)
+                    home_score += home_points * (weights[criterion] / 100)
+                    away_score += away_points * (weights[criterion] / 100)
+                    criteria_scores[criterion] = result
+                    confidence_factors.append(criterion)
+                elif CRITERIA_WARNINGS.get(criterion):
+                    warnings.append(CRITERIA_WARNINGS[criterion])
             
             # Calculate final prediction
             total_score = home_score + away_score
@@ -144,14 +271,10 @@ class PredictionEngine:
                 away_percentage = 50.0
             
             # Determine prediction based on admin thresholds
-            settings = AdminSettings.query.first()
-            home_threshold = settings.home_win_threshold if settings else 65.0
-            away_threshold = settings.away_win_threshold if settings else 39.0
-            
-            if home_percentage >= home_threshold:
+            if home_percentage >= thresholds['home']:
                 prediction = 'Home'
                 confidence = home_percentage
-            elif away_percentage >= (100 - away_threshold):
+            elif away_percentage >= (100 - thresholds['away']):
                 prediction = 'Away'
                 confidence = away_percentage
             else:
@@ -159,7 +282,7 @@ class PredictionEngine:
                 confidence = 100 - max(home_percentage, away_percentage)
             
             # Apply immediate draw override conditions
-            if self._check_draw_override_conditions(fixture, criteria_scores):
+            if self._check_draw_override_conditions(fixture, criteria_scores, home_standing, away_standing):
                 prediction = 'Draw'
                 confidence = max(50.0, confidence * 0.8)
                 warnings.append("⚠️ Draw override applied — special conditions detected")
@@ -187,19 +310,11 @@ class PredictionEngine:
             
         except Exception as e:
             logging.error(f"Error in match prediction: {e}")
-            return {
-                'prediction': 'Draw',
-                'confidence': 35.0,
-                'reasoning': 'Prediction failed due to insufficient data',
-                'warnings': ['System error occurred during prediction']
-            }
+            return self._fallback_prediction()
     
-    def _analyze_form_standings(self, home_team, away_team):
+    def _analyze_form_standings(self, home_standing, away_standing, home_form=None, away_form=None):
         """Analyze team form and league standings"""
         try:
-            home_standing = Standings.query.filter_by(team_id=home_team.id).first()
-            away_standing = Standings.query.filter_by(team_id=away_team.id).first()
-            
             if not home_standing or not away_standing:
                 return None
             
@@ -214,7 +329,7 @@ class PredictionEngine:
             else:
                 away_form_score += min(abs(points_diff) * 2, 20)
             
-            return {
+            result = {
                 'home_score': home_form_score,
                 'away_score': away_form_score,
                 'home_position': home_standing.position,
@@ -222,16 +337,27 @@ class PredictionEngine:
                 'points_difference': points_diff
             }
             
+            # Recent form: points per game over the last five results
+            if home_form and away_form and len(home_form) >= MIN_FORM_MATCHES and len(away_form) >= MIN_FORM_MATCHES:
+                home_ppg = home_form.points_last5 / min(5, len(home_form))
+                away_ppg = away_form.points_last5 / min(5, len(away_form))
+                form_bonus = min(abs(home_ppg - away_ppg) * 5, 10)
+                if home_ppg > away_ppg:
+                    result['home_score'] += form_bonus
+                elif away_ppg > home_ppg:
+                    result['away_score'] += form_bonus
+                result['home_form'] = home_form.form_string()
+                result['away_form'] = away_form.form_string()
+            
+            return result
+            
         except Exception as e:
             logging.error(f"Error analyzing form/standings: {e}")
             return None
     
-    def _analyze_home_away_factor(self, home_team, away_team):
+    def _analyze_home_away_factor(self, home_standing, away_standing, home_form=None, away_form=None):
         """Analyze home/away performance"""
         try:
-            home_standing = Standings.query.filter_by(team_id=home_team.id).first()
-            away_standing = Standings.query.filter_by(team_id=away_team.id).first()
-            
             if not home_standing or not away_standing:
                 return None
             
@@ -239,6 +365,12 @@ class PredictionEngine:
             home_win_rate = home_standing.home_wins / max(1, (home_standing.home_wins + home_standing.home_draws + home_standing.home_losses))
             away_win_rate = away_standing.away_wins / max(1, (away_standing.away_wins + away_standing.away_draws + away_standing.away_losses))
             
+            # Blend in the recent home/away split when there is enough of it
+            if home_form and home_form.home_matches >= MIN_FORM_MATCHES:
+                home_win_rate = (home_win_rate + home_form.home_wins / home_form.home_matches) / 2
+            if away_form and away_form.away_matches >= MIN_FORM_MATCHES:
+                away_win_rate = (away_win_rate + away_form.away_wins / away_form.away_matches) / 2
+            
             home_score = home_win_rate * 60 + 25  # Base home advantage
             away_score = away_win_rate * 60
             
@@ -253,41 +385,32 @@ class PredictionEngine:
             logging.error(f"Error analyzing home/away factor: {e}")
             return None
     
-    def _analyze_player_availability(self, home_team, away_team):
+    def _analyze_player_availability(self, home_availability, away_availability):
         """Analyze player injuries and suspensions"""
         try:
-            home_injuries = InjurySuspension.query.filter_by(
-                player_id=Player.query.filter_by(team_id=home_team.id).subquery().c.id
-            ).filter(InjurySuspension.status == 'Out').count()
-            
-            away_injuries = InjurySuspension.query.filter_by(
-                player_id=Player.query.filter_by(team_id=away_team.id).subquery().c.id
-            ).filter(InjurySuspension.status == 'Out').count()
-            
             # Calculate availability scores (fewer injuries = higher score)
-            home_score = max(0, 100 - (home_injuries * 15))
-            away_score = max(0, 100 - (away_injuries * 15))
+            home_score = max(0, 100 - (home_availability['weighted_absences'] * 15))
+            away_score = max(0, 100 - (away_availability['weighted_absences'] * 15))
             
             return {
                 'home_score': home_score,
                 'away_score': away_score,
-                'home_injuries': home_injuries,
-                'away_injuries': away_injuries
+                'home_injuries': home_availability['injuries'],
+                'away_injuries': away_availability['injuries'],
+                'home_absent_players': home_availability['absent_players'][:3],
+                'away_absent_players': away_availability['absent_players'][:3]
             }
             
         except Exception as e:
             logging.error(f"Error analyzing player availability: {e}")
             return None
     
-    def _analyze_match_statistics(self, home_team, away_team):
+    def _analyze_match_statistics(self, home_standing, away_standing):
         """Analyze team statistics and performance metrics"""
         try:
             # This would analyze goals scored/conceded, possession, shots, etc.
             # For now, using standings data as proxy
             
-            home_standing = Standings.query.filter_by(team_id=home_team.id).first()
-            away_standing = Standings.query.filter_by(team_id=away_team.id).first()
-            
             if not home_standing or not away_standing:
                 return None
             
@@ -309,15 +432,9 @@ class PredictionEngine:
             logging.error(f"Error analyzing match statistics: {e}")
             return None
     
-    def _analyze_head_to_head(self, home_team, away_team):
-        """Analyze head-to-head record"""
+    def _analyze_head_to_head(self, home_team_id, h2h_fixtures):
+        """Analyze head-to-head record from the most recent meetings"""
         try:
-            # Query recent fixtures between these teams
-            h2h_fixtures = Fixture.query.filter(
-                ((Fixture.home_team_id == home_team.id) & (Fixture.away_team_id == away_team.id)) |
-                ((Fixture.home_team_id == away_team.id) & (Fixture.away_team_id == home_team.id))
-            ).filter(Fixture.status == 'Finished').order_by(Fixture.kickoff_time.desc()).limit(5).all()
-            
             if not h2h_fixtures:
                 return None
             
@@ -326,7 +443,7 @@ class PredictionEngine:
             draws = 0
             
             for fixture in h2h_fixtures:
-                if fixture.home_team_id == home_team.id:
+                if fixture.home_team_id == home_team_id:
                     if fixture.home_score > fixture.away_score:
                         home_wins += 1
                     elif fixture.home_score < fixture.away_score:
@@ -358,11 +475,9 @@ class PredictionEngine:
             logging.error(f"Error analyzing head-to-head: {e}")
             return None
     
-    def _get_ai_predictions_consensus(self, fixture_id):
+    def _get_ai_predictions_consensus(self, aggregations):
         """Get AI predictions consensus from aggregated sources"""
         try:
-            aggregations = PredictionAggregation.query.filter_by(fixture_id=fixture_id).all()
-            
             if not aggregations:
                 return None
             
@@ -395,11 +510,9 @@ class PredictionEngine:
             logging.error(f"Error getting AI consensus: {e}")
             return None
     
-    def _analyze_betting_odds(self, fixture_id):
+    def _analyze_betting_odds(self, odds):
         """Analyze betting odds for market confidence"""
         try:
-            odds = BettingOdds.query.filter_by(fixture_id=fixture_id).all()
-            
             if not odds:
                 return None
             
@@ -472,13 +585,13 @@ class PredictionEngine:
             logging.error(f"Error analyzing intangibles: {e}")
             return None
     
-    def _check_draw_override_conditions(self, fixture, criteria_scores):
+    def _check_draw_override_conditions(self, fixture, criteria_scores, home_standing, away_standing):
         """Check for conditions that force a draw prediction"""
         try:
             # Override conditions (admin configurable)
             override_conditions = [
                 # Very close teams in standings
-                self._teams_very_close_standings(fixture),
+                self._teams_very_close_standings(home_standing, away_standing),
                 # Both teams have poor away/home form
                 self._both_teams_poor_form(criteria_scores),
                 # Derby matches with close history
@@ -491,12 +604,9 @@ class PredictionEngine:
             logging.error(f"Error checking draw override: {e}")
             return False
     
-    def _teams_very_close_standings(self, fixture):
+    def _teams_very_close_standings(self, home_standing, away_standing):
         """Check if teams are very close in standings"""
         try:
-            home_standing = Standings.query.filter_by(team_id=fixture.home_team_id).first()
-            away_standing = Standings.query.filter_by(team_id=fixture.away_team_id).first()
-            
             if home_standing and away_standing:
                 position_diff = abs(home_standing.position - away_standing.position)
                 points_diff = abs(home_standing.points - away_standing.points)
@@ -561,6 +671,11 @@ class PredictionEngine:
                     f"• League Position: {home_team.name} ({form['home_position']}) vs "
                     f"{away_team.name} ({form['away_position']})"
                 )
+                if 'home_form' in form:
+                    reasoning_parts.append(
+                        f"• Recent Form: {home_team.name} {form['home_form']} vs "
+                        f"{away_team.name} {form['away_form']}"
+                    )
             
             if 'home_away' in criteria_scores:
                 ha = criteria_scores['home_away']
@@ -576,6 +691,9 @@ class PredictionEngine:
                         f"• Player Availability: {pa['home_injuries']} home injuries, "
                         f"{pa['away_injuries']} away injuries"
                     )
+                    absent = pa.get('home_absent_players', []) + pa.get('away_absent_players', [])
+                    if absent:
+                        reasoning_parts.append(f"• Key Absences: {', '.join(absent)}")
             
             if 'ai_predictions' in criteria_scores:
                 ai = criteria_scores['ai_predictions']
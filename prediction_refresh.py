@@ -0,0 +1,214 @@
+import json
+import logging
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from models import *
+from prediction_engine import PredictionEngine
+
+# Tables whose writes invalidate predictions, keyed by what they describe
+TEAM_SOURCES = ('standings', 'injuries', 'form')
+FIXTURE_SOURCES = ('odds', 'aggregations', 'h2h')
+
+engine = PredictionEngine()
+
+def fixture_dependencies(fixture):
+    """(source, key) pairs a fixture's prediction reads from
+    
+    Keys name the team or fixture rather than individual rows, so rows
+    that arrive after the prediction was made still invalidate it. The
+    head-to-head summary is keyed by the fixture, since a pair has no
+    single id; changes to a pair mark its upcoming fixtures.
+    """
+    return [
+        ('standings', fixture.home_team_id),
+        ('standings', fixture.away_team_id),
+        ('injuries', fixture.home_team_id),
+        ('injuries', fixture.away_team_id),
+        ('form', fixture.home_team_id),
+        ('form', fixture.away_team_id),
+        ('odds', fixture.id),
+        ('aggregations', fixture.id),
+        ('h2h', fixture.id)
+    ]
+
+def _prediction_values(result):
+    """Prediction column values for an engine result"""
+    return {
+        'prediction': result['prediction'],
+        'confidence': result['confidence'],
+        'reasoning': result['reasoning'],
+        'criteria_scores': json.dumps(result.get('criteria_scores', {})),
+        'data_warnings': json.dumps(result.get('warnings', [])),
+        'is_stale': False,
+        'created_at': datetime.utcnow()
+    }
+
+def save_prediction(fixture, result, prediction=None):
+    """Store an engine result for a fixture along with the inputs it used"""
+    if prediction is None:
+        prediction = Prediction(fixture_id=fixture.id)
+        db.session.add(prediction)
+    
+    for column, value in _prediction_values(result).items():
+        setattr(prediction, column, value)
+    db.session.flush()
+    
+    PredictionDependency.query.filter_by(prediction_id=prediction.id).delete()
+    db.session.add_all([
+        PredictionDependency(
+            prediction_id=prediction.id,
+            fixture_id=fixture.id,
+            source=source,
+            source_key=key
+        )
+        for source, key in fixture_dependencies(fixture)
+    ])
+    return prediction
+
+def bulk_save_predictions(scored, existing=None):
+    """Store many engine results with set-based statements
+    
+    `scored` is a list of (fixture, result) pairs and `existing` maps a
+    fixture id to the stale prediction id to overwrite. New predictions are
+    inserted in one statement, stale ones updated by primary key, and their
+    dependencies rewritten in bulk. The caller commits.
+    """
+    existing = existing or {}
+    prediction_ids = {}
+    
+    updates = [
+        dict(_prediction_values(result), id=existing[fixture.id])
+        for fixture, result in scored if fixture.id in existing
+    ]
+    if updates:
+        db.session.execute(db.update(Prediction), updates)
+        db.session.execute(
+            db.delete(PredictionDependency)
+            .where(PredictionDependency.prediction_id.in_([row['id'] for row in updates]))
+        )
+        prediction_ids.update({fixture.id: existing[fixture.id] for fixture, _ in scored if fixture.id in existing})
+    
+    inserts = [
+        dict(_prediction_values(result), fixture_id=fixture.id)
+        for fixture, result in scored if fixture.id not in existing
+    ]
+    if inserts:
+        rows = db.session.execute(
+            db.insert(Prediction).returning(Prediction.id, Prediction.fixture_id, sort_by_parameter_order=True),
+            inserts
+        )
+        prediction_ids.update({fixture_id: prediction_id for prediction_id, fixture_id in rows})
+    
+    dependencies = [
+        {
+            'prediction_id': prediction_ids[fixture.id],
+            'fixture_id': fixture.id,
+            'source': source,
+            'source_key': key
+        }
+        for fixture, _ in scored
+        for source, key in fixture_dependencies(fixture)
+    ]
+    if dependencies:
+        db.session.execute(db.insert(PredictionDependency), dependencies)
+    
+    return len(inserts), len(updates)
+
+def refresh_stale_predictions(limit=500):
+    """Re-score predictions for upcoming fixtures whose inputs changed"""
+    try:
+        stale = Prediction.query.join(Fixture).filter(
+            Prediction.is_stale == True,
+            Fixture.status == 'Not Started',
+            Fixture.kickoff_time >= datetime.utcnow()
+        ).order_by(Fixture.kickoff_time).limit(limit).all()
+        if not stale:
+            return 0
+        
+        fixtures = {f.id: f for f in Fixture.query.filter(Fixture.id.in_({p.fixture_id for p in stale}))}
+        results = engine.predict_many(fixtures[p.fixture_id] for p in stale)
+        for prediction, result in zip(stale, results):
+            save_prediction(fixtures[prediction.fixture_id], result, prediction)
+        
+        db.session.commit()
+        logging.info(f"Refreshed {len(stale)} stale predictions")
+        return len(stale)
+        
+    except Exception as e:
+        logging.error(f"Error refreshing stale predictions: {e}")
+        db.session.rollback()
+        return 0
+
+def _changed_dependency_keys(session):
+    """(source, keys) touched by the objects in a flush"""
+    keys = {source: set() for source in TEAM_SOURCES + FIXTURE_SOURCES}
+    injured_players = set()
+    
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Standings):
+            keys['standings'].add(obj.team_id)
+        elif isinstance(obj, (InjurySuspension, PlayerStats)):
+            injured_players.add(obj.player_id)
+        elif isinstance(obj, BettingOdds):
+            keys['odds'].add(obj.fixture_id)
+        elif isinstance(obj, PredictionAggregation):
+            keys['aggregations'].add(obj.fixture_id)
+    
+    if injured_players:
+        keys['injuries'] = set(session.connection().execute(
+            db.select(Player.team_id).where(Player.id.in_(injured_players))
+        ).scalars()) - {None}
+    
+    return {source: ids for source, ids in keys.items() if ids}
+
+# Team pairs per upcoming-fixture lookup, within SQLite's bound parameter limit
+PAIR_BATCH_SIZE = 500
+
+def upcoming_pair_fixture_ids(connection, pairs):
+    """Ids of upcoming fixtures between any of these (team, team) pairs, in either order"""
+    pairs = list(pairs)
+    fixture_ids = set()
+    for start in range(0, len(pairs), PAIR_BATCH_SIZE):
+        batch = pairs[start:start + PAIR_BATCH_SIZE]
+        fixture_ids.update(connection.execute(db.select(Fixture.id).where(
+            Fixture.status == 'Not Started',
+            Fixture.kickoff_time >= datetime.utcnow(),
+            db.or_(
+                db.tuple_(Fixture.home_team_id, Fixture.away_team_id).in_(batch),
+                db.tuple_(Fixture.away_team_id, Fixture.home_team_id).in_(batch)
+            )
+        )).scalars())
+    return fixture_ids
+
+def mark_stale(connection, changed):
+    """Flag upcoming predictions that depend on any of the changed (source, keys)
+    
+    Bulk writes that bypass the ORM call this directly; ORM flushes go
+    through the listener below.
+    """
+    dependents = db.select(PredictionDependency.prediction_id).where(db.or_(*[
+        (PredictionDependency.source == source) & PredictionDependency.source_key.in_(ids)
+        for source, ids in changed.items()
+    ]))
+    upcoming = db.select(Fixture.id).where(
+        Fixture.status == 'Not Started',
+        Fixture.kickoff_time >= datetime.utcnow()
+    )
+    connection.execute(
+        db.update(Prediction)
+        .where(Prediction.id.in_(dependents), Prediction.fixture_id.in_(upcoming))
+        .values(is_stale=True)
+    )
+
+@event.listens_for(Session, 'after_flush')
+def _mark_dependents_stale(session, flush_context):
+    """Flag upcoming predictions that read from rows written in this flush"""
+    try:
+        changed = _changed_dependency_keys(session)
+        if changed:
+            mark_stale(session.connection(), changed)
+        
+    except Exception as e:
+        logging.error(f"Error marking stale predictions: {e}")
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+# Requests per second and burst size for hosts without their own limit
+DEFAULT_RATE = 0.5
+DEFAULT_BURST = 2
+
+# Per-host budgets (requests per second, burst)
+HOST_LIMITS = {
+    'v3.football.api-sports.io': (5.0, 10)
+}
+
+class TokenBucket:
+    """Token bucket for one host
+
+    Callers reserve a token under the lock and are told how long to wait
+    for it, so the sleep itself happens outside the lock and concurrent
+    callers queue up in reservation order.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.requests = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+
+    def reserve(self):
+        """Take a token, returning the seconds to wait before using it"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        self.requests += 1
+        self.waited += wait
+        self.max_wait = max(self.max_wait, wait)
+        return wait
+
+class RateLimiter:
+    """Per-host token buckets shared by the sync and async scraping paths"""
+
+    def __init__(self, default_rate=DEFAULT_RATE, default_burst=DEFAULT_BURST, limits=None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host, rate, burst):
+        """Set the budget for a host, replacing any existing bucket"""
+        with self._lock:
+            self.limits[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def _reserve(self, url):
+        """Reserve a token for the URL's host and return the wait"""
+        host = urlsplit(url).hostname or url
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.limits.get(host, (self.default_rate, self.default_burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket.reserve()
+
+    def acquire(self, url):
+        """Block until a request to the URL's host is within budget"""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url):
+        """Wait without blocking the event loop until the host is within budget"""
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self):
+        """Requests and time spent waiting, per host"""
+        with self._lock:
+            return {
+                host: {
+                    'requests': bucket.requests,
+                    'waited_seconds': round(bucket.waited, 2),
+                    'max_wait_seconds': round(bucket.max_wait, 2),
+                    'rate': bucket.rate,
+                    'burst': bucket.burst
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+class RateLimitedAdapter(HTTPAdapter):
+    """requests adapter that waits for the host's budget before each send"""
+
+    def __init__(self, limiter, *args, **kwargs):
+        self.limiter = limiter
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        self.limiter.acquire(request.url)
+        return super().send(request, **kwargs)
+
+# Shared by every scraper in the process
+rate_limiter = RateLimiter()
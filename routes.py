@@ -3,11 +3,22 @@ from app import app, db
 from models import *
 from scraper import ScrapingService
 from prediction_engine import PredictionEngine
-from utils import get_user_session, calculate_confidence_color, format_confidence_display
+from prediction_refresh import save_prediction
+from live_scores import current_change_seq, changes_since
+from dropdown_cache import get_dropdown_options
+from data_cache import cached
+from utils import get_user_session, calculate_confidence_color, format_confidence_display, day_bounds
+import base64
+import binascii
 import json
 from datetime import datetime, date, timedelta
+from sqlalchemy.orm import joinedload, aliased
 import logging
 
+# Fixtures list page size, and the most a client may ask for
+FIXTURES_PER_PAGE = 50
+MAX_FIXTURES_PER_PAGE = 200
+
 # Initialize services
 scraping_service = ScrapingService()
 prediction_engine = PredictionEngine()
@@ -23,23 +34,24 @@ def index():
         user_prefs = UserPreferences.query.filter_by(user_session=user_session).first()
         lightweight_mode = user_prefs.lightweight_mode if user_prefs else False
         
-        # Get today's fixtures with predictions
-        fixtures = db.session.query(Fixture).filter(
-            db.func.date(Fixture.kickoff_time) == today
-        ).order_by(Fixture.kickoff_time).limit(50).all()
+        # Get today's fixtures with teams, league and prediction in one query
+        day_start, day_end = day_bounds(today)
+        fixtures = fixtures_with_predictions(db.session.query(Fixture).filter(
+            Fixture.kickoff_time >= day_start,
+            Fixture.kickoff_time < day_end
+        ).order_by(Fixture.kickoff_time), limit=50)
+        bookmarked_ids = bookmarked_fixture_ids(user_session, [fixture.id for fixture, _ in fixtures])
         
         # Enrich fixtures with predictions and confidence
         enriched_fixtures = []
-        for fixture in fixtures:
-            prediction = Prediction.query.filter_by(fixture_id=fixture.id).first()
-            
+        for fixture, prediction in fixtures:
             fixture_data = {
                 'fixture': fixture,
                 'prediction': prediction,
                 'confidence_color': calculate_confidence_color(prediction.confidence) if prediction else 'secondary',
                 'confidence_display': format_confidence_display(prediction) if prediction else None,
                 'importance_icon': get_importance_icon(fixture.importance_level),
-                'is_bookmarked': check_bookmark_status(fixture.id, user_session)
+                'is_bookmarked': fixture.id in bookmarked_ids
             }
             enriched_fixtures.append(fixture_data)
         
@@ -50,6 +62,7 @@ def index():
                              fixtures=enriched_fixtures,
                              performance=performance_today,
                              lightweight_mode=lightweight_mode,
+                             live_seq=current_change_seq(),
                              today=today)
     except Exception as e:
         logging.error(f"Error in index route: {e}")
@@ -59,52 +72,18 @@ def index():
 def fixtures():
     """Fixtures and results view with filtering"""
     try:
-        # Get filter parameters
-        league_id = request.args.get('league')
-        team_id = request.args.get('team')
-        date_filter = request.args.get('date', 'today')
-        status_filter = request.args.get('status', 'all')
-        
-        query = db.session.query(Fixture)
-        
-        # Apply filters
-        if league_id:
-            query = query.filter(Fixture.league_id == league_id)
-        if team_id:
-            query = query.filter(
-                (Fixture.home_team_id == team_id) | (Fixture.away_team_id == team_id)
-            )
-        
-        # Date filtering
-        if date_filter == 'today':
-            query = query.filter(db.func.date(Fixture.kickoff_time) == date.today())
-        elif date_filter == 'tomorrow':
-            query = query.filter(db.func.date(Fixture.kickoff_time) == date.today() + timedelta(days=1))
-        elif date_filter == 'week':
-            week_start = date.today()
-            week_end = week_start + timedelta(days=7)
-            query = query.filter(Fixture.kickoff_time.between(week_start, week_end))
-        
-        # Status filtering
-        if status_filter != 'all':
-            query = query.filter(Fixture.status == status_filter)
-        
-        fixtures = query.order_by(Fixture.kickoff_time).all()
-        
-        # Get all leagues and teams for filter dropdowns
-        leagues = League.query.all()
-        teams = Team.query.all()
+        filters = fixture_filters()
+        page = fixtures_page(filters)
+        dropdowns = get_dropdown_options()
         
         return render_template('fixtures.html', 
-                             fixtures=fixtures,
-                             leagues=leagues,
-                             teams=teams,
-                             current_filters={
-                                 'league': league_id,
-                                 'team': team_id,
-                                 'date': date_filter,
-                                 'status': status_filter
-                             })
+                             fixtures=page['fixtures'],
+                             predictions=latest_predictions_for(fixture.id for fixture in page['fixtures']),
+                             next_cursor=page['next_cursor'],
+                             prev_cursor=page['prev_cursor'],
+                             leagues=dropdowns['leagues'],
+                             teams=dropdowns['teams'],
+                             current_filters=filters)
     except Exception as e:
         logging.error(f"Error in fixtures route: {e}")
         return render_template('fixtures.html', fixtures=[], error="Failed to load fixtures")
@@ -184,14 +163,13 @@ def bookmarks():
     """User's bookmarked matches"""
     try:
         user_session = get_user_session()
-        bookmarked_fixtures = db.session.query(Fixture).join(BookmarkedMatch).filter(
+        bookmarked_fixtures = fixtures_with_predictions(db.session.query(Fixture).join(BookmarkedMatch).filter(
             BookmarkedMatch.user_session == user_session
-        ).order_by(Fixture.kickoff_time).all()
+        ).order_by(Fixture.kickoff_time))
         
         # Enrich with predictions
         enriched_fixtures = []
-        for fixture in bookmarked_fixtures:
-            prediction = Prediction.query.filter_by(fixture_id=fixture.id).first()
+        for fixture, prediction in bookmarked_fixtures:
             fixture_data = {
                 'fixture': fixture,
                 'prediction': prediction,
@@ -232,7 +210,7 @@ def dashboard():
             favorite_fixtures = db.session.query(Fixture).filter(
                 (Fixture.home_team_id.in_(team_ids)) | (Fixture.away_team_id.in_(team_ids))
             ).filter(
-                db.func.date(Fixture.kickoff_time) >= date.today()
+                Fixture.kickoff_time >= day_bounds(date.today())[0]
             ).order_by(Fixture.kickoff_time).limit(10).all()
         
         # Get performance stats
@@ -254,41 +232,19 @@ def dashboard():
 def prediction_calendar():
     """Calendar view of predictions"""
     try:
-        month = request.args.get('month', date.today().month)
-        year = request.args.get('year', date.today().year)
-        
-        # Get fixtures for the month
-        start_date = date(int(year), int(month), 1)
-        if int(month) == 12:
-            end_date = date(int(year) + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = date(int(year), int(month) + 1, 1) - timedelta(days=1)
-        
-        fixtures = Fixture.query.filter(
-            Fixture.kickoff_time.between(start_date, end_date)
-        ).order_by(Fixture.kickoff_time).all()
-        
-        # Group by date with predictions
-        calendar_data = {}
-        for fixture in fixtures:
-            fixture_date = fixture.kickoff_time.date()
-            if fixture_date not in calendar_data:
-                calendar_data[fixture_date] = []
-            
-            prediction = Prediction.query.filter_by(fixture_id=fixture.id).first()
-            calendar_data[fixture_date].append({
-                'fixture': fixture,
-                'prediction': prediction,
-                'confidence_color': calculate_confidence_color(prediction.confidence) if prediction else 'secondary'
-            })
+        month = int(request.args.get('month', date.today().month))
+        year = int(request.args.get('year', date.today().year))
+        
+        calendar_data, _, _ = calendar_summaries(*month_range(year, month))
         
         return render_template('calendar.html', 
                              calendar_data=calendar_data,
-                             current_month=int(month),
-                             current_year=int(year))
+                             current_month=month,
+                             current_year=year,
+                             date=date)
     except Exception as e:
         logging.error(f"Error in calendar route: {e}")
-        return render_template('calendar.html', error="Failed to load calendar")
+        return render_template('calendar.html', error="Failed to load calendar", date=date)
 
 # API Routes
 @app.route('/api/predict/<int:fixture_id>')
@@ -297,9 +253,9 @@ def api_predict(fixture_id):
     try:
         fixture = Fixture.query.get_or_404(fixture_id)
         
-        # Check if prediction already exists
-        existing_prediction = Prediction.query.filter_by(fixture_id=fixture_id).first()
-        if existing_prediction:
+        # Serve the stored prediction unless one of its inputs has changed
+        existing_prediction = Prediction.query.filter_by(fixture_id=fixture_id).order_by(Prediction.id.desc()).first()
+        if existing_prediction and not existing_prediction.is_stale:
             return jsonify({
                 'prediction': existing_prediction.prediction,
                 'confidence': existing_prediction.confidence,
@@ -307,19 +263,9 @@ def api_predict(fixture_id):
                 'cached': True
             })
         
-        # Generate new prediction
+        # Generate new prediction, replacing a stale one in place
         result = prediction_engine.predict_match(fixture)
-        
-        # Save prediction
-        prediction = Prediction(
-            fixture_id=fixture_id,
-            prediction=result['prediction'],
-            confidence=result['confidence'],
-            reasoning=result['reasoning'],
-            criteria_scores=json.dumps(result.get('criteria_scores', {})),
-            data_warnings=json.dumps(result.get('warnings', []))
-        )
-        db.session.add(prediction)
+        save_prediction(fixture, result, existing_prediction)
         db.session.commit()
         
         return jsonify(result)
@@ -327,6 +273,74 @@ def api_predict(fixture_id):
         logging.error(f"Error in predict API: {e}")
         return jsonify({'error': 'Failed to generate prediction'}), 500
 
+@app.route('/api/live')
+def api_live():
+    """Scores and statuses changed since a change sequence number"""
+    try:
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify({'seq': current_change_seq(), 'fixtures': []})
+        
+        return jsonify(changes_since(since))
+    except Exception as e:
+        logging.error(f"Error in live scores API: {e}")
+        return jsonify({'error': 'Failed to load live scores'}), 500
+
+@app.route('/api/fixtures')
+def api_fixtures():
+    """JSON page of fixtures, with cursors for the next and previous pages"""
+    try:
+        page = fixtures_page(fixture_filters())
+        return jsonify({
+            'fixtures': [
+                {
+                    'id': fixture.id,
+                    'kickoff_time': fixture.kickoff_time.isoformat(),
+                    'status': fixture.status,
+                    'home_score': fixture.home_score,
+                    'away_score': fixture.away_score,
+                    'venue': fixture.venue,
+                    'home_team': {'id': fixture.home_team.id, 'name': fixture.home_team.name},
+                    'away_team': {'id': fixture.away_team.id, 'name': fixture.away_team.name},
+                    'league': {'id': fixture.league.id, 'name': fixture.league.name} if fixture.league else None
+                }
+                for fixture in page['fixtures']
+            ],
+            'next_cursor': page['next_cursor'],
+            'prev_cursor': page['prev_cursor']
+        })
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except Exception as e:
+        logging.error(f"Error in fixtures API: {e}")
+        return jsonify({'error': 'Failed to load fixtures'}), 500
+
+@app.route('/api/calendar/<int:year>/<int:month>')
+def api_calendar(year, month):
+    """Per-day fixture counts and prediction summaries for a month"""
+    try:
+        calendar_data, counts, totals = calendar_summaries(
+            *month_range(year, month), per_day=request.args.get('per_day', type=int)
+        )
+        return jsonify({'calendar_data': calendar_data, 'counts': counts, 'totals': totals})
+    except ValueError:
+        return jsonify({'error': 'Invalid month'}), 400
+    except Exception as e:
+        logging.error(f"Error in calendar API: {e}")
+        return jsonify({'error': 'Failed to load calendar data'}), 500
+
+@app.route('/api/calendar/<int:year>/<int:month>/<int:day>')
+def api_calendar_day(year, month, day):
+    """Every fixture summary for one day, to expand a truncated month"""
+    try:
+        calendar_data, counts, totals = calendar_summaries(*day_bounds(date(year, month, day)))
+        return jsonify({'calendar_data': calendar_data, 'counts': counts, 'totals': totals})
+    except ValueError:
+        return jsonify({'error': 'Invalid date'}), 400
+    except Exception as e:
+        logging.error(f"Error in calendar day API: {e}")
+        return jsonify({'error': 'Failed to load calendar data'}), 500
+
 @app.route('/api/bookmark/<int:fixture_id>', methods=['POST', 'DELETE'])
 def api_bookmark(fixture_id):
     """Toggle bookmark status for a fixture"""
@@ -422,42 +436,7 @@ def api_search():
         if len(query) < 2:
             return jsonify({'results': []})
         
-        results = []
-        
-        # Search teams
-        teams = Team.query.filter(Team.name.ilike(f'%{query}%')).limit(5).all()
-        for team in teams:
-            results.append({
-                'type': 'team',
-                'id': team.id,
-                'name': team.name,
-                'country': team.country,
-                'url': f'/team/{team.id}'
-            })
-        
-        # Search leagues
-        leagues = League.query.filter(League.name.ilike(f'%{query}%')).limit(5).all()
-        for league in leagues:
-            results.append({
-                'type': 'league',
-                'id': league.id,
-                'name': league.name,
-                'country': league.country,
-                'url': f'/league/{league.id}'
-            })
-        
-        # Search players
-        players = Player.query.filter(Player.name.ilike(f'%{query}%')).limit(5).all()
-        for player in players:
-            results.append({
-                'type': 'player',
-                'id': player.id,
-                'name': player.name,
-                'position': player.position,
-                'url': f'/player/{player.id}'
-            })
-        
-        return jsonify({'results': results})
+        return jsonify({'results': search_results(query.lower())})
     
     except Exception as e:
         logging.error(f"Error in search API: {e}")
@@ -475,9 +454,231 @@ def get_importance_icon(importance_level):
     }
     return icons.get(importance_level, '')
 
-def check_bookmark_status(fixture_id, user_session):
-    """Check if fixture is bookmarked by user"""
-    return BookmarkedMatch.query.filter_by(
-        fixture_id=fixture_id, 
-        user_session=user_session
-    ).first() is not None
+def latest_predictions():
+    """Subquery of each fixture's latest prediction id"""
+    return db.session.query(
+        Prediction.fixture_id, db.func.max(Prediction.id).label('prediction_id')
+    ).group_by(Prediction.fixture_id).subquery()
+
+def latest_predictions_for(fixture_ids):
+    """Fixture id -> latest Prediction, for just these fixtures"""
+    fixture_ids = list(fixture_ids)
+    if not fixture_ids:
+        return {}
+    latest_ids = db.session.query(db.func.max(Prediction.id)).filter(
+        Prediction.fixture_id.in_(fixture_ids)
+    ).group_by(Prediction.fixture_id)
+    return {prediction.fixture_id: prediction for prediction in Prediction.query.filter(Prediction.id.in_(latest_ids))}
+
+def fixtures_with_predictions(fixture_query, limit=None):
+    """(fixture, latest prediction or None) pairs, with teams and league eager-loaded"""
+    latest = latest_predictions()
+    
+    query = fixture_query.outerjoin(
+        latest, latest.c.fixture_id == Fixture.id
+    ).outerjoin(
+        Prediction, Prediction.id == latest.c.prediction_id
+    ).add_entity(Prediction).options(
+        joinedload(Fixture.home_team), joinedload(Fixture.away_team), joinedload(Fixture.league)
+    )
+    return query.limit(limit).all() if limit else query.all()
+
+@cached('search', ttl=300)
+def search_results(query):
+    """Teams, leagues and players matching a search, as JSON-ready dicts"""
+    results = []
+    
+    # Search teams
+    teams = Team.query.filter(Team.name.ilike(f'%{query}%')).limit(5).all()
+    for team in teams:
+        results.append({
+            'type': 'team',
+            'id': team.id,
+            'name': team.name,
+            'country': team.country,
+            'url': f'/team/{team.id}'
+        })
+    
+    # Search leagues
+    leagues = League.query.filter(League.name.ilike(f'%{query}%')).limit(5).all()
+    for league in leagues:
+        results.append({
+            'type': 'league',
+            'id': league.id,
+            'name': league.name,
+            'country': league.country,
+            'url': f'/league/{league.id}'
+        })
+    
+    # Search players
+    players = Player.query.filter(Player.name.ilike(f'%{query}%')).limit(5).all()
+    for player in players:
+        results.append({
+            'type': 'player',
+            'id': player.id,
+            'name': player.name,
+            'position': player.position,
+            'url': f'/player/{player.id}'
+        })
+    
+    return results
+
+def fixture_filters():
+    """Fixture list filters and page position from the query string"""
+    return {
+        'league': request.args.get('league'),
+        'team': request.args.get('team'),
+        'date': request.args.get('date', 'today'),
+        'status': request.args.get('status', 'all'),
+        'after': request.args.get('after'),
+        'before': request.args.get('before'),
+        'per_page': min(request.args.get('per_page', FIXTURES_PER_PAGE, type=int), MAX_FIXTURES_PER_PAGE)
+    }
+
+def encode_cursor(fixture):
+    """Opaque page cursor for a fixture's (kickoff_time, id) position"""
+    position = f"{fixture.kickoff_time.isoformat()}|{fixture.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def decode_cursor(cursor):
+    """(kickoff_time, id) from a page cursor; ValueError if malformed"""
+    try:
+        kickoff_time, fixture_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(kickoff_time), int(fixture_id)
+    except (TypeError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def fixtures_page(filters):
+    """One page of filtered fixtures ordered by (kickoff_time, id)
+    
+    Keyset pagination: the page starts after (or ends before) the cursor's
+    position instead of at an offset, so deep pages cost the same as the
+    first. One extra row is fetched to tell whether another page follows.
+    """
+    query = db.session.query(Fixture).options(
+        joinedload(Fixture.home_team), joinedload(Fixture.away_team), joinedload(Fixture.league)
+    )
+    
+    if filters['league']:
+        query = query.filter(Fixture.league_id == filters['league'])
+    if filters['team']:
+        query = query.filter(
+            (Fixture.home_team_id == filters['team']) | (Fixture.away_team_id == filters['team'])
+        )
+    
+    # Date filtering on half-open kickoff ranges
+    date_ranges = {
+        'today': day_bounds(date.today()),
+        'tomorrow': day_bounds(date.today() + timedelta(days=1)),
+        'week': day_bounds(date.today(), days=7)
+    }
+    if filters['date'] in date_ranges:
+        range_start, range_end = date_ranges[filters['date']]
+        query = query.filter(Fixture.kickoff_time >= range_start, Fixture.kickoff_time < range_end)
+    
+    if filters['status'] != 'all':
+        query = query.filter(Fixture.status == filters['status'])
+    
+    per_page = max(1, filters['per_page'])
+    backwards = bool(filters['before']) and not filters['after']
+    cursor = filters['before'] if backwards else filters['after']
+    if cursor:
+        kickoff_time, fixture_id = decode_cursor(cursor)
+        position = db.tuple_(Fixture.kickoff_time, Fixture.id)
+        query = query.filter(position < (kickoff_time, fixture_id) if backwards else position > (kickoff_time, fixture_id))
+    
+    if backwards:
+        rows = query.order_by(Fixture.kickoff_time.desc(), Fixture.id.desc()).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next, has_prev = True, has_more
+    else:
+        rows = query.order_by(Fixture.kickoff_time, Fixture.id).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        has_next, has_prev = has_more, bool(cursor)
+    
+    return {
+        'fixtures': rows,
+        'next_cursor': encode_cursor(rows[-1]) if rows and has_next else None,
+        'prev_cursor': encode_cursor(rows[0]) if rows and has_prev else None
+    }
+
+def month_range(year, month):
+    """Half-open [first day, first day of next month) datetimes for a month"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return day_bounds(start, days=(end - start).days)
+
+@cached('calendar', ttl=60)
+def calendar_summaries(start, end, per_day=None):
+    """Compact fixture/prediction summaries grouped by day, per-day counts and totals
+
+    Built from one query over the kickoff range [start, end). With per_day,
+    each day lists at most that many fixtures while the counts and totals
+    stay complete, so a client can expand busy days on demand.
+    """
+    home_team = aliased(Team)
+    away_team = aliased(Team)
+    latest = latest_predictions()
+    rows = db.session.query(
+        Fixture.id, Fixture.kickoff_time, Fixture.status, Fixture.venue,
+        Fixture.home_team_id, home_team.name, Fixture.away_team_id, away_team.name,
+        League.name, Prediction.prediction, Prediction.confidence
+    ).join(
+        home_team, home_team.id == Fixture.home_team_id
+    ).join(
+        away_team, away_team.id == Fixture.away_team_id
+    ).join(
+        League, League.id == Fixture.league_id
+    ).outerjoin(
+        latest, latest.c.fixture_id == Fixture.id
+    ).outerjoin(
+        Prediction, Prediction.id == latest.c.prediction_id
+    ).filter(
+        Fixture.kickoff_time >= start,
+        Fixture.kickoff_time < end
+    ).order_by(Fixture.kickoff_time)
+    
+    calendar_data = {}
+    counts = {}
+    totals = {'matches': 0, 'high_confidence': 0, 'confidence_sum': 0.0, 'predicted': 0,
+              'Home': 0, 'Draw': 0, 'Away': 0}
+    for (fixture_id, kickoff_time, status, venue, home_id, home_name, away_id, away_name,
+         league_name, prediction, confidence) in rows:
+        day = kickoff_time.date().isoformat()
+        counts[day] = counts.get(day, 0) + 1
+        totals['matches'] += 1
+        if prediction and confidence:
+            totals['predicted'] += 1
+            totals['confidence_sum'] += confidence
+            totals['high_confidence'] += confidence >= 70
+            if prediction in totals:
+                totals[prediction] += 1
+        if per_day is not None and counts[day] > per_day:
+            continue
+        
+        calendar_data.setdefault(day, []).append({
+            'fixture': {
+                'id': fixture_id,
+                'kickoff_time': kickoff_time.isoformat(),
+                'status': status,
+                'venue': venue,
+                'home_team': {'id': home_id, 'name': home_name},
+                'away_team': {'id': away_id, 'name': away_name},
+                'league': {'name': league_name}
+            },
+            'prediction': {'prediction': prediction, 'confidence': confidence} if prediction else None,
+            'confidence_color': calculate_confidence_color(confidence) if prediction else 'secondary'
+        })
+    
+    return calendar_data, counts, totals
+
+def bookmarked_fixture_ids(user_session, fixture_ids):
+    """Ids among fixture_ids that the user has bookmarked"""
+    if not fixture_ids:
+        return set()
+    return {fixture_id for (fixture_id,) in db.session.query(BookmarkedMatch.fixture_id).filter(
+        BookmarkedMatch.user_session == user_session,
+        BookmarkedMatch.fixture_id.in_(fixture_ids)
+    )}
@@ -0,0 +1,293 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from app import app, db
+from models import Fixture, BettingOdds
+from live_scores import live_fixtures_filter
+
+# Lower runs first when several jobs are due
+PRIORITY_LIVE = 0
+PRIORITY_ODDS = 1
+PRIORITY_PREDICTIONS = 2
+PRIORITY_FIXTURES = 3
+PRIORITY_STANDINGS = 4
+PRIORITY_MAINTENANCE = 5
+
+# How often the planner looks for work, in seconds
+PLAN_INTERVAL = 5
+
+# Freshness targets, in seconds
+LIVE_INTERVAL = 10
+FIXTURES_INTERVAL = 3600
+PREDICT_DAY_INTERVAL = 1800
+STALE_REFRESH_INTERVAL = 120
+STANDINGS_HOUR = 3  # UTC hour of the nightly standings run
+
+# How long finish times are kept for keys that stop recurring (past fixtures, old dates)
+FINISHED_RETENTION = 2 * 24 * 3600
+
+# Odds refresh interval by time to kickoff: (kickoff within, refresh every)
+ODDS_SCHEDULE = [
+    (timedelta(hours=1), timedelta(minutes=5)),
+    (timedelta(hours=6), timedelta(minutes=30)),
+    (timedelta(hours=24), timedelta(hours=2)),
+    (timedelta(hours=48), timedelta(hours=6))
+]
+
+class JobScheduler:
+    """Priority queue of deduplicated jobs run by a few worker threads
+
+    Jobs are keyed; a key already queued or running is never queued again,
+    and scheduling a queued key earlier just moves it forward. Jobs wait in
+    a heap ordered by run time, move to a heap ordered by priority once
+    due, and run inside their own app context. A planner thread queues
+    recurring work every PLAN_INTERVAL seconds.
+    """
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self._waiting = []
+        self._ready = []
+        self._queued = {}
+        self._running = set()
+        self._last_finished = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._stopping = threading.Event()
+        self._scraper = None
+        self.stats = {'scheduled': 0, 'deduplicated': 0, 'run': 0, 'failed': 0}
+
+    def schedule(self, key, func, *args, priority=PRIORITY_FIXTURES, delay=0):
+        """Queue func(*args) under a key unless that key is already queued or running"""
+        run_at = time.monotonic() + delay
+        with self._condition:
+            queued = self._queued.get(key)
+            if key in self._running or (queued and queued['run_at'] <= run_at):
+                self.stats['deduplicated'] += 1
+                return False
+
+            if queued:
+                queued['cancelled'] = True
+            job = {'run_at': run_at, 'priority': priority, 'key': key, 'func': func, 'args': args, 'cancelled': False}
+            self._queued[key] = job
+            heapq.heappush(self._waiting, (run_at, next(self._counter), job))
+            self.stats['scheduled'] += 1
+            self._condition.notify()
+            return True
+
+    def seconds_since(self, key):
+        """Seconds since a key last finished, or None if it never ran"""
+        with self._condition:
+            finished = self._last_finished.get(key)
+        return None if finished is None else time.monotonic() - finished
+
+    def prune_finished(self, max_age=FINISHED_RETENTION):
+        """Forget finish times older than max_age seconds"""
+        cutoff = time.monotonic() - max_age
+        with self._condition:
+            for key in [key for key, finished in self._last_finished.items() if finished < cutoff]:
+                del self._last_finished[key]
+
+    def scraper(self):
+        """The scraping service shared by this scheduler's jobs, created on first use"""
+        if self._scraper is None:
+            from scraper import ScrapingService
+            self._scraper = ScrapingService()
+        return self._scraper
+
+    def is_pending(self, key):
+        """Whether a key is queued or running"""
+        with self._condition:
+            return key in self._queued or key in self._running
+
+    def status(self):
+        """Counters plus queued and running jobs"""
+        with self._condition:
+            return dict(self.stats, queued=len(self._queued), running=sorted(str(key) for key in self._running))
+
+    def _next_job(self):
+        """Block until a job is due, then claim the most urgent one"""
+        with self._condition:
+            while not self._stopping.is_set():
+                now = time.monotonic()
+                while self._waiting and self._waiting[0][0] <= now:
+                    _, sequence, job = heapq.heappop(self._waiting)
+                    if not job['cancelled']:
+                        heapq.heappush(self._ready, (job['priority'], sequence, job))
+
+                if self._ready:
+                    job = heapq.heappop(self._ready)[2]
+                    del self._queued[job['key']]
+                    self._running.add(job['key'])
+                    return job
+
+                self._condition.wait(self._waiting[0][0] - now if self._waiting else None)
+            return None
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            outcome = 'run'
+            try:
+                with app.app_context():
+                    job['func'](*job['args'])
+            except Exception as e:
+                logging.error(f"Scheduled job {job['key']} failed: {e}")
+                outcome = 'failed'
+            finally:
+                with self._condition:
+                    self.stats[outcome] += 1
+                    self._running.discard(job['key'])
+                    self._last_finished[job['key']] = time.monotonic()
+
+    def _plan(self):
+        while not self._stopping.is_set():
+            with app.app_context():
+                plan_jobs(self)
+            self._stopping.wait(PLAN_INTERVAL)
+
+    def start(self):
+        """Start the planner and worker threads, unless already started"""
+        if self._threads:
+            return
+        self._stopping.clear()
+        targets = [self._plan] + [self._work] * self.workers
+        for target in targets:
+            thread = threading.Thread(target=target, daemon=True, name='job-scheduler')
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop after the jobs in progress finish"""
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def run_forever(self):
+        """Run until interrupted, for the standalone worker"""
+        self.start()
+        try:
+            while True:
+                time.sleep(60)
+                logging.info(f"Scheduler stats: {self.status()}")
+        except KeyboardInterrupt:
+            self.stop()
+
+def _is_due(scheduler, key, interval):
+    """Whether a recurring job has not run within its interval"""
+    elapsed = scheduler.seconds_since(key)
+    return elapsed is None or elapsed >= interval
+
+def _odds_interval(kickoff, now):
+    """Refresh interval for a fixture's odds, or None when too far out"""
+    for within, interval in ODDS_SCHEDULE:
+        if kickoff - now <= within:
+            return interval
+    return None
+
+def plan_jobs(scheduler):
+    """Queue whatever recurring work is due"""
+    from prediction_refresh import refresh_stale_predictions
+    from daily_predictions import predict_day
+
+    try:
+        scraper = scheduler.scraper()
+        now = datetime.utcnow()
+        today = now.date()
+
+        # Live scores only while something is in play or about to kick off
+        if _is_due(scheduler, ('live',), LIVE_INTERVAL) and Fixture.query.filter(live_fixtures_filter(now)).first():
+            scheduler.schedule(('live',), scraper.scrape_live_scores, priority=PRIORITY_LIVE)
+
+        # Odds more often the closer a fixture is to kickoff. When the job
+        # last ran decides; a scrape may store nothing (no bookmaker covers
+        # the fixture), so stored odds only help after a restart
+        last_odds = db.func.max(BettingOdds.created_at)
+        upcoming = db.session.query(Fixture.id, Fixture.kickoff_time, last_odds).outerjoin(
+            BettingOdds, BettingOdds.fixture_id == Fixture.id
+        ).filter(
+            Fixture.status == 'Not Started',
+            Fixture.kickoff_time >= now,
+            Fixture.kickoff_time < now + ODDS_SCHEDULE[-1][0]
+        ).group_by(Fixture.id, Fixture.kickoff_time)
+        for fixture_id, kickoff_time, scraped_at in upcoming:
+            interval = _odds_interval(kickoff_time, now)
+            if not interval or not _is_due(scheduler, ('odds', fixture_id), interval.total_seconds()):
+                continue
+            if scraped_at is None or now - scraped_at >= interval:
+                scheduler.schedule(('odds', fixture_id), scraper.scrape_betting_odds, fixture_id,
+                                   priority=PRIORITY_ODDS)
+
+        if _is_due(scheduler, ('refresh-predictions',), STALE_REFRESH_INTERVAL):
+            scheduler.schedule(('refresh-predictions',), refresh_stale_predictions, priority=PRIORITY_PREDICTIONS)
+        if _is_due(scheduler, ('predict-day',), PREDICT_DAY_INTERVAL):
+            scheduler.schedule(('predict-day',), predict_day, today, None, 1,
+                               priority=PRIORITY_PREDICTIONS)
+
+        if _is_due(scheduler, ('fixtures',), FIXTURES_INTERVAL):
+            scheduler.schedule(('fixtures',), scraper.ingest_fixtures, today, 3,
+                               priority=PRIORITY_FIXTURES)
+
+        # Standings once a night for leagues playing this week
+        standings_key = ('standings', today)
+        if now.hour >= STANDINGS_HOUR and not scheduler.is_pending(standings_key) and \
+                scheduler.seconds_since(standings_key) is None:
+            league_ids = [league_id for (league_id,) in db.session.query(Fixture.league_id).filter(
+                Fixture.kickoff_time >= now, Fixture.kickoff_time < now + timedelta(days=7)
+            ).distinct()]
+            scheduler.schedule(standings_key, _scrape_standings, scraper, league_ids,
+                               priority=PRIORITY_STANDINGS)
+
+        scheduler.prune_finished()
+
+    except Exception as e:
+        logging.error(f"Error planning scheduled jobs: {e}")
+        db.session.rollback()
+
+def _scrape_standings(scraper, league_ids):
+    """Refresh standings league by league"""
+    for league_id in league_ids:
+        scraper.scrape_standings(league_id)
+
+_scheduler = None
+
+def start_in_process_scheduler(workers=2):
+    """Run the process-wide scheduler on background threads"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = JobScheduler(workers=workers)
+        _scheduler.start()
+        logging.info("In-process job scheduler started")
+    return _scheduler
+
+def submit_job(key, func, *args, priority=PRIORITY_MAINTENANCE):
+    """Run a one-off job off the request thread
+
+    Queued on this process's scheduler when it runs here, otherwise run on
+    a thread of its own, since the standalone worker is another process.
+    """
+    if _scheduler is not None:
+        return _scheduler.schedule(key, func, *args, priority=priority)
+
+    def run():
+        try:
+            with app.app_context():
+                func(*args)
+        except Exception as e:
+            logging.error(f"Background job {key} failed: {e}")
+
+    threading.Thread(target=run, daemon=True, name=f"job-{key[0]}").start()
+    return True
+
+def scheduler_status():
+    """Status of this process's scheduler, or None when it is not running here"""
+    return _scheduler.status() if _scheduler else None
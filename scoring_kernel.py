@@ -0,0 +1,147 @@
+import numpy as np
+
+# Criteria in the order the engine accumulates them. The scalar and the
+# vectorized paths both sum in this order so their floats match exactly.
+CRITERIA = [
+    'form_standings',
+    'home_away',
+    'player_availability',
+    'match_stats',
+    'h2h',
+    'ai_predictions',
+    'odds_agreement',
+    'intangibles'
+]
+
+CRITERIA_WARNINGS = {
+    'form_standings': "⚠️ Form data missing — confidence reduced",
+    'home_away': "⚠️ Home/Away stats missing — using average",
+    'player_availability': "⚠️ Player availability data missing — confidence reduced",
+    'match_stats': "⚠️ Team statistics missing — using form only",
+    'h2h': "⚠️ Head-to-head data limited — reduced weight",
+    'ai_predictions': "⚠️ AI predictions unavailable — using manual analysis",
+    'odds_agreement': "⚠️ Odds unavailable — using form stats only",
+    'intangibles': None
+}
+
+# Outcome codes used by the vectorized path
+OUTCOMES = ('Home', 'Draw', 'Away')
+HOME, DRAW, AWAY = 0, 1, 2
+
+def criterion_points(criterion, result):
+    """Home/away points a criterion result contributes before weighting"""
+    if criterion == 'ai_predictions':
+        # The consensus adds the bare weight to the predicted side
+        if result['prediction'] == 'Home':
+            return 1.0, 0.0
+        elif result['prediction'] == 'Away':
+            return 0.0, 1.0
+        return 0.0, 0.0
+
+    return result['home_score'], result['away_score']
+
+def weight_vector(weights):
+    """Weights dict keyed by criterion as an array in CRITERIA order"""
+    return np.array([float(weights[criterion]) for criterion in CRITERIA])
+
+class CriteriaMatrix:
+    """Per-criterion home/away scores for N fixtures plus the draw-override inputs"""
+
+    def __init__(self, size):
+        self.home = np.zeros((size, len(CRITERIA)))
+        self.away = np.zeros((size, len(CRITERIA)))
+        self.available = np.zeros((size, len(CRITERIA)), dtype=bool)
+        self.close_standings = np.zeros(size, dtype=bool)
+        self.derby = np.zeros(size, dtype=bool)
+        self.h2h_total = np.zeros(size, dtype=np.int32)
+        self.h2h_home_wins = np.zeros(size, dtype=np.int32)
+        self.h2h_away_wins = np.zeros(size, dtype=np.int32)
+
+    def __len__(self):
+        return self.home.shape[0]
+
+    def set_row(self, row, results, close_standings=False, derby=False):
+        """Fill one fixture's row from the criteria analyzer results"""
+        for column, criterion in enumerate(CRITERIA):
+            result = results.get(criterion)
+            if result:
+                self.home[row, column], self.away[row, column] = criterion_points(criterion, result)
+                self.available[row, column] = True
+
+        self.close_standings[row] = bool(close_standings)
+        self.derby[row] = bool(derby)
+
+        h2h = results.get('h2h')
+        if h2h:
+            self.h2h_total[row] = h2h['total_games']
+            self.h2h_home_wins[row] = h2h['home_wins']
+            self.h2h_away_wins[row] = h2h['away_wins']
+
+    @classmethod
+    def concatenate(cls, matrices):
+        """Stack several matrices into one"""
+        matrices = list(matrices)
+        combined = cls(0)
+        if matrices:
+            for name in vars(combined):
+                setattr(combined, name, np.concatenate([getattr(m, name) for m in matrices]))
+        return combined
+
+def score_matrix(matrix, weights, thresholds):
+    """Score every row of a CriteriaMatrix in one vectorized pass
+
+    Mirrors PredictionEngine._score_fixture: weighted sum, threshold
+    classification, draw overrides and data-availability scaling. Returns
+    unrounded arrays; confidence matches the scalar path before rounding.
+    """
+    size = len(matrix)
+    fractions = weight_vector(weights) / 100
+
+    # Accumulate column by column so the float additions happen in the
+    # same order as the scalar loop
+    home_score = np.zeros(size)
+    away_score = np.zeros(size)
+    for column in range(len(CRITERIA)):
+        available = matrix.available[:, column]
+        home_score += np.where(available, matrix.home[:, column] * fractions[column], 0.0)
+        away_score += np.where(available, matrix.away[:, column] * fractions[column], 0.0)
+
+    total_score = home_score + away_score
+    scored = total_score > 0
+    safe_total = np.where(scored, total_score, 1.0)
+    home_percentage = np.where(scored, (home_score / safe_total) * 100, 50.0)
+    away_percentage = np.where(scored, (away_score / safe_total) * 100, 50.0)
+
+    is_home = home_percentage >= thresholds['home']
+    is_away = ~is_home & (away_percentage >= (100 - thresholds['away']))
+    prediction = np.full(size, DRAW, dtype=np.int8)
+    prediction[is_home] = HOME
+    prediction[is_away] = AWAY
+    confidence = np.where(
+        is_home, home_percentage,
+        np.where(is_away, away_percentage, 100 - np.maximum(home_percentage, away_percentage))
+    )
+
+    # Draw overrides: close standings, both sides in poor form, or a derby
+    # with a close recent head-to-head
+    form = CRITERIA.index('form_standings')
+    h2h = CRITERIA.index('h2h')
+    poor_form = matrix.available[:, form] & (matrix.home[:, form] < 30) & (matrix.away[:, form] < 30)
+    close_derby = (
+        matrix.derby & matrix.available[:, h2h] & (matrix.h2h_total >= 5) &
+        (np.abs(matrix.h2h_home_wins - matrix.h2h_away_wins) <= 1)
+    )
+    override = matrix.close_standings | poor_form | close_derby
+    prediction[override] = DRAW
+    confidence = np.where(override, np.maximum(50.0, confidence * 0.8), confidence)
+
+    data_availability = matrix.available.sum(axis=1) / 8  # 8 total criteria
+
+    return {
+        'prediction': prediction,
+        'confidence': confidence * data_availability,
+        'home_percentage': home_percentage,
+        'away_percentage': away_percentage,
+        'data_availability': data_availability,
+        'override': override
+    }
@@ -1,19 +1,61 @@
+import asyncio
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
 import json
 import logging
 from datetime import datetime, date, timedelta
-from app import db
+from app import app, db
 from models import *
-import time
+from settings_cache import get_settings
+from rate_limiter import rate_limiter
+from source_health import source_health
+from html_parsing import parse_document, listing_selectors, parse_listings
+from http_cache import CachingAdapter, get_http_cache
+from prediction_refresh import mark_stale
+from fixture_ingest import ingest_fixtures
+from api_football import get_api_client
+from live_scores import live_fixtures_filter, apply_live_updates
+from utils import normalize_team_name
+from sqlalchemy.orm import aliased
 import random
 from urllib.parse import urljoin, quote
 import os
 
+# Async mode: connections open at once, per host, and fixtures in flight
+ASYNC_MAX_CONNECTIONS = 50
+ASYNC_MAX_PER_HOST = 4
+ASYNC_MAX_FIXTURES = 20
+ASYNC_TIMEOUT = 10
+
+# Where a prediction site lists the day's tips, when that is not its homepage
+PREDICTION_LISTING_PATHS = {
+    'https://www.forebet.com': '/en/football-tips-and-predictions-for-today',
+    'https://www.predictz.com': '/predictions/today/',
+    'https://www.windrawwin.com': '/predictions/today/'
+}
+
+ODDS_SOURCES = [
+    'https://www.oddsportal.com',
+    'https://www.betexplorer.com',
+    'https://www.bet365.com'
+]
+
 class ScrapingService:
-    def __init__(self):
+    def __init__(self, async_mode=None):
         self.api_key = os.environ.get("API_FOOTBALL_KEY", "default_key")
+        # Fetch every source concurrently instead of one site at a time
+        if async_mode is None:
+            async_mode = app.config.get('SCRAPER_ASYNC_MODE', False)
+        self.async_mode = async_mode
         self.session = requests.Session()
+        # Per-host politeness budget instead of sleeping after every request,
+        # with unchanged pages answered from the on-disk HTTP cache
+        self.rate_limiter = rate_limiter
+        # Retries and circuit breaking per source, so a dead site is skipped
+        self.source_health = source_health
+        adapter = CachingAdapter(self.rate_limiter, get_http_cache())
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -35,9 +77,7 @@ class ScrapingService:
     def get_dynamic_match_limit(self):
         """Get current match limit based on date and admin settings"""
         try:
-            settings = AdminSettings.query.first()
-            if not settings:
-                return 50  # Default fallback
+            settings = get_settings()
             
             today = date.today()
             scaling_start = datetime.strptime(settings.scaling_start_date, '%Y-%m-%d').date()
@@ -74,42 +114,17 @@ class ScrapingService:
             logging.error(f"Error scraping fixtures: {e}")
             return []
     
-    def _scrape_fixtures_api(self):
+    def ingest_fixtures(self, day=None, days=1, league_ids=None):
+        """Fetch fixtures for a run of days from API-Football and store them"""
+        day = day or date.today()
+        return ingest_fixtures(get_api_client().fixtures_for_range(
+            day, day + timedelta(days=days - 1), league_ids
+        ))
+    
+    def _scrape_fixtures_api(self, day=None):
         """Scrape fixtures using API-Football"""
         try:
-            today_str = date.today().strftime('%Y-%m-%d')
-            url = f"https://v3.football.api-sports.io/fixtures"
-            
-            headers = {
-                'X-RapidAPI-Key': self.api_key,
-                'X-RapidAPI-Host': 'v3.football.api-sports.io'
-            }
-            
-            params = {
-                'date': today_str,
-                'status': 'NS-1H-HT-2H-ET-P-FT-AET-PEN'
-            }
-            
-            response = requests.get(url, headers=headers, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                fixtures = []
-                
-                for match in data.get('response', []):
-                    fixture_data = {
-                        'id': match['fixture']['id'],
-                        'home_team': match['teams']['home']['name'],
-                        'away_team': match['teams']['away']['name'],
-                        'league': match['league']['name'],
-                        'kickoff_time': match['fixture']['date'],
-                        'status': match['fixture']['status']['long'],
-                        'venue': match['fixture']['venue']['name'],
-                        'referee': match['fixture']['referee']
-                    }
-                    fixtures.append(fixture_data)
-                
-                return fixtures
+            return get_api_client().fixtures(day or date.today())
             
         except Exception as e:
             logging.error(f"API scraping failed: {e}")
@@ -139,19 +154,34 @@ class ScrapingService:
             logging.error(f"Web scraping failed: {e}")
             return []
     
+    def _get(self, url):
+        """GET through the source's circuit breaker, retrying transient failures
+        
+        Returns None without a request while the source's circuit is open.
+        """
+        return self.source_health.call(url, lambda: self.session.get(url, timeout=10))
+    
+    async def _get_async(self, http, url):
+        """Async counterpart of _get, returning (status, body) or None"""
+        async def fetch():
+            await self.rate_limiter.acquire_async(url)
+            async with http.get(url) as response:
+                return response.status, await response.read()
+        
+        return await self.source_health.call_async(url, fetch)
+    
     def _scrape_from_source(self, source_url):
         """Scrape fixtures from a specific source"""
         try:
-            response = self.session.get(source_url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self._get(source_url)
+            if response is None:
+                return []
+            document = parse_document(response.content)
             
             # This would need specific parsing logic for each site
             # For demo purposes, returning sample structure
             fixtures = []
             
-            # Add rate limiting
-            time.sleep(random.uniform(1, 3))
-            
             return fixtures
             
         except Exception as e:
@@ -160,6 +190,9 @@ class ScrapingService:
     
     def scrape_prediction_aggregation(self, fixture_id):
         """Scrape predictions from multiple sites for a fixture"""
+        if self.async_mode:
+            return self.scrape_predictions_concurrently([fixture_id]).get(fixture_id)
+        
         try:
             predictions = []
             
@@ -169,9 +202,6 @@ class ScrapingService:
                     if prediction:
                         predictions.append(prediction)
                     
-                    # Rate limiting
-                    time.sleep(random.uniform(2, 5))
-                    
                 except Exception as e:
                     logging.error(f"Error scraping {site}: {e}")
                     continue
@@ -181,15 +211,7 @@ class ScrapingService:
                 consensus = self._calculate_prediction_consensus(predictions)
                 
                 # Save aggregated predictions
-                for pred in predictions:
-                    aggregation = PredictionAggregation(
-                        fixture_id=fixture_id,
-                        source_name=pred['source'],
-                        prediction=pred['prediction'],
-                        confidence=pred.get('confidence', 0.0)
-                    )
-                    db.session.add(aggregation)
-                
+                self._save_aggregations(fixture_id, predictions)
                 db.session.commit()
                 return consensus
             
@@ -205,20 +227,152 @@ class ScrapingService:
             # This would need specific parsing logic for each prediction site
             # For now, returning sample data
             
-            response = self.session.get(site_url, timeout=10)
-            if response.status_code == 200:
-                # Parse prediction (site-specific logic needed)
-                return {
-                    'source': site_url.split('//')[1].split('.')[1],  # Extract site name
-                    'prediction': random.choice(['Home', 'Draw', 'Away']),  # Sample
-                    'confidence': random.uniform(40, 90)  # Sample
-                }
+            response = self._get(site_url)
+            if response is None:
+                return None
+            return self._parse_site_prediction(site_url, response.status_code, response.content)
             
         except Exception as e:
             logging.error(f"Error scraping prediction from {site_url}: {e}")
             
         return None
     
+    def _parse_site_prediction(self, site_url, status_code, content):
+        """Prediction from a fetched site page, shared by the sync and async paths"""
+        if status_code == 200:
+            # Parse prediction (site-specific logic needed)
+            return {
+                'source': self._site_name(site_url),
+                'prediction': random.choice(['Home', 'Draw', 'Away']),  # Sample
+                'confidence': random.uniform(40, 90)  # Sample
+            }
+        return None
+    
+    def _site_name(self, site_url):
+        """Short site name from a URL, e.g. forebet"""
+        return site_url.split('//')[1].split('.')[1]
+    
+    def _save_aggregations(self, fixture_id, predictions):
+        """Add scraped predictions for a fixture to the session"""
+        for pred in predictions:
+            db.session.add(PredictionAggregation(
+                fixture_id=fixture_id,
+                source_name=pred['source'],
+                prediction=pred['prediction'],
+                confidence=pred.get('confidence', 0.0)
+            ))
+    
+    def scrape_prediction_listings(self, day=None):
+        """Aggregate every site's predictions for a day from one listing page per site
+        
+        Each site's daily 1X2 listing is downloaded once and every match on it
+        is mapped to that day's fixtures by normalized team names. The
+        matched rows replace earlier rows from the same sources and are
+        written with one bulk insert, instead of one request per fixture
+        and site.
+        """
+        stats = {'sites': 0, 'listed': 0, 'matched': 0, 'fixtures': 0}
+        try:
+            day = day or date.today()
+            fixture_index = self._fixture_name_index(day)
+            if not fixture_index:
+                return stats
+            
+            urls = {site: site + PREDICTION_LISTING_PATHS.get(site, '') for site in self.prediction_sites}
+            pages = self._fetch_pages(list(urls.values()))
+            
+            sources = {url: self._site_name(site) for site, url in urls.items() if url in pages}
+            listings = parse_listings({
+                url: (pages[url], listing_selectors(source)) for url, source in sources.items()
+            })
+            
+            rows = {}
+            for url, source in sources.items():
+                stats['sites'] += 1
+                for match in listings[url]:
+                    stats['listed'] += 1
+                    fixture_id = fixture_index.get((
+                        normalize_team_name(match['home_team']),
+                        normalize_team_name(match['away_team'])
+                    ))
+                    if fixture_id:
+                        rows[(fixture_id, source)] = {
+                            'fixture_id': fixture_id,
+                            'source_name': source,
+                            'prediction': match['prediction'],
+                            'confidence': match['confidence']
+                        }
+            
+            if rows:
+                fixture_ids = {fixture_id for fixture_id, _ in rows}
+                sources = {source for _, source in rows}
+                db.session.execute(
+                    db.delete(PredictionAggregation).where(
+                        PredictionAggregation.fixture_id.in_(fixture_ids),
+                        PredictionAggregation.source_name.in_(sources)
+                    )
+                )
+                db.session.execute(db.insert(PredictionAggregation), list(rows.values()))
+                # Core statements bypass the ORM flush that normally marks predictions stale
+                mark_stale(db.session.connection(), {'aggregations': fixture_ids})
+                db.session.commit()
+                stats['fixtures'] = len(fixture_ids)
+            
+            stats['matched'] = len(rows)
+            logging.info(f"Aggregated {len(rows)} site predictions for {stats['fixtures']} fixtures on {day}")
+            return stats
+            
+        except Exception as e:
+            logging.error(f"Error aggregating prediction listings: {e}")
+            db.session.rollback()
+            return stats
+    
+    def _fixture_name_index(self, day):
+        """(normalized home name, normalized away name) -> fixture id for a day"""
+        home_team = aliased(Team)
+        away_team = aliased(Team)
+        rows = db.session.query(Fixture.id, home_team.name, away_team.name).join(
+            home_team, Fixture.home_team_id == home_team.id
+        ).join(
+            away_team, Fixture.away_team_id == away_team.id
+        ).filter(
+            Fixture.kickoff_time >= datetime.combine(day, datetime.min.time()),
+            Fixture.kickoff_time < datetime.combine(day + timedelta(days=1), datetime.min.time())
+        )
+        return {
+            (normalize_team_name(home_name), normalize_team_name(away_name)): fixture_id
+            for fixture_id, home_name, away_name in rows
+        }
+    
+    def _fetch_pages(self, urls):
+        """Bodies of the URLs that answered 200, fetched concurrently in async mode"""
+        if self.async_mode:
+            return asyncio.run(self._fetch_pages_async(urls))
+        
+        pages = {}
+        for url in urls:
+            try:
+                response = self._get(url)
+                if response is not None and response.status_code == 200:
+                    pages[url] = response.content
+            except Exception as e:
+                logging.error(f"Error fetching {url}: {e}")
+        return pages
+    
+    async def _fetch_pages_async(self, urls):
+        """Async counterpart of _fetch_pages"""
+        async with self._client_session() as http:
+            async def fetch(url):
+                try:
+                    result = await self._get_async(http, url)
+                    if result is not None and result[0] == 200:
+                        return url, result[1]
+                except Exception as e:
+                    logging.error(f"Error fetching {url}: {e}")
+                return url, None
+            
+            return {url: content for url, content in await asyncio.gather(*[fetch(url) for url in urls]) if content}
+    
     def _calculate_prediction_consensus(self, predictions):
         """Calculate consensus from multiple predictions"""
         try:
@@ -257,38 +411,24 @@ class ScrapingService:
     
     def scrape_betting_odds(self, fixture_id):
         """Scrape betting odds from multiple bookmakers"""
+        if self.async_mode:
+            return self.scrape_odds_concurrently([fixture_id]).get(fixture_id, [])
+        
         try:
-            odds_sources = [
-                'https://www.oddsportal.com',
-                'https://www.betexplorer.com',
-                'https://www.bet365.com'
-            ]
-            
             all_odds = []
             
-            for source in odds_sources:
+            for source in ODDS_SOURCES:
                 try:
                     odds = self._scrape_odds_from_source(source, fixture_id)
                     if odds:
                         all_odds.extend(odds)
                     
-                    time.sleep(random.uniform(1, 3))
-                    
                 except Exception as e:
                     logging.error(f"Error scraping odds from {source}: {e}")
                     continue
             
             # Save odds to database
-            for odd in all_odds:
-                betting_odd = BettingOdds(
-                    fixture_id=fixture_id,
-                    bookmaker=odd['bookmaker'],
-                    home_odds=odd['home_odds'],
-                    draw_odds=odd['draw_odds'],
-                    away_odds=odd['away_odds']
-                )
-                db.session.add(betting_odd)
-            
+            self._save_odds(fixture_id, all_odds)
             db.session.commit()
             return all_odds
             
@@ -299,18 +439,116 @@ class ScrapingService:
     def _scrape_odds_from_source(self, source_url, fixture_id):
         """Scrape odds from a specific bookmaker"""
         try:
-            # This would need specific parsing logic for each odds site
-            # For demo purposes, returning sample data
+            return self._parse_odds(source_url, None)
+            
+        except Exception as e:
+            logging.error(f"Error scraping odds from {source_url}: {e}")
+            return []
+    
+    def _parse_odds(self, source_url, content):
+        """Odds from a bookmaker page, shared by the sync and async paths"""
+        # This would need specific parsing logic for each odds site
+        # For demo purposes, returning sample data
+        return [{
+            'bookmaker': self._site_name(source_url),
+            'home_odds': round(random.uniform(1.5, 4.0), 2),
+            'draw_odds': round(random.uniform(2.8, 4.5), 2),
+            'away_odds': round(random.uniform(1.8, 5.0), 2)
+        }]
+    
+    def _save_odds(self, fixture_id, odds):
+        """Add scraped odds for a fixture to the session"""
+        for odd in odds:
+            db.session.add(BettingOdds(
+                fixture_id=fixture_id,
+                bookmaker=odd['bookmaker'],
+                home_odds=odd['home_odds'],
+                draw_odds=odd['draw_odds'],
+                away_odds=odd['away_odds']
+            ))
+    
+    def scrape_predictions_concurrently(self, fixture_ids, max_fixtures=ASYNC_MAX_FIXTURES):
+        """Scrape every prediction site for many fixtures at once
+        
+        All sites for a fixture are fetched together, so a fixture costs the
+        latency of its slowest site, and up to `max_fixtures` fixtures are in
+        flight over one shared connection pool. Results are saved in a single
+        commit. Returns the consensus per fixture id.
+        """
+        try:
+            scraped = asyncio.run(self._gather_fixtures(
+                fixture_ids, max_fixtures, self.prediction_sites, self._fetch_site_prediction
+            ))
+            
+            consensus = {}
+            for fixture_id, predictions in scraped.items():
+                if predictions:
+                    consensus[fixture_id] = self._calculate_prediction_consensus(predictions)
+                    self._save_aggregations(fixture_id, predictions)
+            
+            db.session.commit()
+            return consensus
+            
+        except Exception as e:
+            logging.error(f"Error in concurrent prediction aggregation: {e}")
+            db.session.rollback()
+            return {}
+    
+    def scrape_odds_concurrently(self, fixture_ids, max_fixtures=ASYNC_MAX_FIXTURES):
+        """Scrape every bookmaker for many fixtures at once, saved in one commit"""
+        try:
+            scraped = asyncio.run(self._gather_fixtures(
+                fixture_ids, max_fixtures, ODDS_SOURCES, self._fetch_odds
+            ))
+            
+            all_odds = {}
+            for fixture_id, odds_lists in scraped.items():
+                all_odds[fixture_id] = [odd for odds in odds_lists for odd in odds]
+                self._save_odds(fixture_id, all_odds[fixture_id])
             
-            bookmaker_name = source_url.split('//')[1].split('.')[1]
+            db.session.commit()
+            return all_odds
             
-            return [{
-                'bookmaker': bookmaker_name,
-                'home_odds': round(random.uniform(1.5, 4.0), 2),
-                'draw_odds': round(random.uniform(2.8, 4.5), 2),
-                'away_odds': round(random.uniform(1.8, 5.0), 2)
-            }]
+        except Exception as e:
+            logging.error(f"Error in concurrent odds scraping: {e}")
+            db.session.rollback()
+            return {}
+    
+    def _client_session(self):
+        """aiohttp session with a shared pool capped globally and per host"""
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=ASYNC_MAX_CONNECTIONS, limit_per_host=ASYNC_MAX_PER_HOST),
+            timeout=aiohttp.ClientTimeout(total=ASYNC_TIMEOUT),
+            headers=dict(self.session.headers)
+        )
+    
+    async def _gather_fixtures(self, fixture_ids, max_fixtures, sources, fetch):
+        """Run `fetch` for every (fixture, source) pair, a few fixtures at a time"""
+        semaphore = asyncio.Semaphore(max_fixtures)
+        
+        async with self._client_session() as http:
+            async def scrape_fixture(fixture_id):
+                async with semaphore:
+                    results = await asyncio.gather(*[fetch(http, source, fixture_id) for source in sources])
+                return fixture_id, [result for result in results if result]
             
+            return dict(await asyncio.gather(*[scrape_fixture(fixture_id) for fixture_id in fixture_ids]))
+    
+    async def _fetch_site_prediction(self, http, site_url, fixture_id):
+        """Async counterpart of _scrape_site_prediction"""
+        try:
+            result = await self._get_async(http, site_url)
+            if result is None:
+                return None
+            return self._parse_site_prediction(site_url, *result)
+        except Exception as e:
+            logging.error(f"Error scraping prediction from {site_url}: {e}")
+            return None
+    
+    async def _fetch_odds(self, http, source_url, fixture_id):
+        """Async counterpart of _scrape_odds_from_source"""
+        try:
+            return self._parse_odds(source_url, None)
         except Exception as e:
             logging.error(f"Error scraping odds from {source_url}: {e}")
             return []
@@ -344,13 +582,19 @@ class ScrapingService:
             logging.error(f"Error scraping standings: {e}")
     
     def scrape_live_scores(self):
-        """Scrape live scores and update fixtures"""
+        """Poll in-play and kicking-off fixtures and write the scores that changed"""
+        payloads = []
         try:
-            # Implementation for live score updates
-            pass
+            external_ids = [external_id for (external_id,) in db.session.query(Fixture.external_id).filter(
+                live_fixtures_filter(), Fixture.external_id.isnot(None)
+            )]
+            if external_ids:
+                payloads = get_api_client().fixtures_by_ids(external_ids)
             
         except Exception as e:
             logging.error(f"Error scraping live scores: {e}")
+        
+        return apply_live_updates(payloads)
     
     def detect_match_importance(self, fixture):
         """Detect if a match has special importance"""
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from app import db
+from models import AdminSettings
+
+# How long a worker trusts its snapshot before re-checking the stored version
+REFRESH_INTERVAL = 5.0
+
+SETTINGS_FIELDS = [
+    'home_win_threshold', 'draw_threshold_min', 'draw_threshold_max', 'away_win_threshold',
+    'form_weight', 'home_away_weight', 'player_availability_weight', 'match_stats_weight',
+    'h2h_weight', 'ai_predictions_weight', 'odds_agreement_weight', 'intangibles_weight',
+    'max_matches_weekday', 'max_matches_weekend', 'scaling_start_date'
+]
+
+class SettingsSnapshot(namedtuple('SettingsSnapshot', SETTINGS_FIELDS + ['version'])):
+    """Immutable copy of AdminSettings at a given version"""
+    __slots__ = ()
+    
+    @property
+    def weights(self):
+        """Criterion weights keyed the way the prediction engine expects"""
+        return {
+            'form_standings': self.form_weight,
+            'home_away': self.home_away_weight,
+            'player_availability': self.player_availability_weight,
+            'match_stats': self.match_stats_weight,
+            'h2h': self.h2h_weight,
+            'ai_predictions': self.ai_predictions_weight,
+            'odds_agreement': self.odds_agreement_weight,
+            'intangibles': self.intangibles_weight
+        }
+    
+    @property
+    def thresholds(self):
+        """Home/away win thresholds"""
+        return {
+            'home': self.home_win_threshold,
+            'away': self.away_win_threshold
+        }
+
+DEFAULT_SETTINGS = SettingsSnapshot(
+    home_win_threshold=65.0,
+    draw_threshold_min=40.0,
+    draw_threshold_max=64.0,
+    away_win_threshold=39.0,
+    form_weight=25.0,
+    home_away_weight=10.0,
+    player_availability_weight=15.0,
+    match_stats_weight=20.0,
+    h2h_weight=10.0,
+    ai_predictions_weight=5.0,
+    odds_agreement_weight=10.0,
+    intangibles_weight=5.0,
+    max_matches_weekday=100,
+    max_matches_weekend=300,
+    scaling_start_date='2025-07-13',
+    version=0
+)
+
+_lock = threading.Lock()
+_snapshot = None
+_checked_at = 0.0
+
+def snapshot_from_row(settings):
+    """Build a snapshot from an AdminSettings row"""
+    return SettingsSnapshot(
+        *(getattr(settings, field) for field in SETTINGS_FIELDS),
+        version=settings.version or 0
+    )
+
+def get_settings():
+    """Current settings snapshot for this process
+    
+    Served from memory; once every REFRESH_INTERVAL seconds the stored
+    version is compared and the full row reloaded only if it moved.
+    """
+    global _snapshot, _checked_at
+    
+    now = time.monotonic()
+    if _snapshot is not None and now - _checked_at < REFRESH_INTERVAL:
+        return _snapshot
+    
+    with _lock:
+        if _snapshot is not None and now - _checked_at < REFRESH_INTERVAL:
+            return _snapshot
+        
+        try:
+            stored_version = db.session.query(AdminSettings.version).order_by(AdminSettings.id).limit(1).scalar()
+            if _snapshot is None or (stored_version or 0) != _snapshot.version:
+                settings = AdminSettings.query.order_by(AdminSettings.id).first()
+                _snapshot = snapshot_from_row(settings) if settings else DEFAULT_SETTINGS
+            _checked_at = now
+            
+        except Exception as e:
+            logging.error(f"Error loading admin settings: {e}")
+            if _snapshot is None:
+                return DEFAULT_SETTINGS
+        
+        return _snapshot
+
+def bump_settings_version(settings):
+    """Mark an AdminSettings row as changed so every worker reloads it"""
+    settings.version = (settings.version or 0) + 1
+
+def invalidate_settings():
+    """Force this process to re-check the stored settings on next access"""
+    global _checked_at
+    _checked_at = 0.0
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import aiohttp
+import requests
+
+# Consecutive failed calls that open a source's circuit
+FAILURE_THRESHOLD = 3
+
+# Seconds an open circuit rejects calls; doubles on each failed trial, up to the max
+COOLDOWN = 60
+MAX_COOLDOWN = 900
+
+# Retries for transient errors, with exponential backoff from this base delay
+RETRIES = 2
+BACKOFF = 0.5
+
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (
+    requests.ConnectionError, requests.Timeout,
+    aiohttp.ClientConnectionError, asyncio.TimeoutError
+)
+
+class TransientStatus(Exception):
+    """A response whose status is worth retrying"""
+
+class SourceHealth:
+    """Success rate, latency and circuit state for one source"""
+
+    def __init__(self):
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.consecutive_failures = 0
+        self.cooldown = COOLDOWN
+        self.open_until = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.open_until is None:
+            return 'closed'
+        return 'open' if time.monotonic() < self.open_until else 'half-open'
+
+class SourceHealthRegistry:
+    """Circuit breakers and retry policy for every scraping source
+
+    A source is a host. After FAILURE_THRESHOLD failed calls in a row its
+    circuit opens and calls are refused at once for the cooldown. The first
+    call after the cooldown is a trial: success closes the circuit, and
+    failure reopens it with a doubled cooldown.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, retries=RETRIES, backoff=BACKOFF):
+        self.failure_threshold = failure_threshold
+        self.retries = retries
+        self.backoff = backoff
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def _source(self, url):
+        return urlsplit(url).hostname or url
+
+    def allow(self, url):
+        """Whether a call to the URL's source may go ahead"""
+        with self._lock:
+            health = self._sources.setdefault(self._source(url), SourceHealth())
+            state = health.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not health.trial_in_flight:
+                health.trial_in_flight = True
+                return True
+            return False
+
+    def record(self, url, success, latency):
+        """Record the outcome of a call, opening or closing the circuit"""
+        with self._lock:
+            health = self._sources.setdefault(self._source(url), SourceHealth())
+            was_trial = health.trial_in_flight
+            health.trial_in_flight = False
+            health.requests += 1
+            health.total_latency += latency
+
+            if success:
+                health.successes += 1
+                health.consecutive_failures = 0
+                health.open_until = None
+                health.cooldown = COOLDOWN
+                return
+
+            health.failures += 1
+            health.consecutive_failures += 1
+            if was_trial:
+                health.cooldown = min(health.cooldown * 2, MAX_COOLDOWN)
+            if was_trial or health.consecutive_failures >= self.failure_threshold:
+                health.open_until = time.monotonic() + health.cooldown
+                logging.warning(f"Circuit opened for {self._source(url)} for {health.cooldown}s")
+
+    def _delay(self, attempt):
+        """Backoff before a retry, with jitter so callers do not retry in lockstep"""
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def call(self, url, fetch):
+        """Run fetch() for a URL with retries, or return None while its circuit is open
+
+        fetch returns a requests Response; transient statuses and network
+        errors are retried with backoff and count against the source.
+        """
+        if not self.allow(url):
+            logging.debug(f"Skipping {url}: circuit open")
+            return None
+
+        started = time.monotonic()
+        for attempt in range(self.retries + 1):
+            try:
+                response = fetch()
+                if response.status_code in TRANSIENT_STATUSES:
+                    raise TransientStatus(response.status_code)
+                self.record(url, True, time.monotonic() - started)
+                return response
+            except TRANSIENT_ERRORS + (TransientStatus,) as e:
+                if attempt == self.retries:
+                    self.record(url, False, time.monotonic() - started)
+                    raise
+                logging.debug(f"Retrying {url} after {e!r}")
+                time.sleep(self._delay(attempt))
+            except Exception:
+                self.record(url, False, time.monotonic() - started)
+                raise
+
+    async def call_async(self, url, fetch):
+        """Async counterpart of call(); fetch is a coroutine function returning (status, body)"""
+        if not self.allow(url):
+            logging.debug(f"Skipping {url}: circuit open")
+            return None
+
+        started = time.monotonic()
+        for attempt in range(self.retries + 1):
+            try:
+                status, body = await fetch()
+                if status in TRANSIENT_STATUSES:
+                    raise TransientStatus(status)
+                self.record(url, True, time.monotonic() - started)
+                return status, body
+            except TRANSIENT_ERRORS + (TransientStatus,) as e:
+                if attempt == self.retries:
+                    self.record(url, False, time.monotonic() - started)
+                    raise
+                logging.debug(f"Retrying {url} after {e!r}")
+                await asyncio.sleep(self._delay(attempt))
+            except Exception:
+                self.record(url, False, time.monotonic() - started)
+                raise
+
+    def stats(self):
+        """Success rate, average latency and circuit state per source"""
+        with self._lock:
+            return {
+                source: {
+                    'state': health.state,
+                    'requests': health.requests,
+                    'success_rate': round(health.successes / health.requests * 100, 1) if health.requests else None,
+                    'avg_latency_ms': round(health.total_latency / health.requests * 1000) if health.requests else None,
+                    'consecutive_failures': health.consecutive_failures,
+                    'cooldown_seconds': health.cooldown if health.open_until else None
+                }
+                for source, health in self._sources.items()
+            }
+
+# Shared by every scraper in the process
+source_health = SourceHealthRegistry()
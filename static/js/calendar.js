@@ -5,6 +5,11 @@ class CalendarManager {
         this.currentDate = new Date();
         this.currentView = 'month';
         this.matchData = {};
+        this.matchCounts = {};
+        this.matchTotals = null;
+        // The month view lists a few matches per day; the rest load on demand
+        this.matchesPerDay = 3;
+        this.monthComplete = false;
         this.filters = {
             league: '',
             confidence: '',
@@ -87,11 +92,18 @@ class CalendarManager {
             const year = this.currentDate.getFullYear();
             const month = this.currentDate.getMonth() + 1;
             
-            const response = await fetch(`/api/calendar/${year}/${month}`);
+            const full = this.needsFullMonth();
+            const query = full ? '' : `?per_day=${this.matchesPerDay}`;
+            const response = await fetch(`/api/calendar/${year}/${month}${query}`);
             const data = await response.json();
             
             if (response.ok) {
                 this.matchData = data.calendar_data || {};
+                this.matchCounts = data.counts || {};
+                this.matchTotals = data.totals || null;
+                this.monthComplete = full || Object.entries(this.matchCounts).every(
+                    ([dateKey, count]) => (this.matchData[dateKey] || []).length >= count
+                );
                 this.updateSummaryStats();
                 this.renderCalendar();
             } else {
@@ -105,6 +117,11 @@ class CalendarManager {
         }
     }
     
+    needsFullMonth() {
+        // Week and day views and the filters work on every match
+        return this.currentView !== 'month' || Object.values(this.filters).some(Boolean);
+    }
+    
     renderCalendar() {
         switch(this.currentView) {
             case 'month':
@@ -169,6 +186,7 @@ class CalendarManager {
         
         const dateKey = this.formatDateKey(year, month, day);
         const dayMatches = this.getFilteredMatches(dateKey);
+        const total = this.monthComplete ? dayMatches.length : (this.matchCounts[dateKey] || 0);
         
         // Day number
         const dayNumber = document.createElement('div');
@@ -193,10 +211,10 @@ class CalendarManager {
             element.appendChild(indicators);
             
             // Add match count
-            if (dayMatches.length > 3) {
+            if (total > 3) {
                 const countBadge = document.createElement('div');
                 countBadge.className = 'match-count-badge';
-                countBadge.textContent = `+${dayMatches.length - 3}`;
+                countBadge.textContent = `+${total - 3}`;
                 element.appendChild(countBadge);
             }
             
@@ -207,7 +225,7 @@ class CalendarManager {
             });
             
             // Tooltip
-            element.title = `${dayMatches.length} matches`;
+            element.title = `${total} matches`;
         }
         
         return element;
@@ -389,7 +407,27 @@ class CalendarManager {
         `;
     }
     
-    showDayMatches(dateKey, matches) {
+    async loadDayMatches(dateKey) {
+        // Fetch the rest of a day the month response truncated
+        const loaded = (this.matchData[dateKey] || []).length;
+        if (loaded >= (this.matchCounts[dateKey] || 0)) return;
+        
+        const [year, month, day] = dateKey.split('-').map(Number);
+        const response = await fetch(`/api/calendar/${year}/${month}/${day}`);
+        if (response.ok) {
+            const data = await response.json();
+            this.matchData[dateKey] = (data.calendar_data || {})[dateKey] || [];
+        }
+    }
+    
+    async showDayMatches(dateKey, matches) {
+        try {
+            await this.loadDayMatches(dateKey);
+            matches = this.getFilteredMatches(dateKey);
+        } catch (error) {
+            console.error('Day expansion error:', error);
+        }
+        
         const modal = new bootstrap.Modal(document.getElementById('matchModal'));
         const modalDate = document.getElementById('modalDate');
         const modalMatches = document.getElementById('modalMatches');
@@ -492,7 +530,11 @@ class CalendarManager {
         });
         document.getElementById(`${view}View`)?.classList.remove('d-none');
         
-        this.renderCalendar();
+        if (this.needsFullMonth() && !this.monthComplete) {
+            this.loadCalendarData();
+        } else {
+            this.renderCalendar();
+        }
     }
     
     updatePeriodHeader() {
@@ -526,6 +568,20 @@ class CalendarManager {
     }
     
     updateSummaryStats() {
+        if (!this.monthComplete && this.matchTotals) {
+            // Only a preview of each day is loaded; use the month's totals
+            const totals = this.matchTotals;
+            this.updateSummaryElement('totalMatches', totals.matches);
+            this.updateSummaryElement('highConfidenceMatches', totals.high_confidence);
+            this.updateSummaryElement('avgConfidence', 
+                totals.predicted > 0 ? Math.round(totals.confidence_sum / totals.predicted) + '%' : '0%'
+            );
+            this.updateSummaryElement('predictionBreakdown', 
+                `<small>H: ${totals.Home} | D: ${totals.Draw} | A: ${totals.Away}</small>`
+            );
+            return;
+        }
+        
         let totalMatches = 0;
         let highConfidenceMatches = 0;
         let totalConfidence = 0;
@@ -576,6 +632,10 @@ class CalendarManager {
     }
     
     applyFilters() {
+        if (this.needsFullMonth() && !this.monthComplete) {
+            this.loadCalendarData();
+            return;
+        }
         this.renderCalendar();
         this.updateSummaryStats();
     }
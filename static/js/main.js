@@ -339,25 +339,47 @@ function initializeRealTimeUpdates() {
 
 async function updateLiveScores() {
     try {
-        const liveMatches = document.querySelectorAll('[data-status*="Progress"], [data-status*="Half"]');
+        // Ask only for fixtures changed since the last sequence number seen
+        const container = document.getElementById('fixturesContainer');
+        if (!container || container.dataset.liveSeq === undefined) return;
         
-        if (liveMatches.length === 0) return;
+        const response = await fetch(`/api/live?since=${container.dataset.liveSeq}`);
+        if (!response.ok) return;
+        const data = await response.json();
         
-        // This would make API calls to update live scores
-        console.log('Checking for live score updates...');
+        data.fixtures.forEach(change => {
+            const card = container.querySelector(`.fixture-card[data-fixture-id="${change.id}"]`);
+            if (!card) return;
+            
+            const status = card.querySelector('.fixture-status');
+            card.dataset.status = change.status;
+            status.textContent = change.status;
+            status.classList.remove('pulse');
+            if (change.status !== 'Not Started') {
+                card.querySelector('.fixture-score').textContent = `${change.home_score} - ${change.away_score}`;
+            }
+        });
+        container.dataset.liveSeq = data.seq;
         
         // Update UI indicators
         updateLiveIndicators();
         
+        // The server caps each reply; fetch the rest right away
+        if (data.more) {
+            updateLiveScores();
+        }
+        
     } catch (error) {
         console.error('Live score update error:', error);
     }
 }
 
 function updateLiveIndicators() {
-    const liveElements = document.querySelectorAll('.badge:contains("Live")');
+    const liveElements = document.querySelectorAll(
+        '.fixture-card[data-status*="Progress"] .fixture-status, .fixture-card[data-status*="Half"] .fixture-status'
+    );
     liveElements.forEach(element => {
-        element.classList.toggle('pulse');
+        element.classList.add('pulse');
     });
 }
 
@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+
+# The app configures itself from the environment on import, so point it at
+# a throwaway database and HTTP cache before anything imports it
+_workdir = tempfile.mkdtemp(prefix='nelsonforecast-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ['HTTP_CACHE_PATH'] = os.path.join(_workdir, 'http_cache.sqlite3')
+os.environ['DATA_CACHE_SHARED'] = 'false'
+os.environ['SCHEDULER_IN_PROCESS'] = 'false'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app import app as flask_app, db
+
+@pytest.fixture
+def app():
+    """App context over an empty database"""
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_fixture(app):
+    """Create a fixture between two named teams, creating the league and teams as needed"""
+    from datetime import datetime
+    from models import Fixture, League, Team
+
+    def make(home, away, kickoff=None, status='Not Started', home_score=None, away_score=None, **columns):
+        league = League.query.filter_by(name='Premier League').first()
+        if league is None:
+            league = League(name='Premier League', country='England', season='2025')
+            db.session.add(league)
+            db.session.flush()
+        teams = []
+        for name in (home, away):
+            team = Team.query.filter_by(name=name).first()
+            if team is None:
+                team = Team(name=name, league_id=league.id)
+                db.session.add(team)
+                db.session.flush()
+            teams.append(team)
+        fixture = Fixture(
+            home_team_id=teams[0].id, away_team_id=teams[1].id, league_id=league.id,
+            kickoff_time=kickoff or datetime.utcnow(), status=status,
+            home_score=home_score, away_score=away_score, **columns
+        )
+        db.session.add(fixture)
+        db.session.flush()
+        return fixture
+
+    return make
@@ -0,0 +1,56 @@
+import threading
+import time
+from api_football import ApiFootballClient, QuotaExhausted
+
+class FakeResponse:
+    from_cache = False
+
+    def __init__(self, remaining):
+        self.headers = {'x-ratelimit-requests-remaining': str(remaining)}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'response': [{'ok': True}], 'paging': {'current': 1, 'total': 1}}
+
+class SlowApi:
+    """Counts requests and answers each after a delay, like a real round trip"""
+
+    def __init__(self, remaining):
+        self.remaining = remaining
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+            self.remaining -= 1
+            remaining = self.remaining
+        time.sleep(0.05)
+        return FakeResponse(remaining)
+
+def test_parallel_requests_never_spend_the_reserve(app):
+    client = ApiFootballClient(api_key='test', quota_reserve=10)
+    client.session = SlowApi(remaining=12)
+    client._record_quota({'x-ratelimit-requests-remaining': '12'})
+    start = threading.Barrier(8)
+    outcomes = []
+
+    def request():
+        start.wait()
+        try:
+            client.get('fixtures')
+            outcomes.append('sent')
+        except QuotaExhausted:
+            outcomes.append('refused')
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.session.calls == 2
+    assert sorted(outcomes) == ['refused'] * 6 + ['sent'] * 2
+    assert client.requests_available() == 0
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from app import db
+from models import League
+from backtest import collect_history, replay_history, run_backtest
+
+class RecordingEngine:
+    """Stands in for PredictionEngine, keeping the inputs each fixture was scored with"""
+
+    def __init__(self):
+        self.seen = {}
+
+    def _evaluate_criteria(self, fixture, inputs):
+        pair = frozenset((fixture.home_team_id, fixture.away_team_id))
+        self.seen[fixture.id] = {
+            'home_form': len(inputs['forms'].get(fixture.home_team_id, ())),
+            'h2h': len(inputs['h2h'][pair]),
+            'home_standing': inputs['standings'][fixture.home_team_id]
+        }
+        return {}
+
+    def _teams_very_close_standings(self, home, away):
+        return False
+
+def finished(make_fixture, home, away, kickoff, league_id=None, home_score=1, away_score=0):
+    fixture = make_fixture(home, away, kickoff=kickoff, status='Finished',
+                           home_score=home_score, away_score=away_score)
+    if league_id:
+        fixture.league_id = league_id
+    return fixture
+
+def test_form_and_head_to_head_carry_across_seasons_and_competitions(make_fixture):
+    start = datetime(2024, 8, 1, 15)
+    finished(make_fixture, 'Arsenal', 'Chelsea', start)
+    cup = League(name='FA Cup', country='England', season='2025')
+    db.session.add(cup)
+    db.session.flush()
+    finished(make_fixture, 'Arsenal', 'Leeds', start + timedelta(days=7), league_id=cup.id)
+    next_season = League(name='Premier League', country='England', season='2026')
+    db.session.add(next_season)
+    db.session.flush()
+    rematch = finished(make_fixture, 'Arsenal', 'Chelsea', start + timedelta(days=365), league_id=next_season.id)
+    db.session.commit()
+
+    engine = RecordingEngine()
+    list(replay_history(engine=engine))
+
+    seen = engine.seen[rematch.id]
+    assert seen['home_form'] == 2
+    assert seen['h2h'] == 1
+    # The table is per league season, so the new season starts empty
+    assert seen['home_standing'] is None
+
+def test_history_before_the_range_feeds_state_but_is_not_scored(make_fixture):
+    start = datetime(2024, 8, 1, 15)
+    finished(make_fixture, 'Arsenal', 'Chelsea', start)
+    later = finished(make_fixture, 'Chelsea', 'Arsenal', start + timedelta(days=30))
+    db.session.commit()
+
+    engine = RecordingEngine()
+    chunks = list(replay_history(date_from=(start + timedelta(days=1)).date(), engine=engine))
+
+    assert list(engine.seen) == [later.id]
+    assert engine.seen[later.id]['h2h'] == 1
+    assert sum(len(actual) for _, actual, _ in chunks) == 1
+
+def test_backtest_and_tuning_history_cover_the_same_fixtures(make_fixture):
+    start = datetime(2024, 8, 1, 15)
+    for day in range(6):
+        finished(make_fixture, 'Arsenal' if day % 2 else 'Chelsea', 'Leeds', start + timedelta(days=day),
+                 home_score=day % 3, away_score=1)
+    db.session.commit()
+
+    report = run_backtest()
+    matrix, actual = collect_history()
+
+    assert report['total_predictions'] == len(actual) == len(matrix) == 6
+    assert sum(r['total_predictions'] for r in report['leagues'].values()) == 6
@@ -0,0 +1,40 @@
+import logging
+from data_cache import MISSING, DataCache, DatabaseCacheBackend
+from models import CacheManagement
+
+def test_invalidate_moves_namespace_to_a_new_version(app):
+    cache = DataCache(shared=DatabaseCacheBackend())
+    key = cache.key('calendar', 'month', 2026, 10)
+    cache.set('calendar', key, {'days': 3})
+
+    cache.invalidate('calendar')
+
+    assert cache.key('calendar', 'month', 2026, 10) != key
+    assert cache.get('calendar', cache.key('calendar', 'month', 2026, 10)) is MISSING
+    # The old entry is left to expire rather than deleted
+    assert CacheManagement.query.filter_by(cache_key=key).count() == 1
+
+def test_other_processes_follow_a_new_version(app):
+    writer = DataCache(shared=DatabaseCacheBackend())
+    reader = DataCache(shared=DatabaseCacheBackend())
+    key = writer.key('search', 'arsenal')
+    writer.set('search', key, ['Arsenal'])
+    assert reader.get('search', reader.key('search', 'arsenal')) == ['Arsenal']
+
+    writer.invalidate('search')
+    # As if the reader's copy of the version had reached VERSION_TTL
+    reader._versions.clear()
+
+    assert reader.get('search', reader.key('search', 'arsenal')) is MISSING
+
+def test_values_that_are_not_json_stay_in_memory_quietly(app, caplog):
+    cache = DataCache(shared=DatabaseCacheBackend())
+    key = cache.key('calendar', 'objects')
+    value = {object()}
+
+    with caplog.at_level(logging.ERROR):
+        cache.set('calendar', key, value)
+
+    assert cache.get('calendar', key) is value
+    assert not caplog.records
+    assert cache.stats()['namespaces']['calendar']['shared_errors'] == 0
@@ -0,0 +1,54 @@
+from models import Fixture, League, Team
+from fixture_ingest import ingest_fixtures
+
+def payload(fixture_id, league, league_id, country, home, home_id, away, away_id, season=2025):
+    return {
+        'id': fixture_id,
+        'league': league, 'league_external_id': league_id, 'league_country': country, 'season': season,
+        'home_team': home, 'home_team_external_id': home_id,
+        'away_team': away, 'away_team_external_id': away_id,
+        'kickoff_time': '2025-09-01T15:00:00+00:00',
+        'status_short': 'NS', 'status': 'Not Started',
+        'home_score': None, 'away_score': None
+    }
+
+def test_same_names_from_other_entities_get_their_own_rows(app):
+    ingest_fixtures([payload(9001, 'Premier League', 39, 'England', 'FC Barcelona', 529, 'Arsenal', 42)])
+    ingest_fixtures([payload(9002, 'Premier League', 333, 'Ukraine', 'Barcelona SC', 1234, 'Dynamo Kyiv', 572)])
+
+    england = League.query.filter_by(country='England').one()
+    ukraine = League.query.filter_by(country='Ukraine').one()
+    assert (england.external_id, ukraine.external_id) == (39, 333)
+
+    barcelona = Team.query.filter_by(name='FC Barcelona').one()
+    barcelona_sc = Team.query.filter_by(name='Barcelona SC').one()
+    assert (barcelona.external_id, barcelona_sc.external_id) == (529, 1234)
+
+    fixture = Fixture.query.filter_by(external_id=9002).one()
+    assert fixture.league_id == ukraine.id
+    assert fixture.home_team_id == barcelona_sc.id
+
+def test_rows_without_external_id_are_adopted_by_name(app):
+    from app import db
+    league = League(name='Premier League', country='England', season='2025')
+    db.session.add(league)
+    db.session.flush()
+    db.session.add(Team(name='Arsenal FC', league_id=league.id))
+    db.session.commit()
+
+    stats = ingest_fixtures([payload(9001, 'Premier League', 39, 'England', 'Arsenal', 42, 'Chelsea', 49)])
+
+    assert stats['leagues_created'] == 0
+    assert stats['teams_created'] == 1
+    assert League.query.one().external_id == 39
+    assert Team.query.filter_by(name='Arsenal FC').one().external_id == 42
+
+def test_league_name_match_is_scoped_by_country(app):
+    from app import db
+    db.session.add(League(name='Premier League', country='England', season='2025'))
+    db.session.commit()
+
+    ingest_fixtures([payload(9001, 'Premier League', 333, 'Ukraine', 'Shakhtar', 550, 'Dynamo Kyiv', 572)])
+
+    assert League.query.filter_by(country='England').one().external_id is None
+    assert League.query.filter_by(country='Ukraine').one().external_id == 333
@@ -0,0 +1,40 @@
+import html_parsing
+from html_parsing import listing_selectors, parse_listings, parse_prediction_listing
+
+TABLE_PAGE = b"""<html><body><table>
+<tr><th>Match</th><th>Tip</th><th>Chance</th></tr>
+<tr><td><span>Arsenal</span> <span>vs</span> <span>Chelsea</span></td><td>1</td><td>62%</td></tr>
+<tr><td>Everton - Fulham</td><td>X</td><td>n/a</td></tr>
+</table></body></html>"""
+
+FOREBET_ROW = """<div class="rcnt"><span class="homeTeam">Leeds</span><span class="awayTeam">Wolves</span>
+<div class="fprc"><span class="fpr">21</span><span>30</span></div><span class="forepr">2</span></div>"""
+
+def test_table_rows_are_read_with_the_generic_heuristics():
+    assert parse_prediction_listing(TABLE_PAGE) == [
+        {'home_team': 'Arsenal', 'away_team': 'Chelsea', 'prediction': 'Home', 'confidence': 62.0},
+        {'home_team': 'Everton', 'away_team': 'Fulham', 'prediction': 'Draw', 'confidence': 0.0}
+    ]
+
+def test_site_selectors_pick_out_each_field():
+    page = f"<html><body>{FOREBET_ROW}</body></html>".encode()
+    assert parse_prediction_listing(page, listing_selectors('forebet')) == [
+        {'home_team': 'Leeds', 'away_team': 'Wolves', 'prediction': 'Away', 'confidence': 21.0}
+    ]
+
+def test_empty_pages_have_no_matches():
+    assert parse_prediction_listing(b'') == []
+    assert parse_prediction_listing(b'  \n') == []
+
+def test_large_pages_are_parsed_in_spawned_workers(monkeypatch):
+    monkeypatch.setattr(html_parsing, 'LARGE_PAGE_BYTES', 1)
+    monkeypatch.setattr(html_parsing, 'PARSE_WORKERS', 2)
+    pages = {'a': (TABLE_PAGE, None), 'b': (TABLE_PAGE, None)}
+    try:
+        results = parse_listings(pages)
+        assert html_parsing._pool._mp_context.get_start_method() == 'spawn'
+    finally:
+        html_parsing.shutdown_parse_pool()
+
+    assert results['a'] == results['b'] == parse_prediction_listing(TABLE_PAGE)
+    assert html_parsing._pool is None
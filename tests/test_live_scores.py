@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+from app import db
+from models import Fixture
+from fixture_ingest import ingest_fixtures
+from live_scores import apply_live_updates, changes_since, next_change_seq
+
+def payload(status_short, home_score=None, away_score=None):
+    return {
+        'id': 7001, 'league': 'Premier League', 'league_external_id': 39, 'league_country': 'England',
+        'season': 2025, 'home_team': 'Arsenal', 'home_team_external_id': 42,
+        'away_team': 'Chelsea', 'away_team_external_id': 49,
+        'kickoff_time': (datetime.utcnow() - timedelta(hours=2)).isoformat(),
+        'status_short': status_short, 'home_score': home_score, 'away_score': away_score
+    }
+
+def test_change_seq_counter_starts_from_stored_changes_and_increments(make_fixture):
+    make_fixture('Arsenal', 'Chelsea', change_seq=41)
+    db.session.commit()
+
+    first = next_change_seq()
+    db.session.commit()
+    second = next_change_seq()
+    db.session.commit()
+
+    assert (first, second) == (42, 43)
+
+def test_ingest_bumps_change_seq_only_for_changed_fixtures(app):
+    ingest_fixtures([payload('2H', 1, 0)])
+    started = changes_since(0)
+    assert [f['status'] for f in started['fixtures']] == ['2nd Half']
+
+    ingest_fixtures([payload('2H', 1, 0)])
+    assert changes_since(started['seq'])['fixtures'] == []
+
+    ingest_fixtures([payload('FT', 2, 0)])
+    finished = changes_since(started['seq'])
+    assert [(f['status'], f['home_score']) for f in finished['fixtures']] == [('Finished', 2)]
+    assert finished['seq'] > started['seq']
+
+def test_live_and_ingest_changes_get_distinct_seqs(app):
+    ingest_fixtures([payload('1H', 0, 0)])
+    ingest_seq = changes_since(0)['seq']
+
+    apply_live_updates([{'id': 7001, 'status_short': '1H', 'home_score': 1, 'away_score': 0}])
+
+    live = changes_since(ingest_seq)
+    assert live['seq'] == ingest_seq + 1
+    assert [f['home_score'] for f in live['fixtures']] == [1]
+
+def test_changes_since_is_capped_at_whole_sequence_numbers(make_fixture):
+    for seq in (1, 2, 2, 3):
+        make_fixture('Arsenal', 'Chelsea', change_seq=seq)
+    db.session.commit()
+
+    page = changes_since(0, limit=2)
+    assert ([f['seq'] for f in page['fixtures']], page['more']) == ([1], True)
+
+    page = changes_since(page['seq'], limit=2)
+    assert ([f['seq'] for f in page['fixtures']], page['more']) == ([2, 2], True)
+
+    page = changes_since(page['seq'], limit=2)
+    assert ([f['seq'] for f in page['fixtures']], page['more']) == ([3], False)
+
+    # A single sequence number larger than the limit is returned whole
+    page = changes_since(1, limit=1)
+    assert [f['seq'] for f in page['fixtures']] == [2, 2]
@@ -0,0 +1,47 @@
+from sqlalchemy import event
+from app import db
+from models import InjurySuspension, Player, PlayerStats
+from prediction_engine import PredictionEngine
+
+def squad(make_fixture):
+    fixture = make_fixture('Arsenal', 'Chelsea')
+    players = {}
+    for name in ('Striker', 'Reserve'):
+        players[name] = Player(name=name, team_id=fixture.home_team_id)
+        db.session.add(players[name])
+    db.session.flush()
+    for player in players.values():
+        db.session.add(InjurySuspension(player_id=player.id, type='Injury', status='Out'))
+    return fixture, players
+
+def test_unweighted_availability_does_not_read_player_stats(make_fixture):
+    fixture, _ = squad(make_fixture)
+    db.session.commit()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        availability = PredictionEngine(weight_absences=False)._prefetch_availability([fixture.home_team_id])
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert availability[fixture.home_team_id]['injuries'] == 2
+    assert not any('player_stats' in statement for statement in statements)
+
+def test_weighted_availability_uses_the_current_season_only(make_fixture):
+    fixture, players = squad(make_fixture)
+    # The reserve was the star two seasons ago; only this season counts
+    db.session.add_all([
+        PlayerStats(player_id=players['Reserve'].id, season='2023', minutes_played=3000, goals=30),
+        PlayerStats(player_id=players['Reserve'].id, season='2025', minutes_played=300, goals=0),
+        PlayerStats(player_id=players['Striker'].id, season='2025', minutes_played=2000, goals=15),
+    ])
+    db.session.commit()
+
+    availability = PredictionEngine(weight_absences=True)._prefetch_availability([fixture.home_team_id])
+
+    team = availability[fixture.home_team_id]
+    assert team['absent_players'] == ['Striker', 'Reserve']
+    # Striker: 0.5 + 0.5 * 2000/2000 + 15/15; reserve: 0.5 + 0.5 * 300/2000
+    assert round(team['weighted_absences'], 3) == round(2.0 + 0.575, 3)
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from app import db
+from models import Prediction, PredictionDependency
+from live_scores import apply_live_updates
+from prediction_refresh import save_prediction
+
+RESULT = {'prediction': 'Home', 'confidence': 60.0, 'reasoning': 'test'}
+
+def upcoming_prediction(make_fixture, home, away):
+    fixture = make_fixture(home, away, kickoff=datetime.utcnow() + timedelta(days=2))
+    prediction = save_prediction(fixture, RESULT)
+    db.session.commit()
+    return prediction.id
+
+def test_form_is_a_recorded_dependency(make_fixture):
+    prediction_id = upcoming_prediction(make_fixture, 'Arsenal', 'Chelsea')
+    sources = {d.source for d in PredictionDependency.query.filter_by(prediction_id=prediction_id)}
+    assert 'form' in sources
+
+def test_finished_match_marks_both_teams_upcoming_predictions_stale(make_fixture):
+    arsenal_next = upcoming_prediction(make_fixture, 'Arsenal', 'Chelsea')
+    villa_next = upcoming_prediction(make_fixture, 'Everton', 'Aston Villa')
+    unrelated = upcoming_prediction(make_fixture, 'Leeds', 'Fulham')
+
+    # The match history listener applies fixtures that finish through the ORM
+    make_fixture('Arsenal', 'Aston Villa', kickoff=datetime.utcnow() - timedelta(days=1),
+                 status='Finished', home_score=2, away_score=0)
+    db.session.commit()
+
+    stale = {p.id for p in Prediction.query.filter_by(is_stale=True)}
+    assert stale == {arsenal_next, villa_next}
+    assert unrelated not in stale
+
+def test_live_finish_marks_upcoming_predictions_stale(make_fixture):
+    live = make_fixture('Arsenal', 'Aston Villa', kickoff=datetime.utcnow() - timedelta(hours=2),
+                        status='2nd Half', home_score=1, away_score=0, external_id=555)
+    db.session.commit()
+    arsenal_next = upcoming_prediction(make_fixture, 'Arsenal', 'Chelsea')
+
+    stats = apply_live_updates([{'id': 555, 'status_short': 'FT', 'home_score': 1, 'away_score': 0}])
+
+    assert stats['finished'] == 1
+    assert db.session.get(Prediction, arsenal_next).is_stale
+
+def test_head_to_head_change_marks_the_pairs_upcoming_fixtures_stale(make_fixture):
+    rematch = upcoming_prediction(make_fixture, 'Chelsea', 'Arsenal')
+    # Leave the head-to-head dependency as the only link to the result below
+    PredictionDependency.query.filter(
+        PredictionDependency.prediction_id == rematch, PredictionDependency.source != 'h2h'
+    ).delete()
+    db.session.commit()
+
+    make_fixture('Arsenal', 'Chelsea', kickoff=datetime.utcnow() - timedelta(days=1),
+                 status='Finished', home_score=1, away_score=1)
+    db.session.commit()
+
+    assert db.session.get(Prediction, rematch).is_stale
+
+def test_rebuilding_history_marks_upcoming_predictions_stale(make_fixture):
+    from match_history import rebuild_match_history
+    make_fixture('Arsenal', 'Chelsea', kickoff=datetime.utcnow() - timedelta(days=1),
+                 status='Finished', home_score=1, away_score=1)
+    db.session.commit()
+    rematch = upcoming_prediction(make_fixture, 'Chelsea', 'Arsenal')
+
+    assert rebuild_match_history() == 1
+    assert db.session.get(Prediction, rematch).is_stale
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from app import db
+from models import Prediction
+
+def _page_ids(client, **args):
+    response = client.get('/api/fixtures', query_string=dict(date='all', per_page=2, **args))
+    assert response.status_code == 200
+    data = response.get_json()
+    return [fixture['id'] for fixture in data['fixtures']], data
+
+def test_fixture_pages_walk_forward_and_back_without_gaps(client, make_fixture):
+    kickoff = datetime(2026, 10, 18, 15, 0)
+    fixtures = [
+        make_fixture('Arsenal', 'Chelsea', kickoff),
+        make_fixture('Everton', 'Fulham', kickoff),
+        make_fixture('Leeds', 'Wolves', kickoff),
+        make_fixture('Burnley', 'Brentford', kickoff + timedelta(hours=2)),
+        make_fixture('Spurs', 'Villa', kickoff - timedelta(hours=2))
+    ]
+    db.session.commit()
+    expected = [fixture.id for fixture in sorted(fixtures, key=lambda fixture: (fixture.kickoff_time, fixture.id))]
+
+    seen, pages = [], []
+    ids, data = _page_ids(client)
+    while True:
+        seen.extend(ids)
+        pages.append(ids)
+        if not data['next_cursor']:
+            break
+        ids, data = _page_ids(client, after=data['next_cursor'])
+    assert seen == expected
+    assert [len(page) for page in pages] == [2, 2, 1]
+
+    ids, data = _page_ids(client, before=data['prev_cursor'])
+    assert ids == pages[1]
+    ids, data = _page_ids(client, before=data['prev_cursor'])
+    assert ids == pages[0]
+    assert data['prev_cursor'] is None
+
+def test_bad_cursor_is_a_client_error(client):
+    assert client.get('/api/fixtures?after=not-a-cursor').status_code == 400
+
+def test_fixture_without_a_league_serializes(client, make_fixture):
+    fixture = make_fixture('Arsenal', 'Chelsea', datetime(2026, 10, 18, 15, 0))
+    fixture.league_id = 999
+    db.session.commit()
+
+    ids, data = _page_ids(client)
+    assert data['fixtures'][0]['league'] is None
+
+def test_fixtures_view_shows_only_the_latest_prediction(client, make_fixture):
+    fixture = make_fixture('Arsenal', 'Chelsea', datetime(2026, 10, 18, 15, 0))
+    db.session.add(Prediction(fixture_id=fixture.id, prediction='Away', confidence=41.0))
+    db.session.add(Prediction(fixture_id=fixture.id, prediction='Home', confidence=73.0))
+    db.session.commit()
+
+    page = client.get('/fixtures?date=all').get_data(as_text=True)
+    assert '73.0% Home' in page
+    assert '41.0% Away' not in page
@@ -0,0 +1,43 @@
+import threading
+import time
+from datetime import date, datetime
+import scheduler
+from scheduler import JobScheduler, plan_jobs
+
+class RecordingScraper:
+    def __getattr__(self, name):
+        return lambda *args: None
+
+def test_plan_jobs_keys_standings_by_utc_date_and_reuses_the_scraper(app, monkeypatch):
+    class LateEvening(datetime):
+        @classmethod
+        def utcnow(cls):
+            return cls(2026, 10, 18, 23, 30)
+
+    monkeypatch.setattr(scheduler, 'datetime', LateEvening)
+    jobs = JobScheduler()
+    jobs._scraper = RecordingScraper()
+    scraper = jobs.scraper()
+
+    plan_jobs(jobs)
+    plan_jobs(jobs)
+
+    assert ('standings', date(2026, 10, 18)) in jobs._queued
+    assert jobs._queued[('fixtures',)]['args'][0] == date(2026, 10, 18)
+    assert jobs.scraper() is scraper
+
+def test_job_outcomes_are_counted(app):
+    jobs = JobScheduler()
+    jobs.schedule(('ok',), lambda: None)
+    jobs.schedule(('broken',), lambda: 1 / 0)
+    worker = threading.Thread(target=jobs._work)
+    worker.start()
+
+    deadline = time.monotonic() + 5
+    while jobs.status()['run'] + jobs.status()['failed'] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    jobs.stop()
+    worker.join()
+
+    assert jobs.status()['run'] == 1
+    assert jobs.status()['failed'] == 1
@@ -0,0 +1,68 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from models import BettingOdds, InjurySuspension, League, Player, PredictionAggregation, Standings, Team
+from prediction_engine import PredictionEngine
+from scoring_kernel import OUTCOMES, score_matrix
+
+@pytest.fixture
+def season(app, make_fixture):
+    """A league with a finished history and upcoming fixtures that exercise every criterion"""
+    rnd = random.Random(7)
+    names = [f"Team {i}" for i in range(12)]
+    start = datetime(2025, 8, 1, 15)
+    for i in range(150):
+        home, away = rnd.sample(names, 2)
+        make_fixture(home, away, start + timedelta(days=i // 4, hours=i % 4), status='Finished',
+                     home_score=rnd.randint(0, 3), away_score=rnd.randint(0, 3),
+                     importance_level=rnd.choice([None, 'Derby']))
+
+    league = League.query.one()
+    for position, team in enumerate(Team.query.order_by(Team.name), 1):
+        db.session.add(Standings(
+            league_id=league.id, team_id=team.id, position=position, points=40 - 2 * position + rnd.randint(0, 3),
+            goal_difference=12 - 2 * position, home_wins=rnd.randint(0, 8), home_draws=3, home_losses=2,
+            away_wins=rnd.randint(0, 6), away_draws=3, away_losses=4
+        ))
+        player = Player(name=f"Player {position}", team_id=team.id)
+        db.session.add(player)
+        db.session.flush()
+        if position % 3 == 0:
+            db.session.add(InjurySuspension(player_id=player.id, type='Injury', status='Out'))
+
+    kickoff = datetime.utcnow() + timedelta(days=1)
+    upcoming = []
+    for i in range(40):
+        home, away = rnd.sample(names, 2)
+        fixture = make_fixture(home, away, kickoff + timedelta(minutes=10 * i),
+                               importance_level=rnd.choice([None, 'Derby']))
+        if i % 2:
+            db.session.add(BettingOdds(fixture_id=fixture.id, bookmaker='x', home_odds=rnd.uniform(1.5, 4.0),
+                                       draw_odds=3.2, away_odds=rnd.uniform(1.5, 4.0)))
+        if i % 3:
+            db.session.add(PredictionAggregation(fixture_id=fixture.id, source_name='s',
+                                                 prediction=rnd.choice(OUTCOMES), confidence=rnd.uniform(40, 80)))
+        upcoming.append(fixture)
+    db.session.commit()
+    return upcoming
+
+@pytest.mark.parametrize('thresholds', [
+    {'home': 65.0, 'away': 39.0}, {'home': 55.0, 'away': 45.0}, {'home': 50.0, 'away': 50.0}
+])
+def test_vector_kernel_matches_scalar_scoring(season, thresholds):
+    engine = PredictionEngine()
+    inputs = engine._prefetch_inputs(season)
+    scalar = [engine._score_fixture(fixture, inputs, engine.weights, thresholds) for fixture in season]
+    vector = score_matrix(engine.build_criteria_matrix(season, inputs), engine.weights, thresholds)
+
+    assert [result['prediction'] for result in scalar] == [OUTCOMES[index] for index in vector['prediction']]
+    assert [result['confidence'] for result in scalar] == [round(float(value), 1) for value in vector['confidence']]
+    assert len(set(result['prediction'] for result in scalar)) > 1
+
+def test_single_and_batch_predictions_agree(season):
+    engine = PredictionEngine()
+    batch = engine.predict_many(season)
+    for fixture, result in zip(season[:5], batch):
+        single = engine.predict_match(fixture)
+        assert (single['prediction'], single['confidence']) == (result['prediction'], result['confidence'])
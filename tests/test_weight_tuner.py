@@ -0,0 +1,35 @@
+import weight_tuner
+from weight_tuner import claim_tuning_run, release_tuning_run, tuning_run
+
+def test_only_one_tuning_run_can_be_claimed(app):
+    first = claim_tuning_run({'rounds': 5})
+    assert first is not None
+    assert claim_tuning_run({'rounds': 5}) is None
+    assert tuning_run()['status'] == 'running'
+
+    release_tuning_run()
+    assert claim_tuning_run({'rounds': 5}) is not None
+
+def test_finished_run_releases_its_claim(app, monkeypatch):
+    monkeypatch.setattr(weight_tuner, 'tune_weights', lambda **options: None)
+    run = claim_tuning_run({})
+    weight_tuner.run_tuning_job(run, {})
+
+    assert tuning_run()['status'] == 'failed'
+    assert claim_tuning_run({}) is not None
+
+def test_tune_weights_rejects_bad_parameters(client):
+    response = client.post('/admin/tune_weights', json={'workers': 'many'})
+    assert response.status_code == 400
+    response = client.post('/admin/tune_weights', json={'date_from': '18/10/2026'})
+    assert response.status_code == 400
+    assert tuning_run() is None
+
+def test_tune_weights_refuses_a_second_run(client, monkeypatch):
+    import admin_panel
+    submitted = []
+    monkeypatch.setattr(admin_panel, 'submit_job', lambda *args, **kwargs: submitted.append(args))
+
+    assert client.post('/admin/tune_weights', json={'rounds': 2}).status_code == 202
+    assert client.post('/admin/tune_weights', json={'rounds': 2}).status_code == 409
+    assert len(submitted) == 1
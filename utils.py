@@ -4,6 +4,10 @@ from datetime import datetime, timedelta
 from flask import session
 import uuid
 import logging
+import unicodedata
+
+# Club-type tokens dropped when comparing team names across sources
+TEAM_NAME_NOISE = {'fc', 'afc', 'cf', 'sc', 'ac', 'fk', 'sk', 'cd', 'sv', 'club', 'the'}
 
 def get_user_session():
     """Get or create user session ID"""
@@ -127,6 +131,19 @@ def sanitize_search_query(query):
     
     return sanitized[:100]  # Limit length
 
+def normalize_team_name(name):
+    """Comparable form of a team name across data sources
+    
+    Lowercases, strips accents and punctuation and drops club-type tokens,
+    so "Wolverhampton Wanderers F.C." and "wolverhampton wanderers" match.
+    """
+    if not name:
+        return ""
+    
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    name = ''.join(c if c.isalnum() else ' ' for c in name.replace('.', ''))
+    return ' '.join(token for token in name.split() if token not in TEAM_NAME_NOISE)
+
 def format_team_form(wins, draws, losses):
     """Format team form as a string"""
     total = wins + draws + losses
@@ -193,6 +210,15 @@ def validate_date_range(start_date, end_date):
     except ValueError:
         return False
 
+def day_bounds(day, days=1):
+    """Half-open [start, end) datetimes covering `days` days from a date
+
+    Filtering kickoff_time >= start and < end can use an index on the
+    column, unlike comparing func.date(kickoff_time) to the date.
+    """
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=days)
+
 def format_odds_display(odds):
     """Format odds for display"""
     if not odds:
@@ -0,0 +1,236 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from app import db
+from models import AdminSettings
+from backtest import collect_history
+from scoring_kernel import score_matrix
+from settings_cache import DEFAULT_SETTINGS, get_settings, bump_settings_version, invalidate_settings
+from data_cache import MISSING, DatabaseCacheBackend
+
+WEIGHT_FIELDS = [
+    'form_weight', 'home_away_weight', 'player_availability_weight', 'match_stats_weight',
+    'h2h_weight', 'ai_predictions_weight', 'odds_agreement_weight', 'intangibles_weight'
+]
+
+HOME_THRESHOLD_RANGE = (50.0, 80.0)
+AWAY_THRESHOLD_RANGE = (20.0, 50.0)
+
+# Shared-cache key of the latest background tuning run, seen by every process
+TUNING_RUN_KEY = 'tuning:latest'
+TUNING_RUN_TTL = 7 * 24 * 3600
+# Held while a run is active so only one can start; a claim older than
+# TUNING_TIMEOUT is assumed lost with its process
+TUNING_CLAIM_KEY = 'tuning:claim'
+TUNING_TIMEOUT = 3600
+
+# Scored history shared with pool workers, set once per process
+_history = None
+
+def _set_history(matrix, actual):
+    """Install the history every candidate is scored against"""
+    global _history
+    _history = (matrix, actual)
+
+def candidate_accuracy(candidate, matrix, actual):
+    """Share of fixtures a candidate settings set predicts correctly"""
+    if not len(actual):
+        return 0.0
+    settings = DEFAULT_SETTINGS._replace(**candidate)
+    scores = score_matrix(matrix, settings.weights, settings.thresholds)
+    return float((scores['prediction'] == actual).mean() * 100)
+
+def _evaluate_batch(candidates):
+    """Score a batch of candidates against the worker's history"""
+    matrix, actual = _history
+    return [candidate_accuracy(candidate, matrix, actual) for candidate in candidates]
+
+def _make_candidate(weights, home_threshold, away_threshold):
+    """Settings fields for a weight vector and threshold pair"""
+    weights = np.maximum(weights, 0)
+    weights = weights / weights.sum() * 100
+    home_threshold = float(np.clip(home_threshold, *HOME_THRESHOLD_RANGE))
+    away_threshold = float(np.clip(away_threshold, AWAY_THRESHOLD_RANGE[0],
+                                   min(AWAY_THRESHOLD_RANGE[1], home_threshold - 2)))
+
+    candidate = {field: round(float(w), 1) for field, w in zip(WEIGHT_FIELDS, weights)}
+    candidate['home_win_threshold'] = round(home_threshold, 1)
+    candidate['away_win_threshold'] = round(away_threshold, 1)
+    return candidate
+
+def _random_candidate(rng):
+    """Uniformly random weights on the simplex and thresholds within range"""
+    home_threshold = rng.uniform(*HOME_THRESHOLD_RANGE)
+    away_threshold = rng.uniform(AWAY_THRESHOLD_RANGE[0], min(AWAY_THRESHOLD_RANGE[1], home_threshold - 2))
+    return _make_candidate(rng.dirichlet(np.ones(len(WEIGHT_FIELDS))), home_threshold, away_threshold)
+
+def _perturb_candidate(rng, candidate, scale):
+    """A neighbour of a candidate, for refining around the best so far"""
+    weights = np.array([candidate[field] for field in WEIGHT_FIELDS])
+    weights = weights * np.exp(rng.normal(0, scale, len(weights)))
+    return _make_candidate(
+        weights,
+        candidate['home_win_threshold'] + rng.normal(0, scale * 10),
+        candidate['away_win_threshold'] + rng.normal(0, scale * 10)
+    )
+
+def _current_candidate(settings):
+    """The live settings expressed as a candidate"""
+    candidate = {field: getattr(settings, field) for field in WEIGHT_FIELDS}
+    candidate['home_win_threshold'] = settings.home_win_threshold
+    candidate['away_win_threshold'] = settings.away_win_threshold
+    return candidate
+
+def _slice(matrix, start, stop):
+    """Rows start:stop of a CriteriaMatrix"""
+    part = type(matrix)(0)
+    for name, values in vars(matrix).items():
+        setattr(part, name, values[start:stop])
+    return part
+
+def tune_weights(league_ids=None, date_from=None, date_to=None, workers=None,
+                 rounds=20, candidates_per_round=64, patience=4, holdout=0.2, seed=None):
+    """Search weights and thresholds against historical fixtures
+
+    Criteria are reconstructed once; every candidate is then scored from the
+    in-memory matrix. Each round mixes fresh random candidates with
+    perturbations of the best so far, and the search stops after `patience`
+    rounds without improvement. The latest `holdout` share of fixtures is
+    kept back to report out-of-sample accuracy.
+    """
+    workers = workers or os.cpu_count() or 1
+    matrix, actual = collect_history(league_ids, date_from, date_to)
+    if not len(actual):
+        return None
+
+    split = int(len(actual) * (1 - holdout))
+    train, train_actual = _slice(matrix, 0, split), actual[:split]
+    test, test_actual = _slice(matrix, split, len(actual)), actual[split:]
+
+    rng = np.random.default_rng(seed)
+    current = _current_candidate(get_settings())
+    best = current
+    best_accuracy = candidate_accuracy(current, train, train_actual)
+    baseline_accuracy = best_accuracy
+    evaluated = 1
+    stale_rounds = 0
+    completed_rounds = 0
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_set_history,
+                               initargs=(train, train_actual)) if workers > 1 else None
+    if pool is None:
+        _set_history(train, train_actual)
+
+    try:
+        for round_number in range(rounds):
+            scale = 0.5 / (1 + round_number)
+            batch = [
+                _random_candidate(rng) if i % 2 == 0 or round_number == 0
+                else _perturb_candidate(rng, best, scale)
+                for i in range(candidates_per_round)
+            ]
+
+            if pool:
+                chunks = [batch[i::workers] for i in range(workers)]
+                scored = [
+                    (candidate, accuracy)
+                    for chunk, accuracies in zip(chunks, pool.map(_evaluate_batch, chunks))
+                    for candidate, accuracy in zip(chunk, accuracies)
+                ]
+            else:
+                scored = list(zip(batch, _evaluate_batch(batch)))
+
+            evaluated += len(scored)
+            completed_rounds = round_number + 1
+            round_best, round_accuracy = max(scored, key=lambda item: item[1])
+            if round_accuracy > best_accuracy:
+                best, best_accuracy = round_best, round_accuracy
+                stale_rounds = 0
+            else:
+                stale_rounds += 1
+                if stale_rounds >= patience:
+                    break
+    finally:
+        if pool:
+            pool.shutdown()
+
+    best = dict(best)
+    best['draw_threshold_min'] = round(best['away_win_threshold'] + 1, 1)
+    best['draw_threshold_max'] = round(best['home_win_threshold'] - 1, 1)
+
+    return {
+        'settings': best,
+        'accuracy': round(best_accuracy, 1),
+        'holdout_accuracy': round(candidate_accuracy(best, test, test_actual), 1) if len(test_actual) else None,
+        'baseline_accuracy': round(baseline_accuracy, 1),
+        'baseline_holdout_accuracy': round(candidate_accuracy(current, test, test_actual), 1) if len(test_actual) else None,
+        'fixtures': int(len(actual)),
+        'evaluated': evaluated,
+        'rounds': completed_rounds
+    }
+
+def apply_tuned_settings(tuned):
+    """Write tuned weights and thresholds to AdminSettings"""
+    try:
+        settings = AdminSettings.query.order_by(AdminSettings.id).first()
+        if not settings:
+            settings = AdminSettings()
+
+        for field, value in tuned.items():
+            setattr(settings, field, value)
+        bump_settings_version(settings)
+
+        db.session.add(settings)
+        db.session.commit()
+        invalidate_settings()
+        return True
+
+    except Exception as e:
+        logging.error(f"Error applying tuned settings: {e}")
+        db.session.rollback()
+        return False
+
+def tuning_run():
+    """Status and result of the latest background tuning run, or None"""
+    try:
+        entry = DatabaseCacheBackend().get(TUNING_RUN_KEY)
+        return None if entry is MISSING else entry[0]
+    except Exception as e:
+        logging.error(f"Error reading tuning run: {e}")
+        return None
+
+def claim_tuning_run(options):
+    """Atomically claim the single tuning slot; the running record, or None if taken"""
+    store = DatabaseCacheBackend()
+    run = {'status': 'running', 'started_at': datetime.utcnow().isoformat(),
+           'options': {key: str(value) for key, value in options.items() if value is not None}}
+    if not store.add(TUNING_CLAIM_KEY, run['started_at'], TUNING_TIMEOUT):
+        return None
+    store.set(TUNING_RUN_KEY, run, TUNING_TIMEOUT)
+    return run
+
+def release_tuning_run():
+    """Give up the tuning slot so another run can start"""
+    DatabaseCacheBackend().delete(TUNING_CLAIM_KEY)
+
+def run_tuning_job(run, options, apply=False):
+    """Tune weights as a background job claimed by claim_tuning_run()"""
+    store = DatabaseCacheBackend()
+    try:
+        result = tune_weights(**options)
+        if result:
+            result['applied'] = apply_tuned_settings(result['settings']) if apply else False
+            run.update(status='finished', result=result)
+        else:
+            run.update(status='failed', error='No finished fixtures to tune against')
+    except Exception as e:
+        logging.error(f"Error tuning weights: {e}")
+        run.update(status='failed', error=str(e))
+
+    run['finished_at'] = datetime.utcnow().isoformat()
+    try:
+        store.set(TUNING_RUN_KEY, run, TUNING_RUN_TTL)
+    finally:
+        release_tuning_run()
@@ -0,0 +1,6 @@
+from app import app, db
+
+def init_worker():
+    """Process pool initializer: drop database connections inherited from the parent process"""
+    with app.app_context():
+        db.engine.dispose(close=False)